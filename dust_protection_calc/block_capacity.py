@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+import itertools
+import numpy as np
+
+# the fields of a block around the payload, the parents are counted separately
+BLOCK_FIELDS = [
+    (1,         "ProtocolVersion"),
+    (1,         "ParentCount"),
+    (4,         "PayloadLength"),
+    (8,         "Nonce"),
+]
+PARENT_BYTES = 32
+
+# the fields of a transaction payload around the inputs, outputs and unlocks
+TRANSACTION_FIELDS = [
+    (4,         "Payload Type"),
+    (1,         "Transaction Type"),
+    (8,         "NetworkID"),
+    (2,         "Inputs Count"),
+    (32,        "Inputs Commitment"),
+    (2,         "Outputs Count"),
+    (4,         "Payload Length"),
+    (2,         "Unlock Blocks Count"),
+]
+INPUT_BYTES             = 1+32+2        # UTXO Input (Input Type + Transaction ID + Transaction Output Index)
+SIGNATURE_UNLOCK_BYTES  = 1+1+32+64     # Signature Unlock (Unlock Type + Signature Type + Public key + Signature)
+REFERENCE_UNLOCK_BYTES  = 1+2           # Reference Unlock (Unlock Type + Reference)
+
+#===============================================================================
+# returns the bytes available for the outputs of a transaction payload of the given size.
+# inputs that are owned by the same address use a reference unlock instead of a signature unlock.
+def getOutputsSizeMax(payload_size_max, inputs=1, signature_unlocks=None):
+    if signature_unlocks == None:
+        signature_unlocks = inputs
+    outputs_size_max = payload_size_max
+    outputs_size_max -= sum(size for size, _ in TRANSACTION_FIELDS)
+    outputs_size_max -= inputs*INPUT_BYTES
+    outputs_size_max -= signature_unlocks*SIGNATURE_UNLOCK_BYTES
+    outputs_size_max -= (inputs-signature_unlocks)*REFERENCE_UNLOCK_BYTES
+    return outputs_size_max
+
+#===============================================================================
+class BlockLayout(object):
+    # the bytes of a block that are not available for outputs
+
+    #---------------------------------------------------------------------------
+    def __init__(self, block_size_max, parents=1, output_count_max=None):
+        self.block_size_max     = block_size_max
+        self.parents            = parents
+        self.output_count_max   = output_count_max      # None if only the size limits the outputs
+
+    #---------------------------------------------------------------------------
+    # returns the maximum possible size of a payload
+    def payloadSizeMax(self):
+        return self.block_size_max - sum(size for size, _ in BLOCK_FIELDS) - self.parents*PARENT_BYTES
+
+    #---------------------------------------------------------------------------
+    # returns the bytes available for the outputs of a transaction that fills the block
+    def outputsSizeMax(self, inputs=1, signature_unlocks=None):
+        return getOutputsSizeMax(self.payloadSizeMax(), inputs=inputs, signature_unlocks=signature_unlocks)
+
+#===============================================================================
+class OutputModel(object):
+    # an output type as the bytes it takes in a transaction and its value without any options,
+    # and the options that can be added to it as (size, value, count_max), e.g. a feature or native tokens.
+
+    #---------------------------------------------------------------------------
+    def __init__(self, name, size, value, options):
+        self.name       = name
+        self.size       = int(size)
+        self.value      = float(value)
+        self.options    = [(int(size), float(value), int(count_max)) for size, value, count_max in options]
+
+#===============================================================================
+# returns chunks that sum up to count_max, so every count up to count_max is the sum of some of the chunks
+def getBinaryChunks(count_max):
+    chunks  = []
+    chunk   = 1
+    while count_max > 0:
+        chunk = min(chunk, count_max)
+        chunks.append(chunk)
+        count_max -= chunk
+        chunk *= 2
+    return chunks
+
+#===============================================================================
+# adds the best choice of options to every entry of values [size], each chunk of an option is used at most once
+def addOptions(values, options):
+    capacity = len(values) - 1
+    for size, value, count_max in options:
+        if value <= 0:
+            # more bytes without more value never improve a solution
+            continue
+        for chunk in getBinaryChunks(count_max):
+            chunk_size = size*chunk
+            if chunk_size > capacity:
+                break
+            values[chunk_size:] = np.maximum(values[chunk_size:], values[:capacity+1-chunk_size] + value*chunk)
+    return values
+
+#===============================================================================
+# returns the best values [size] after adding one output of the model to values [size]
+def addOutput(values, model):
+    capacity    = len(values) - 1
+    result      = np.full(capacity+1, -np.inf)
+    if model.size <= capacity:
+        result[model.size:] = values[:capacity+1-model.size] + model.value
+    return addOptions(result, model.options)
+
+#===============================================================================
+# returns the maximum total value of at most count_max outputs with a total size of at most capacity,
+# and the chosen outputs as (model index, size).
+# dynamic programming over the number of outputs, every layer holds the best value for every used size.
+# the options are added one after another instead of trying every combination of them, which keeps a layer
+# at a few passes over the sizes per option.
+def solveBlock(capacity, models, count_max=None):
+    if count_max == None:
+        count_max = capacity // min(model.size for model in models)
+
+    # [output count][size], the best value of that many outputs that use at most size bytes
+    layers      = [np.zeros(capacity+1, dtype=np.float64)]
+    best_value  = 0.0
+    best_count  = 0
+
+    for k in range(1, count_max+1):
+        layer = np.full(capacity+1, -np.inf)
+        for model in models:
+            layer = np.maximum(layer, addOutput(layers[-1], model))
+        if layer[capacity] == -np.inf:
+            # k outputs do not fit, so more outputs do not fit either
+            break
+        layers.append(layer)
+        if layer[capacity] > best_value:
+            best_value = layer[capacity]
+            best_count = k
+
+    # [model][size], the best value of a single output with exactly size bytes
+    singles = []
+    for model in models:
+        single = np.full(capacity+1, -np.inf)
+        if model.size <= capacity:
+            single[model.size] = model.value
+        singles.append(addOptions(single, model.options))
+
+    # walk back through the layers to get the chosen outputs
+    chosen  = []
+    size    = capacity
+    for k in range(best_count, 0, -1):
+        best = None
+        for m, single in enumerate(singles):
+            # [output size] the value of the previous layer plus one output of the model
+            candidates  = layers[k-1][size::-1] + single[:size+1]
+            output_size = int(np.argmax(candidates))
+            if best == None or candidates[output_size] > best[0]:
+                best = (candidates[output_size], m, output_size)
+        chosen.append((best[1], best[2]))
+        size -= best[2]
+
+    return best_value, chosen
+
+#===============================================================================
+class BlockCapacity(object):
+    # the worst case a single block can cause, given the output models with the count, the vbytes and the stored bytes
+    # as their values. the consumed inputs free at least the stored bytes of the smallest output.
+
+    #---------------------------------------------------------------------------
+    def __init__(self, layout, models_count, models_v_bytes, models_stored_bytes, inputs=1, signature_unlocks=None):
+        self.layout             = layout
+        self.inputs             = inputs
+        self.outputs_size_max   = layout.outputsSizeMax(inputs=inputs, signature_unlocks=signature_unlocks)
+
+        count, self.outputs_for_count                       = solveBlock(self.outputs_size_max, models_count, layout.output_count_max)
+        self.output_count_max                               = int(count)
+        self.v_bytes_max, self.outputs_for_v_bytes          = solveBlock(self.outputs_size_max, models_v_bytes, layout.output_count_max)
+        stored_bytes_max, self.outputs_for_storage_growth   = solveBlock(self.outputs_size_max, models_stored_bytes, layout.output_count_max)
+        self.storage_growth_max_bytes                       = int(stored_bytes_max) - inputs*int(min(model.value for model in models_stored_bytes))
+
+        self.names = [model.name for model in models_count]
+
+    #---------------------------------------------------------------------------
+    def describe(self, chosen):
+        counts = {}
+        for m, size in chosen:
+            counts[self.names[m]] = counts.get(self.names[m], 0) + 1
+        return ", ".join("%dx %s" % (count, name) for name, count in sorted(counts.items(), key=lambda item: -item[1]))
+
+    #---------------------------------------------------------------------------
+    def summary(self):
+        print("BlockSizeMax:        %5d" % (self.layout.block_size_max))
+        print("Inputs:              %5d" % (self.inputs))
+        print("OutputsSizeMax:      %5d" % (self.outputs_size_max))
+        print("\nMax. outputs per block:        %7d (%s)" % (self.output_count_max, self.describe(self.outputs_for_count)))
+        print("Max. vbytes per block:         %7d (%s)" % (self.v_bytes_max, self.describe(self.outputs_for_v_bytes)))
+        print("Max. storage growth per block: %7d bytes (%s)" % (self.storage_growth_max_bytes, self.describe(self.outputs_for_storage_growth)))
+
+#===============================================================================
+# returns the same value as solveBlock by trying every combination of options and outputs, which is only
+# feasible for a small capacity and few outputs
+def solveBlockBruteForce(capacity, models, count_max):
+    # the best value of a single output of every size
+    singles = {}
+    for model in models:
+        for counts in itertools.product(*[range(count_max+1) for _, _, count_max in model.options]):
+            size    = model.size  + sum(option[0]*count for option, count in zip(model.options, counts))
+            value   = model.value + sum(option[1]*count for option, count in zip(model.options, counts))
+            singles[size] = max(singles.get(size, -np.inf), value)
+
+    # the best value of k outputs for every used size
+    best_value  = 0.0
+    layer       = {0: 0.0}
+    for k in range(count_max):
+        next_layer = {}
+        for used, value in layer.items():
+            for size, single_value in singles.items():
+                if used+size <= capacity:
+                    next_layer[used+size] = max(next_layer.get(used+size, -np.inf), value+single_value)
+        layer = next_layer
+        if layer:
+            best_value = max(best_value, max(layer.values()))
+    return best_value
+
+#===============================================================================
+# compares solveBlock with solveBlockBruteForce for random models, options and capacities
+def checkSolveBlock(trials=200, seed=1):
+    rng = np.random.default_rng(seed)
+    for trial in range(trials):
+        capacity    = int(rng.integers(20, 200))
+        count_max   = int(rng.integers(1, 8))
+        models      = []
+        for m in range(int(rng.integers(1, 4))):
+            options = [(int(rng.integers(1, 30)), float(rng.integers(0, 40)), int(rng.integers(1, 4))) for _ in range(int(rng.integers(0, 3)))]
+            models.append(OutputModel(name="model %d" % (m), size=int(rng.integers(5, 60)), value=float(rng.integers(1, 50)), options=options))
+
+        value, chosen   = solveBlock(capacity, models, count_max)
+        expected        = solveBlockBruteForce(capacity, models, count_max)
+        if abs(value - expected) > 1e-9:
+            raise Exception("Trial %d: solveBlock found %f, brute force found %f" % (trial, value, expected))
+        if sum(size for _, size in chosen) > capacity or len(chosen) > count_max:
+            raise Exception("Trial %d: the chosen outputs %s do not fit" % (trial, chosen))
+    print("solveBlock matches the brute force in %d trials" % (trials))
+
+#===============================================================================
+if __name__ == '__main__':
+    checkSolveBlock()
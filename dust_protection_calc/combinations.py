@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import block_capacity, outputs
+
+# the columns of the byte tables
+MIN = 0
+MAX = 1
+
+#===============================================================================
+class OutputType(object):
+    # an output type with its optional unlock conditions and features, which are the parameters of the builder.
+    # metadata fields that are present use the maximum length, so the bytes min and max cover every length.
+
+    #---------------------------------------------------------------------------
+    def __init__(self, name, build, flag_names, native_tokens, metadata_offsets=True):
+        self.name               = name
+        self.build              = build             # build(weight_key, weight_data, flags, native_token_count) returns Output_VBytes
+        self.flag_names         = flag_names
+        self.native_tokens      = native_tokens
+        self.offset_bytes       = getOffsetBytes(metadata_offsets)
+
+#===============================================================================
+# returns the bytes that are stored with every output but are not part of the transaction
+def getOffsetBytes(metadata_offsets):
+    vbytes = outputs.Output_VBytes(name="offset", name_plot="offset", max_byte_size=np.inf, weight_key=1.0, weight_data=1.0, metadata_length_max=None)
+    vbytes.addField_OutputID()
+    if metadata_offsets:
+        vbytes.addField_OutputMetadataOffsets()
+    return vbytes.byteSizeMax()
+
+#===============================================================================
+# returns the output types of GetExampleOutputs
+def getOutputTypes(output_size_max, metadata_length_max):
+    def common(weight_key, weight_data):
+        return dict(weight_key          = weight_key,
+                    weight_data         = weight_data,
+                    additional_name     = None,
+                    output_size_max     = output_size_max,
+                   )
+
+    def withMetadata(weight_key, weight_data, native_token_count):
+        return dict(common(weight_key, weight_data),
+                    metadata_length_max = metadata_length_max,
+                    native_token_count  = native_token_count,
+                   )
+
+    return [
+        OutputType(name             = "SigLockedSingleOutput",
+                   build            = lambda weight_key, weight_data, flags, native_token_count: outputs.getVBytes_SigLockedSingleOutput(**common(weight_key, weight_data)),
+                   flag_names       = [],
+                   native_tokens    = False,
+                   metadata_offsets = False),
+        OutputType(name             = "BasicOutput",
+                   build            = lambda weight_key, weight_data, flags, native_token_count: outputs.getVBytes_BasicOutput(metadata_length=metadata_length_max, **withMetadata(weight_key, weight_data, native_token_count), **flags),
+                   flag_names       = ["storage_deposit_return_unlock_condition", "timelock_unlock_condition", "expiration_unlock_condition", "sender_feature", "metadata_feature", "tag_feature"],
+                   native_tokens    = True),
+        OutputType(name             = "AliasOutput",
+                   build            = lambda weight_key, weight_data, flags, native_token_count: outputs.getVBytes_AliasOutput(state_metadata_length=metadata_length_max, metadata_length=metadata_length_max, immutable_metadata_length=metadata_length_max, **withMetadata(weight_key, weight_data, native_token_count), **flags),
+                   flag_names       = ["governor_address_unlock_condition", "sender_feature", "metadata_feature", "immutable_issuer_feature", "immutable_metadata_feature"],
+                   native_tokens    = True),
+        OutputType(name             = "FoundryOutput",
+                   build            = lambda weight_key, weight_data, flags, native_token_count: outputs.getVBytes_FoundryOutput(metadata_length=metadata_length_max, immutable_metadata_length=metadata_length_max, **withMetadata(weight_key, weight_data, native_token_count), **flags),
+                   flag_names       = ["metadata_feature", "immutable_metadata_feature"],
+                   native_tokens    = True),
+        OutputType(name             = "NFTOutput",
+                   build            = lambda weight_key, weight_data, flags, native_token_count: outputs.getVBytes_NFTOutput(metadata_length=metadata_length_max, immutable_metadata_length=metadata_length_max, **withMetadata(weight_key, weight_data, native_token_count), **flags),
+                   flag_names       = ["storage_deposit_return_unlock_condition", "timelock_unlock_condition", "expiration_unlock_condition", "sender_feature", "metadata_feature", "tag_feature", "immutable_issuer_feature", "immutable_metadata_feature"],
+                   native_tokens    = True),
+    ]
+
+#===============================================================================
+# returns the key bytes [min, max] and the data bytes [min, max] of an output.
+# the vbytes are linear in the weights, so building the output once per weight is enough.
+def getOutputBytes(output_type, flags, native_token_count):
+    vbytes_key  = output_type.build(1.0, 0.0, flags, native_token_count)
+    vbytes_data = output_type.build(0.0, 1.0, flags, native_token_count)
+    return np.array([vbytes_key.vBytesMin(),  vbytes_key.vBytesMax(),
+                     vbytes_data.vBytesMin(), vbytes_data.vBytesMax()], dtype=np.float64)
+
+#===============================================================================
+class CombinationTable(object):
+    # one row per output type and combination of optional unlock conditions, features and native token count.
+    # every option adds the same fields regardless of the other options, so the table is the bytes of the
+    # output without options plus the sum of the bytes of the chosen options, which is computed for all rows at once.
+
+    #---------------------------------------------------------------------------
+    def __init__(self, output_size_max, native_token_count_max, metadata_length_max):
+        output_types            = getOutputTypes(output_size_max, metadata_length_max)
+
+        self.output_size_max    = output_size_max
+        self.output_names       = [output_type.name for output_type in output_types]
+        self.flag_names         = []
+        for output_type in output_types:
+            self.flag_names += [flag_name for flag_name in output_type.flag_names if flag_name not in self.flag_names]
+
+        self.output_types   = output_types
+        output_index        = []
+        offset_bytes        = []
+        flags               = []
+        native_token_counts = []
+        output_bytes        = []
+        self.invalid_count  = 0
+
+        for i, output_type in enumerate(output_types):
+            no_flags        = dict((flag_name, False) for flag_name in output_type.flag_names)
+            base            = getOutputBytes(output_type, no_flags, 0)
+
+            # the bytes every option adds to the output without options
+            flag_bytes      = np.array([getOutputBytes(output_type, dict(no_flags, **{flag_name: True}), 0) - base for flag_name in output_type.flag_names], dtype=np.float64).reshape(-1, 4)
+            token_bytes     = getOutputBytes(output_type, no_flags, 1) - base if output_type.native_tokens else np.zeros(4)
+            token_counts    = np.arange((native_token_count_max if output_type.native_tokens else 0) + 1)
+
+            output_type.base_bytes          = base
+            output_type.flag_bytes          = flag_bytes
+            output_type.token_bytes         = token_bytes
+            output_type.token_count_max     = len(token_counts) - 1
+
+            # [combination, flag], bit j of the combination index enables flag j
+            combinations    = ((np.arange(2**len(output_type.flag_names))[:, None] >> np.arange(len(output_type.flag_names))[None, :]) & 1).astype(bool)
+            combinations    = np.repeat(combinations, len(token_counts), axis=0)
+            counts          = np.tile(token_counts, 2**len(output_type.flag_names))
+
+            rows            = base[None, :] + combinations.astype(np.float64) @ flag_bytes + counts[:, None] * token_bytes[None, :]
+
+            # combinations that do not fit into a transaction are not valid outputs
+            valid           = (rows[:, 1] + rows[:, 3]) <= output_size_max
+            self.invalid_count += int(np.count_nonzero(~valid))
+
+            type_flags      = np.zeros((len(rows), len(self.flag_names)), dtype=bool)
+            for j, flag_name in enumerate(output_type.flag_names):
+                type_flags[:, self.flag_names.index(flag_name)] = combinations[:, j]
+
+            output_index.append(np.full(np.count_nonzero(valid), i, dtype=np.int64))
+            offset_bytes.append(np.full(np.count_nonzero(valid), output_type.offset_bytes, dtype=np.int64))
+            flags.append(type_flags[valid])
+            native_token_counts.append(counts[valid])
+            output_bytes.append(rows[valid])
+
+        output_bytes                = np.concatenate(output_bytes)
+
+        self.output_index           = np.concatenate(output_index)
+        self.flags                  = np.concatenate(flags)
+        self.native_token_counts    = np.concatenate(native_token_counts)
+        self.key_bytes              = output_bytes[:, 0:2]                  # [row, min/max]
+        self.data_bytes             = output_bytes[:, 2:4]                  # [row, min/max]
+        self.byte_size              = self.key_bytes + self.data_bytes      # [row, min/max]
+        self.offset_bytes           = np.concatenate(offset_bytes)          # [row], the stored bytes that are not part of the transaction
+
+    #---------------------------------------------------------------------------
+    def __len__(self):
+        return len(self.output_index)
+
+    #---------------------------------------------------------------------------
+    # [row, min/max]
+    def vBytes(self, weight_key, weight_data):
+        return self.key_bytes * weight_key + self.data_bytes * weight_data
+
+    #---------------------------------------------------------------------------
+    # returns the rows of the given output type
+    def select(self, output_name):
+        return self.output_index == self.output_names.index(output_name)
+
+    #---------------------------------------------------------------------------
+    # returns the row with the most vbytes, optionally of the given output type only
+    def worstCase(self, weight_key, weight_data, output_name=None):
+        v_bytes_max = self.vBytes(weight_key, weight_data)[:, MAX]
+        if output_name == None:
+            return int(np.argmax(v_bytes_max))
+        rows = np.flatnonzero(self.select(output_name))
+        return int(rows[np.argmax(v_bytes_max[rows])])
+
+    #---------------------------------------------------------------------------
+    # returns the percentiles of the maximum vbytes of the given output type
+    def percentiles(self, percentages, weight_key, weight_data, output_name):
+        return np.percentile(self.vBytes(weight_key, weight_data)[self.select(output_name), MAX], percentages)
+
+    #---------------------------------------------------------------------------
+    def describe(self, row):
+        options = [flag_name for flag_name, enabled in zip(self.flag_names, self.flags[row]) if enabled]
+        if self.native_token_counts[row] > 0:
+            options.insert(0, "%d native tokens" % (self.native_token_counts[row]))
+        return "%s (%s)" % (self.output_names[self.output_index[row]], ", ".join(options) if options else "min functionality")
+
+    #---------------------------------------------------------------------------
+    def summary(self, weight_key, weight_data, percentages=(50.0, 90.0, 99.0)):
+        print("Combinations: %d valid, %d too big for an output of %d bytes" % (len(self), self.invalid_count, self.output_size_max))
+        v_bytes = self.vBytes(weight_key, weight_data)
+        for output_name in self.output_names:
+            rows = self.select(output_name)
+            print()
+            print("Name: %s\n\tcombinations: %6d\n\tbytes_max:    %6d\n\tv_byte_min:   %6d\n\tv_byte_max:   %6d" % (output_name, np.count_nonzero(rows), self.byte_size[rows, MAX].max(), v_bytes[rows, MIN].min(), v_bytes[rows, MAX].max()))
+            for percentage, value in zip(percentages, self.percentiles(percentages, weight_key, weight_data, output_name)):
+                print("\tv_byte_max p%-4g %6d" % (percentage, value))
+            print("\tworst case:   %s" % (self.describe(self.worstCase(weight_key, weight_data, output_name))))
+
+    #---------------------------------------------------------------------------
+    # returns the output types as models for the block capacity, the value of an output is
+    # weight_key * key bytes + weight_data * data bytes + weight_output
+    def outputModels(self, weight_key, weight_data, weight_output=0.0):
+        def size(output_bytes):
+            return output_bytes[..., 1] + output_bytes[..., 3]
+
+        def value(output_bytes):
+            return output_bytes[..., 1]*weight_key + output_bytes[..., 3]*weight_data
+
+        models = []
+        for output_type in self.output_types:
+            options = [(size(flag_bytes), value(flag_bytes), 1) for flag_bytes in output_type.flag_bytes]
+            if output_type.token_count_max > 0:
+                options.append((size(output_type.token_bytes), value(output_type.token_bytes), output_type.token_count_max))
+            models.append(block_capacity.OutputModel(name       = output_type.name,
+                                                     size       = size(output_type.base_bytes) - output_type.offset_bytes,
+                                                     value      = value(output_type.base_bytes) + weight_output,
+                                                     options    = options))
+        return models
+
+    #---------------------------------------------------------------------------
+    def saveNpz(self, file_path):
+        np.savez(file_path,
+                 output_names           = np.array(self.output_names),
+                 flag_names             = np.array(self.flag_names),
+                 output_index           = self.output_index,
+                 flags                  = self.flags,
+                 native_token_counts    = self.native_token_counts,
+                 key_bytes              = self.key_bytes,
+                 data_bytes             = self.data_bytes,
+                 byte_size              = self.byte_size,
+                 offset_bytes           = self.offset_bytes,
+                )
@@ -1,30 +1,100 @@
 # -*- coding: utf-8 -*-
+import argparse
 import locale
 locale.setlocale( locale.LC_ALL, 'en_US.UTF-8' )
-import outputs, plot
+import numpy as np
+import block_capacity, combinations, outputs, plot, schema_outputs, sweep
+
+TOTAL_SUPPLY                = 2779530283277761
+PRICE_PER_MIOTA_DOLLAR      = 0.35
+
+BLOCK_SIZE_MAX              = 32768
+OUTPUT_COUNT_MAX            = 128
+METADATA_LENGTH_MAX         = 8192
+NATIVE_TOKEN_COUNT_MAX      = 64
+
+WEIGHT_KEY                  = 10.0
+WEIGHT_DATA                 = 1.0
+
+MAXIMUM_DB_SIZES_GB         = [500.0, 1000.0, 2000.0]
+FUND_SPARSITY_PERCENTAGES   = [20.0, 50.0]
 
 #===============================================================================
 def getDollarFormat(value):
     return "%s$" % (locale.currency(value, symbol=False, grouping=True))
 
 #===============================================================================
-def calculateDustProtectionCostsStardust(print_summary, create_plots, show_plots):
+def getBlockLayout():
+    return block_capacity.BlockLayout(block_size_max=BLOCK_SIZE_MAX, output_count_max=OUTPUT_COUNT_MAX)
 
-    TOTAL_SUPPLY                = 2779530283277761
-    PRICE_PER_MIOTA_DOLLAR      = 0.35
+#===============================================================================
+def getOutputSizeMax():
+    layout = getBlockLayout()
+    return layout.payloadSizeMax(), layout.outputsSizeMax(inputs=1)
 
-    BLOCK_SIZE_MAX              = 32768
-    METADATA_LENGTH_MAX         = 8192
-    NATIVE_TOKEN_COUNT_MAX      = 64
-    
-    WEIGHT_KEY                  = 10.0
-    WEIGHT_DATA                 = 1.0
+#===============================================================================
+def getExampleOutputs(output_size_max, weight_key, weight_data):
+    return outputs.GetExampleOutputs(output_size_max         = output_size_max,
+                                     native_token_count_max  = NATIVE_TOKEN_COUNT_MAX,
+                                     weight_key              = weight_key,
+                                     weight_data             = weight_data,
+                                     metadata_length_max     = METADATA_LENGTH_MAX,
+                                    )
 
-    MAXIMUM_DB_SIZES_GB         = [500.0, 1000.0, 2000.0]
-    FUND_SPARSITY_PERCENTAGES   = [20.0, 50.0]
-    
-    payload_size_max    = outputs.getPayloadSizeMax(block_size_max=BLOCK_SIZE_MAX)
-    output_size_max     = outputs.getOutputSizeMax(transaction_size_max=payload_size_max, inputs=1)
+#===============================================================================
+def getSchemaOutputs(output_size_max, weight_key, weight_data):
+    return schema_outputs.GetSchemaOutputs(output_size_max  = output_size_max,
+                                           weight_key       = weight_key,
+                                           weight_data      = weight_data,
+                                          )
+
+#===============================================================================
+# enumerates every combination of optional unlock conditions, features and native tokens of the example output types
+def enumerateOutputCombinationsStardust():
+    _, output_size_max = getOutputSizeMax()
+    return combinations.CombinationTable(output_size_max        = output_size_max,
+                                         native_token_count_max = NATIVE_TOKEN_COUNT_MAX,
+                                         metadata_length_max    = METADATA_LENGTH_MAX,
+                                        )
+
+#===============================================================================
+# solves for the most outputs, vbytes and storage growth a single block can cause with any combination of the example output types
+def solveBlockCapacityStardust(inputs=1):
+    table = enumerateOutputCombinationsStardust()
+    return block_capacity.BlockCapacity(layout              = getBlockLayout(),
+                                        models_count        = table.outputModels(weight_key=0.0,        weight_data=0.0,            weight_output=1.0),
+                                        models_v_bytes      = table.outputModels(weight_key=WEIGHT_KEY, weight_data=WEIGHT_DATA),
+                                        models_stored_bytes = table.outputModels(weight_key=1.0,        weight_data=1.0),
+                                        inputs              = inputs,
+                                       )
+
+#===============================================================================
+# computes the costs of the example outputs (or the outputs of the schema-tool schemas) for every combination of the given parameters at once
+def sweepDustProtectionCostsStardust(maximum_db_sizes_GB, fund_sparsity_percentages, prices_per_miota_dollar, weights_key, weights_data, use_schema_outputs=False):
+    _, output_size_max = getOutputSizeMax()
+    if use_schema_outputs:
+        # the schemas contain fields with other weights, so their vbytes are evaluated on the grid directly
+        names, v_bytes_max, byte_size_max = schema_outputs.getSchemaOutputBytes(output_size_max, weights_key, weights_data)
+    else:
+        names, key_bytes_max, data_bytes_max, byte_size_max = sweep.getOutputBytes(
+            lambda weight_key, weight_data: getExampleOutputs(output_size_max, weight_key, weight_data))
+        v_bytes_max = sweep.linearVBytesMax(key_bytes_max, data_bytes_max, weights_key, weights_data)
+
+    return sweep.CostSweep(names                        = names,
+                           v_bytes_max                  = v_bytes_max,
+                           byte_size_max                = byte_size_max,
+                           total_supply                 = TOTAL_SUPPLY,
+                           maximum_db_sizes_GB          = maximum_db_sizes_GB,
+                           fund_sparsity_percentages    = fund_sparsity_percentages,
+                           prices_per_miota_dollar      = prices_per_miota_dollar,
+                           weights_key                  = weights_key,
+                           weights_data                 = weights_data,
+                          )
+
+#===============================================================================
+def calculateDustProtectionCostsStardust(print_summary, create_plots, show_plots, use_schema_outputs=False):
+
+    payload_size_max, output_size_max = getOutputSizeMax()
 
     if print_summary:    
         print("Current market cap: %s" % (getDollarFormat((TOTAL_SUPPLY / 1000000.0) * PRICE_PER_MIOTA_DOLLAR)))
@@ -46,12 +116,20 @@ def calculateDustProtectionCostsStardust(print_summary, create_plots, show_plots
                 print("Maximum database size: %0.2fGB, fund sparsity percentage: %0.1f%%, database size increase: %0.2fGB" % (maximum_db_size_GB, fund_sparsity_percentage, maximum_db_size_GB*sparsity_factor))
                 print("Costs for the fund sparsity (%0.2f GB database increase): %0.2fMi, %s (at %0.2f$/Mi price)" % (sparsity_db_size_increase_GB, sparsity_distribution_costs_iota / 1000000.0, getDollarFormat(sparsity_distribution_costs_dollar), PRICE_PER_MIOTA_DOLLAR))
 
-    vbytes_outputs = outputs.GetExampleOutputs(output_size_max         = output_size_max,
-                                               native_token_count_max  = NATIVE_TOKEN_COUNT_MAX,
-                                               weight_key              = WEIGHT_KEY,
-                                               weight_data             = WEIGHT_DATA,
-                                               metadata_length_max     = METADATA_LENGTH_MAX,
-                                              )
+    if use_schema_outputs:
+        vbytes_outputs = getSchemaOutputs(output_size_max, weight_key=WEIGHT_KEY, weight_data=WEIGHT_DATA)
+    else:
+        vbytes_outputs = getExampleOutputs(output_size_max, weight_key=WEIGHT_KEY, weight_data=WEIGHT_DATA)
+
+    # the summary is the view of the sweep at the current price and weights
+    costs = sweepDustProtectionCostsStardust(maximum_db_sizes_GB         = MAXIMUM_DB_SIZES_GB,
+                                             fund_sparsity_percentages   = FUND_SPARSITY_PERCENTAGES,
+                                             prices_per_miota_dollar     = [PRICE_PER_MIOTA_DOLLAR],
+                                             weights_key                 = [WEIGHT_KEY],
+                                             weights_data                = [WEIGHT_DATA],
+                                             use_schema_outputs          = use_schema_outputs,
+                                            )
+    costs_per_output_dollar = costs.costPerOutputDollar()
 
     for i, vbytes in enumerate(vbytes_outputs):
         if print_summary:
@@ -67,20 +145,16 @@ def calculateDustProtectionCostsStardust(print_summary, create_plots, show_plots
         sub_plots.append(plot.Subplot(row_index=vbytes.plot_row_index, column_index=vbytes.plot_column_index, x_label='assumed fund sparsity percentage',   y1_label='cost per %s [MIOTA]' % (vbytes.name_plot)))
         sub_plots.append(plot.Subplot(row_index=vbytes.plot_row_index+1, column_index=vbytes.plot_column_index, x_label='assumed fund sparsity percentage', y1_label='actual max. DB size at\n 100% fund sparsity perc. [GB]', legend_y1_loc='upper right'))
 
-        for maximum_db_size_GB in MAXIMUM_DB_SIZES_GB:
+        for d, maximum_db_size_GB in enumerate(MAXIMUM_DB_SIZES_GB):
             
             x  = []
             y1 = []
             y2 = []
-            for fund_sparsity_percentage in FUND_SPARSITY_PERCENTAGES:
-                db_size_bytes           = maximum_db_size_GB * 1e9
-                sparsity_factor         = (fund_sparsity_percentage / 100.0)
-                cost_per_byte_iota      = int((TOTAL_SUPPLY / float(db_size_bytes)) * sparsity_factor)
-
-                cost_per_output_iota    = cost_per_byte_iota * vbytes.vBytesMax()
-                cost_per_output_dollar  = (cost_per_output_iota / 1000000.0) * PRICE_PER_MIOTA_DOLLAR
-                
-                total_outputs_size_GB   = (int(TOTAL_SUPPLY / cost_per_output_iota) * vbytes.byteSizeMax()) / 1e9
+            for s, fund_sparsity_percentage in enumerate(FUND_SPARSITY_PERCENTAGES):
+                cost_per_byte_iota      = int(costs.cost_per_byte_iota[d, s])
+                cost_per_output_iota    = float(costs.cost_per_output_iota[i, d, s, 0, 0])
+                cost_per_output_dollar  = float(costs_per_output_dollar[i, d, s, 0, 0, 0])
+                total_outputs_size_GB   = float(costs.total_outputs_size_GB[i, d, s, 0, 0])
 
                 x.append(fund_sparsity_percentage)
                 y1.append(cost_per_output_iota / float(1e6))
@@ -94,6 +168,44 @@ def calculateDustProtectionCostsStardust(print_summary, create_plots, show_plots
         plot.plot(sub_plots, plot_lines, show_plot=show_plots, file_path="plots/deposit_miota_%s.jpg" % (vbytes.name.replace(" ", "_")))
     return vbytes_outputs
 
+#===============================================================================
+# parses "start:stop:num" (evenly spaced, stop included) or comma separated values
+def parseGrid(value):
+    if ":" in value:
+        start, stop, num = value.split(":")
+        return np.linspace(float(start), float(stop), int(num))
+    return np.array([float(v) for v in value.split(",")])
+
 #===============================================================================
 if __name__ == '__main__':
-    calculateDustProtectionCostsStardust(print_summary=True, create_plots=True, show_plots=True)
+    parser = argparse.ArgumentParser(description="Calculates the dust protection costs of the Stardust outputs.")
+    parser.add_argument("--sweep",              type=str,       default=None,                                                   help="Computes the costs for every combination of the grid below and writes them to the given .csv or .npz file instead of printing the summary.")
+    parser.add_argument("--db-sizes",           type=parseGrid, default=np.array(MAXIMUM_DB_SIZES_GB),                          help="Maximum database sizes in GB, e.g. 100:5000:50 or 500,1000.")
+    parser.add_argument("--sparsities",         type=parseGrid, default=np.array(FUND_SPARSITY_PERCENTAGES),                    help="Fund sparsity percentages.")
+    parser.add_argument("--prices",             type=parseGrid, default=np.array([PRICE_PER_MIOTA_DOLLAR]),                     help="Prices per MIOTA in dollar.")
+    parser.add_argument("--weights-key",        type=parseGrid, default=np.array([WEIGHT_KEY]),                                 help="Weights of key fields.")
+    parser.add_argument("--weights-data",       type=parseGrid, default=np.array([WEIGHT_DATA]),                                help="Weights of data fields.")
+    parser.add_argument("--schema-outputs",     action="store_true",                                                            help="Uses the outputs of the schema-tool schemas instead of the hand-written example outputs.")
+    parser.add_argument("--combinations",       type=str,       default=None, nargs="?", const="",                              help="Prints the bytes and vbytes of every combination of optional unlock conditions, features and native tokens instead of the summary, and writes the table to the given .npz file.")
+    parser.add_argument("--block-capacity",     type=int,       default=None, nargs="?", const=1,                               help="Prints the most outputs, vbytes and storage growth a single block with the given number of inputs can cause instead of the summary.")
+    args = parser.parse_args()
+
+    if args.block_capacity != None:
+        solveBlockCapacityStardust(inputs=args.block_capacity).summary()
+    elif args.combinations != None:
+        table = enumerateOutputCombinationsStardust()
+        table.summary(weight_key=WEIGHT_KEY, weight_data=WEIGHT_DATA)
+        if args.combinations != "":
+            table.saveNpz(args.combinations)
+    elif args.sweep == None:
+        calculateDustProtectionCostsStardust(print_summary=True, create_plots=True, show_plots=True, use_schema_outputs=args.schema_outputs)
+    else:
+        costs = sweepDustProtectionCostsStardust(maximum_db_sizes_GB        = args.db_sizes,
+                                                 fund_sparsity_percentages  = args.sparsities,
+                                                 prices_per_miota_dollar    = args.prices,
+                                                 weights_key                = args.weights_key,
+                                                 weights_data               = args.weights_data,
+                                                 use_schema_outputs         = args.schema_outputs,
+                                                )
+        costs.save(args.sweep)
+        print("Wrote the costs of %d outputs for %d parameter combinations to %s" % (len(costs.names), costs.cost_per_output_iota[0].size * len(costs.prices_per_miota_dollar), args.sweep))
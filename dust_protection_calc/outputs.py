@@ -1,38 +1,15 @@
 # -*- coding: utf-8 -*-
+import block_capacity
 
 #===============================================================================
 # returns the maximum possible size of a payload
 def getPayloadSizeMax(block_size_max):
-    payload_size_max = block_size_max
-    payload_size_max -= 1               # ProtocolVersion
-    payload_size_max -= 1               # ParentCount
-    payload_size_max -= 32              # Parent
-    payload_size_max -= 4               # PayloadLength
-                                        # Placeholder for Payload
-    payload_size_max -= 8               # Nonce
-    
-    return payload_size_max
+    return block_capacity.BlockLayout(block_size_max=block_size_max).payloadSizeMax()
 
 #===============================================================================
 # returns the maximum possible size of an output
 def getOutputSizeMax(transaction_size_max, inputs=1):
-    output_size_max = transaction_size_max
-    output_size_max -= 4                # Payload Type
-    output_size_max -= 1                # Transaction Type
-    output_size_max -= 8                # NetworkID
-    output_size_max -= 2                # Inputs Count
-    for i in range(inputs):
-        output_size_max -= (1+32+2)     # 1x UTXO Input (Input Type + Transaction ID + Transaction Output Index)
-    output_size_max -= 32               # Inputs Commitment
-    output_size_max -= 2                # Outputs Count
-                                        # Placeholder for Outputs
-    output_size_max -= 4                # Payload Length
-                                        # Placeholder for Payload
-    output_size_max -= 2                # Unlock Blocks Count
-    for i in range(inputs):
-        output_size_max -= (1+1+32+64)  # 1x Unlock Blocks (Unlock Type - Signature Type + Public key + Signature)    
-    
-    return output_size_max
+    return block_capacity.getOutputsSizeMax(payload_size_max=transaction_size_max, inputs=inputs)
 
 #===============================================================================
 class Output_VBytes(object):
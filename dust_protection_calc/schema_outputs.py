@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import numpy as np
+import outputs
+
+# the schemas of the current protocol are modeled by the schema-tool next to this directory
+SCHEMA_TOOL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "schema-tool")
+if SCHEMA_TOOL_PATH not in sys.path:
+    sys.path.append(SCHEMA_TOOL_PATH)
+
+from generation.deposit_coefficients import WEIGHT_INDEX, compileDeposit
+from schemas import loadSchema
+from schemas.common import OutputOffset
+from typedefs.deposit_weight import DepositWeight, RentStructure
+
+OUTPUT_SCHEMA_NAMES = ["Basic Output", "Account Output", "Anchor Output", "NFT Output", "Foundry Output", "Delegation Output"]
+
+#===============================================================================
+class SchemaLayout(object):
+    # the vbyte layout of an output schema, including the offset that is stored for every output.
+    # every row of minimum and maximum holds the bytes per deposit weight of one candidate layout,
+    # the vbytes are the minimum (maximum) over the rows for the given weights.
+
+    #---------------------------------------------------------------------------
+    def __init__(self, schema):
+        coefficients        = compileDeposit(OutputOffset) + compileDeposit(schema)
+
+        self.name           = schema.name
+        self.minimum        = coefficients.minimum
+        self.maximum        = coefficients.maximum
+        self.byte_size_min  = int(self.minimum.sum(axis=1).min())
+        self.byte_size_max  = int(self.maximum.sum(axis=1).max())
+
+    #---------------------------------------------------------------------------
+    # returns the weights in the order of the layout columns, shape (..., weights)
+    @staticmethod
+    def weightVectors(weight_key, weight_data, weight_block_issuer_key=None, weight_staking=None, weight_delegation=None):
+        rent_structure = RentStructure(block_issuer_key=weight_block_issuer_key, staking=weight_staking, delegation=weight_delegation)
+
+        weight_key, weight_data = np.broadcast_arrays(np.asarray(weight_key, dtype=np.float64), np.asarray(weight_data, dtype=np.float64))
+        weights = np.empty(weight_key.shape + (len(WEIGHT_INDEX),), dtype=np.float64)
+        for weight, index in WEIGHT_INDEX.items():
+            weights[..., index] = rent_structure.weight(weight)
+        weights[..., WEIGHT_INDEX[DepositWeight.Key]]  = weight_key
+        weights[..., WEIGHT_INDEX[DepositWeight.Data]] = weight_data
+        return weights
+
+    #---------------------------------------------------------------------------
+    # returns the minimum vbytes for every combination of the given weights, which are broadcast against each other
+    def vBytesMin(self, weight_key, weight_data, weight_block_issuer_key=None, weight_staking=None, weight_delegation=None):
+        weights = self.weightVectors(weight_key, weight_data, weight_block_issuer_key, weight_staking, weight_delegation)
+        return (weights @ self.minimum.T).min(axis=-1)
+
+    #---------------------------------------------------------------------------
+    # returns the maximum vbytes for every combination of the given weights, which are broadcast against each other
+    def vBytesMax(self, weight_key, weight_data, weight_block_issuer_key=None, weight_staking=None, weight_delegation=None):
+        weights = self.weightVectors(weight_key, weight_data, weight_block_issuer_key, weight_staking, weight_delegation)
+        return (weights @ self.maximum.T).max(axis=-1)
+
+#===============================================================================
+# layouts are compiled once per schema name
+SCHEMA_LAYOUTS = {}
+
+def getSchemaLayout(schema_name):
+    layout = SCHEMA_LAYOUTS.get(schema_name)
+    if layout == None:
+        schema = loadSchema(schema_name)
+        if schema == None:
+            raise Exception("No schema with name: %s" % (schema_name))
+        layout = SchemaLayout(schema)
+        SCHEMA_LAYOUTS[schema_name] = layout
+    return layout
+
+#===============================================================================
+def getVBytes_Schema(schema_name,
+                     weight_key,
+                     weight_data,
+                     output_size_max,
+                     additional_name=None,
+                    ):
+
+    name        = schema_name.replace(" ", "")
+    name_plot   = name
+    if additional_name != None:
+        name        = "%s (%s)" %  (name, additional_name)
+        name_plot   = "%s\n(%s)" % (name_plot, additional_name)
+
+    vbytes = outputs.Output_VBytes(name                = name,
+                                   name_plot           = name_plot,
+                                   max_byte_size       = output_size_max,
+                                   weight_key          = weight_key,
+                                   weight_data         = weight_data,
+                                   metadata_length_max = None)
+
+    layout = getSchemaLayout(schema_name)
+    if layout.byte_size_max > output_size_max:
+        raise Exception("Output too big: %s, Current: %d, Max: %d" % (name, layout.byte_size_max, output_size_max))
+
+    vbytes.byte_size_max    = layout.byte_size_max
+    vbytes.v_bytes_min      = float(layout.vBytesMin(weight_key, weight_data))
+    vbytes.v_bytes_max      = float(layout.vBytesMax(weight_key, weight_data))
+
+    return vbytes
+
+#===============================================================================
+def GetSchemaOutputs(output_size_max,
+                     weight_key,
+                     weight_data,
+                    ):
+
+    return [getVBytes_Schema(schema_name        = schema_name,
+                             weight_key         = weight_key,
+                             weight_data        = weight_data,
+                             output_size_max    = output_size_max,
+                            ) for schema_name in OUTPUT_SCHEMA_NAMES]
+
+#===============================================================================
+# returns the names, the maximum vbytes [output, weight key, weight data] and the maximum byte size of the outputs
+def getSchemaOutputBytes(output_size_max, weights_key, weights_data, schema_names=OUTPUT_SCHEMA_NAMES):
+    layouts         = [getSchemaLayout(schema_name) for schema_name in schema_names]
+    for layout in layouts:
+        if layout.byte_size_max > output_size_max:
+            raise Exception("Output too big: %s, Current: %d, Max: %d" % (layout.name, layout.byte_size_max, output_size_max))
+
+    names           = [schema_name.replace(" ", "") for schema_name in schema_names]
+    weights_key     = np.asarray(weights_key, dtype=np.float64)[:, None]
+    weights_data    = np.asarray(weights_data, dtype=np.float64)[None, :]
+    v_bytes_max     = np.stack([layout.vBytesMax(weights_key, weights_data) for layout in layouts])
+    byte_size_max   = np.array([layout.byte_size_max for layout in layouts], dtype=np.int64)
+
+    return names, v_bytes_max, byte_size_max
+
+#===============================================================================
+if __name__ == '__main__':
+    WEIGHT_KEY              = 10.0
+    WEIGHT_DATA             = 1.0
+
+    payload_size_max        = outputs.getPayloadSizeMax(block_size_max=32768)
+    output_size_max         = outputs.getOutputSizeMax(transaction_size_max=payload_size_max, inputs=1)
+
+    for vbytes in GetSchemaOutputs(output_size_max, weight_key=WEIGHT_KEY, weight_data=WEIGHT_DATA):
+        vbytes.summary()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+#===============================================================================
+# returns the names, the maximum key bytes, the maximum data bytes and the maximum byte size of the outputs.
+# the vbytes of an output are linear in the weights, so evaluating the outputs once per weight
+# is enough to get the vbytes for any combination of weights.
+def getOutputBytes(get_outputs):
+    outputs_key     = get_outputs(weight_key=1.0, weight_data=0.0)
+    outputs_data    = get_outputs(weight_key=0.0, weight_data=1.0)
+
+    names           = [vbytes.name for vbytes in outputs_key]
+    key_bytes_max   = np.array([vbytes.vBytesMax() for vbytes in outputs_key], dtype=np.float64)
+    data_bytes_max  = np.array([vbytes.vBytesMax() for vbytes in outputs_data], dtype=np.float64)
+    byte_size_max   = np.array([vbytes.byteSizeMax() for vbytes in outputs_key], dtype=np.int64)
+
+    return names, key_bytes_max, data_bytes_max, byte_size_max
+
+#===============================================================================
+# returns the maximum vbytes [output, weight key, weight data] of outputs that are linear in the weights
+def linearVBytesMax(key_bytes_max, data_bytes_max, weights_key, weights_data):
+    return np.asarray(key_bytes_max, dtype=np.float64)[:, None, None] * np.asarray(weights_key, dtype=np.float64)[None, :, None] \
+         + np.asarray(data_bytes_max, dtype=np.float64)[:, None, None] * np.asarray(weights_data, dtype=np.float64)[None, None, :]
+
+#===============================================================================
+class CostSweep(object):
+    # the axes of the cost tensors, the price only applies to the costs in dollar
+    AXES = ("output", "maximum_db_size_GB", "fund_sparsity_percentage", "weight_key", "weight_data")
+
+    #---------------------------------------------------------------------------
+    # v_bytes_max holds the maximum vbytes of every output for every combination of the weights [output, weight key, weight data]
+    def __init__(self, names, v_bytes_max, byte_size_max, total_supply, maximum_db_sizes_GB, fund_sparsity_percentages, prices_per_miota_dollar, weights_key, weights_data):
+        self.names                      = list(names)
+        self.total_supply               = total_supply
+        self.maximum_db_sizes_GB        = np.asarray(maximum_db_sizes_GB, dtype=np.float64)
+        self.fund_sparsity_percentages  = np.asarray(fund_sparsity_percentages, dtype=np.float64)
+        self.prices_per_miota_dollar    = np.asarray(prices_per_miota_dollar, dtype=np.float64)
+        self.weights_key                = np.asarray(weights_key, dtype=np.float64)
+        self.weights_data               = np.asarray(weights_data, dtype=np.float64)
+        self.byte_size_max              = np.asarray(byte_size_max, dtype=np.int64)
+
+        # [db size, sparsity], the same operations as the scalar calculation, so the results are identical
+        db_size_bytes                   = self.maximum_db_sizes_GB[:, None] * 1e9
+        sparsity_factor                 = self.fund_sparsity_percentages[None, :] / 100.0
+        self.cost_per_byte_iota         = np.floor((total_supply / db_size_bytes) * sparsity_factor)
+
+        # [output, weight key, weight data]
+        self.v_bytes_max                = np.asarray(v_bytes_max, dtype=np.float64)
+        if self.v_bytes_max.shape != (len(self.names), len(self.weights_key), len(self.weights_data)):
+            raise Exception("Wrong shape of the vbytes: %s" % (str(self.v_bytes_max.shape)))
+
+        # [output, db size, sparsity, weight key, weight data]
+        self.cost_per_output_iota       = self.cost_per_byte_iota[None, :, :, None, None] * self.v_bytes_max[:, None, None, :, :]
+        with np.errstate(divide='ignore'):
+            # a cost of 0 allows an unlimited number of outputs
+            total_outputs               = np.floor(total_supply / self.cost_per_output_iota)
+        self.total_outputs_size_GB      = (total_outputs * self.byte_size_max[:, None, None, None, None]) / 1e9
+
+    #---------------------------------------------------------------------------
+    # [output, db size, sparsity, price, weight key, weight data]
+    def costPerOutputDollar(self):
+        return (self.cost_per_output_iota / 1000000.0)[:, :, :, None, :, :] * self.prices_per_miota_dollar[None, None, None, :, None, None]
+
+    #---------------------------------------------------------------------------
+    def shape(self):
+        return self.cost_per_output_iota.shape
+
+    #---------------------------------------------------------------------------
+    def saveNpz(self, file_path):
+        np.savez(file_path,
+                 names                       = np.array(self.names),
+                 maximum_db_sizes_GB         = self.maximum_db_sizes_GB,
+                 fund_sparsity_percentages   = self.fund_sparsity_percentages,
+                 prices_per_miota_dollar     = self.prices_per_miota_dollar,
+                 weights_key                 = self.weights_key,
+                 weights_data                = self.weights_data,
+                 byte_size_max               = self.byte_size_max,
+                 cost_per_byte_iota          = self.cost_per_byte_iota,
+                 v_bytes_max                 = self.v_bytes_max,
+                 cost_per_output_iota        = self.cost_per_output_iota,
+                 total_outputs_size_GB       = self.total_outputs_size_GB,
+                )
+
+    #---------------------------------------------------------------------------
+    # writes one row per output and combination of parameters
+    def saveCsv(self, file_path):
+        with open(file_path, "w") as f:
+            f.write("name,maximum_db_size_GB,fund_sparsity_percentage,price_per_miota_dollar,weight_key,weight_data,cost_per_byte_iota,v_bytes_max,cost_per_output_iota,cost_per_output_dollar,total_outputs_size_GB\n")
+
+            grid = list(np.meshgrid(self.maximum_db_sizes_GB, self.fund_sparsity_percentages, self.prices_per_miota_dollar, self.weights_key, self.weights_data, indexing='ij'))
+            shape = grid[0].shape
+            cost_per_byte_iota = np.broadcast_to(self.cost_per_byte_iota[:, :, None, None, None], shape)
+
+            # one output at a time, so only the rows of one output are in memory at once
+            for i, name in enumerate(self.names):
+                columns = grid + [
+                    cost_per_byte_iota,
+                    np.broadcast_to(self.v_bytes_max[i][None, None, None, :, :], shape),
+                    np.broadcast_to(self.cost_per_output_iota[i][:, :, None, :, :], shape),
+                    (self.cost_per_output_iota[i] / 1000000.0)[:, :, None, :, :] * self.prices_per_miota_dollar[None, None, :, None, None],
+                    np.broadcast_to(self.total_outputs_size_GB[i][:, :, None, :, :], shape),
+                ]
+                rows = np.stack([column.ravel() for column in columns], axis=1)
+                # the quoted name is part of the format of the first column, so percent signs have to be escaped
+                name_column = '"%s"' % name.replace('"', '""').replace('%', '%%')
+                np.savetxt(f, rows, fmt=[name_column + ",%.15g"] + ["%.15g"] * (len(columns) - 1), delimiter=",")
+
+    #---------------------------------------------------------------------------
+    def save(self, file_path):
+        if file_path.endswith(".npz"):
+            self.saveNpz(file_path)
+        else:
+            self.saveCsv(file_path)
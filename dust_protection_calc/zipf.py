@@ -1,26 +1,79 @@
 # -*- coding: utf-8 -*-
-import math
+import numpy as np
 import plot
 
+# the number of addresses that are generated at once, which bounds the memory of the streaming functions
+ZIPF_CHUNK_SIZE = 1 << 20
+
+# integer values are exact in float64 up to this value
+ZIPF_INTEGER_TOTAL_VALUE_MAX = 1 << 53
+
+#===============================================================================
+# returns the zipf weights (rank ** -zipf_coefficient) of the addresses from start to stop
+def zipf_weights(start, stop, zipf_coefficient):
+    return np.power(np.arange(start+1, stop+1, dtype=np.float64), -zipf_coefficient)
+
+#===============================================================================
+# returns the running sums of the weights of the addresses from start to stop, continuing from weight_sum.
+# the sums are added one after another, so every caller gets the same sums for the same chunks.
+def zipf_cumulative_weights(weight_sum, start, stop, zipf_coefficient):
+    weights     = zipf_weights(start, stop, zipf_coefficient)
+    weights[0]  += weight_sum
+    return np.cumsum(weights)
+
+#===============================================================================
+# returns (start, stop) of every chunk
+def zipf_chunks(address_count, chunk_size):
+    for start in range(0, address_count, chunk_size):
+        yield start, min(start+chunk_size, address_count)
+
+#===============================================================================
+# returns the sum of the weights of all addresses
+def zipf_weight_total(address_count, zipf_coefficient, chunk_size=ZIPF_CHUNK_SIZE):
+    weight_sum = 0.0
+    for start, stop in zipf_chunks(address_count, chunk_size):
+        weight_sum = zipf_cumulative_weights(weight_sum, start, stop, zipf_coefficient)[-1]
+    return weight_sum
+
 #===============================================================================
-def zipf_distribution_scaled(addresses, zipf_coefficient, total_value):
-    m = {}
+# yields the values of the addresses ordered by rank, one chunk at a time.
+# integer values are the differences of the rounded cumulative values, so they are never negative, every value
+# is within about one of its exact value and the values add up to exactly total_value.
+def zipf_distribution_chunks(address_count, zipf_coefficient, total_value, integer=False, chunk_size=ZIPF_CHUNK_SIZE):
+    if integer and (total_value >= ZIPF_INTEGER_TOTAL_VALUE_MAX):
+        raise Exception("Total value too big for exact integer values: %d, Max: %d" % (total_value, ZIPF_INTEGER_TOTAL_VALUE_MAX-1))
 
-    y_total = 0
-    scaling_factor = math.pow(10, 10)
-    for i, p in enumerate(addresses):
-    	m[p] = math.pow(float(i+1), -zipf_coefficient) * scaling_factor
-    	y_total += m[p]
+    weight_total    = zipf_weight_total(address_count, zipf_coefficient, chunk_size)
+    weight_sum      = 0.0
+    value_sum       = 0
+    for start, stop in zipf_chunks(address_count, chunk_size):
+        if not integer:
+            yield zipf_weights(start, stop, zipf_coefficient) * (total_value / weight_total)
+            continue
 
-    for i, p in enumerate(addresses):
-         m[p] = (m[p] / float(y_total)) *  total_value
+        cumulative_weights  = zipf_cumulative_weights(weight_sum, start, stop, zipf_coefficient)
+        weight_sum          = cumulative_weights[-1]
 
-    return m
+        # the last cumulative weight is weight_total, so the last cumulative value is exactly total_value
+        cumulative_values   = np.rint(total_value * (cumulative_weights / weight_total)).astype(np.int64)
+        values              = np.diff(cumulative_values, prepend=value_sum)
+        value_sum           = int(cumulative_values[-1])
+        yield values.astype(np.uint64)
+
+#===============================================================================
+# returns the values of the addresses ordered by rank as a float64 array, or as an uint64 array that adds up to
+# exactly total_value if integer is set. addresses is either the number of addresses or a list of them.
+def zipf_distribution_scaled(addresses, zipf_coefficient, total_value, integer=False, chunk_size=ZIPF_CHUNK_SIZE):
+    address_count   = addresses if isinstance(addresses, (int, np.integer)) else len(addresses)
+    values          = np.empty(address_count, dtype=np.uint64 if integer else np.float64)
+    for start, chunk in zip(range(0, address_count, chunk_size), zipf_distribution_chunks(address_count, zipf_coefficient, total_value, integer, chunk_size)):
+        values[start:start+len(chunk)] = chunk
+    return values
 
 #===============================================================================
 if __name__ == '__main__':
     total_supply = 2779530283277761
-    
+
     zipf_coefficients = {}
     zipf_coefficients["bitcoin"]  = 0.7628
     zipf_coefficients["ethereum"] = 0.756786
@@ -30,25 +83,15 @@ if __name__ == '__main__':
     zipf_coefficients["eos"]      = 0.536744
     zipf_coefficients["tron"]     = 1.02043
 
-    identities = []
-    for i in range(0, 1000, 1):
-        identities.append(i)
+    identities = np.arange(1000)
 
     sub_plots  = [plot.Subplot(row_index=0, column_index=0, x_label='', y_label='balance')]
     plot_lines = []
 
 
     for zipf_coefficient_name in zipf_coefficients.keys():
-        zipf_dist = zipf_distribution_scaled(identities, zipf_coefficient=zipf_coefficients[zipf_coefficient_name], total_value=total_supply)
-
-        x = []
-        y = []
-        y_total = 0
-        for k in zipf_dist.keys():
-            x.append(k)
-            y.append(zipf_dist[k])
-            y_total += zipf_dist[k]
+        zipf_dist = zipf_distribution_scaled(len(identities), zipf_coefficient=zipf_coefficients[zipf_coefficient_name], total_value=total_supply)
 
-        plot_lines.append(plot.PlotLine(subplot_nr=0, x=x, y=y, name=zipf_coefficient_name))
+        plot_lines.append(plot.PlotLine(subplot_nr=0, x=identities, y=zipf_dist, name=zipf_coefficient_name))
 
     plot.plot(sub_plots, plot_lines)
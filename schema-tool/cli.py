@@ -1,22 +1,30 @@
 #!/usr/bin/python3
 
 import argparse
+from contextlib import contextmanager
+import csv
 from enum import Enum
 import os
 import re
-from typing import Optional, Tuple
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
 
 
-# Star import needed for all the structures to be initialized.
-from schemas import *
-from generation.deposit import generateSchemaDeposit
-from generation.schema import GenerationType, SchemaGen
-from generation.deposit_test import RunDepositCalculationTests
+# Schema modules are imported on demand, see loadSchema and loadAllSchemas.
+from schemas import loadAllSchemas, loadSchema
+from schemas.common import AVAILABLE_SCHEMAS
+from generation.deposit import DEPOSIT_CACHE, writeSchemaDeposit
+from typedefs.field import ALL_SCHEMAS, Schema
+from generation.schema import FRAGMENT_CACHE, GenerationType, SchemaGen
+from generation.cache_directory import defaultCatalogDirectory, defaultManifestPath
 
 
 class Commands(Enum):
     SCHEMA = "schema"
     DEPOSIT = "deposit"
+    SERVE = "serve"
+    CATALOG = "catalog"
     TEST = "test"
 
 
@@ -25,6 +33,16 @@ class SchemaCommands(Enum):
     REPLACE = "replace"
     LINKS = "links"
     UPDATE = "update"
+    UPDATE_ALL = "update-all"
+    UPDATE_AFFECTED = "update-affected"
+    WATCH = "watch"
+    STATS = "stats"
+    SIZE = "size"
+
+
+class CatalogCommands(Enum):
+    BUILD = "build"
+    LOOKUP = "lookup"
 
 
 schema_name_argument = "schema_name"
@@ -33,8 +51,53 @@ dry_run_argument = "dry_run"
 dry_run_help = "Does not print the result when set to true."
 tips_repo_path_argument = "tips_repo_path"
 tips_repo_path_help = "The path to the tips repo."
+schema_names_argument = "schema_names"
+schema_names_help = "The names of the changed schemas."
 tip_number_argument = "tip_number"
 tip_number_help = "The number of the to-be-updated TIP."
+manifest_argument = "manifest"
+manifest_help = "The path of the manifest that records the state of previously updated TIPs. Unchanged schemas are not regenerated."
+no_manifest_argument = "no_manifest"
+no_manifest_help = "Regenerates all schemas without reading or writing the manifest."
+jobs_argument = "jobs"
+jobs_help = "The number of worker processes. Defaults to the number of CPUs."
+cache_stats_argument = "cache_stats"
+cache_stats_help = "Prints the hit and miss counters of the cache."
+references_argument = "references"
+references_help = "Renders every embedded schema only the first time and links to it from later occurrences."
+output_argument = "output"
+limit_argument = "limit"
+limit_help = "Evaluates the size for the given values of a limit, e.g. MAX_INPUTS_COUNT=1,2,4 or MAX_INPUTS_COUNT=1:128 for a range. Can be given more than once, in which case every combination of values is evaluated."
+storage_score_argument = "storage_score"
+storage_score_help = "Computes the storage score with the default rent structure instead of the size in bytes."
+input_argument = "input"
+input_help = "Scores the outputs of a dump instead of generating a table. The dump is either a .jsonl file with one hex-encoded output per line, or a binary file in which every output is prefixed with its uint32 length. Without a schema name, all output types are accepted."
+output_help = "Writes the result to the given file instead of printing it."
+distribution_argument = "distribution"
+distribution_help = "Writes the (bytes, storage score, layouts) of every reachable size of the output as CSV instead of generating a table."
+histogram_argument = "histogram"
+catalog_argument = "catalog"
+catalog_help = "The directory of the catalog."
+rent_structure_argument = "rent_structure"
+rent_structure_help = "Precomputes the deposits for the rent structure with the given block issuer key, staking and delegation weights, e.g. 100,100,100. Can be given more than once. Defaults to the default rent structure."
+histogram_help = "Prints the number of layouts per storage score in the given number of bins after the distribution. Implies --distribution."
+
+
+def add_manifest_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        default=defaultManifestPath(),
+        help=manifest_help,
+        required=False,
+    )
+    parser.add_argument(
+        "--no-manifest",
+        action="store_true",
+        default=False,
+        help=no_manifest_help,
+        required=False,
+    )
 
 
 def add_schema_parser(subparsers: argparse._SubParsersAction):
@@ -57,10 +120,30 @@ def add_schema_parser(subparsers: argparse._SubParsersAction):
         SchemaCommands.UPDATE.value,
         help="Replaces all the existing schema tables in the TIP with the newly created ones. The path to TIP repo and the TIP number must be given. All the schemas defined in that TIP will be updated.",
     )
+    update_all_parser = schema_subparsers.add_parser(
+        SchemaCommands.UPDATE_ALL.value,
+        help="Replaces all the existing schema tables in all TIPs with the newly created ones. The path to the tips repo must be given. The TIPs are updated in parallel.",
+    )
+    update_affected_parser = schema_subparsers.add_parser(
+        SchemaCommands.UPDATE_AFFECTED.value,
+        help="Replaces the tables of the given schemas and of all schemas that embed them, in every TIP that contains such a table. The path to the tips repo must be given. Other tables and TIPs are not touched.",
+    )
+    watch_parser = schema_subparsers.add_parser(
+        SchemaCommands.WATCH.value,
+        help="Keeps running and regenerates the affected tables in the TIPs whenever a schema module or a TIP file changes. The path to the tips repo must be given.",
+    )
     links_parser = schema_subparsers.add_parser(
         SchemaCommands.LINKS.value,
         help="Replaces all links to local TIPs with links to the TIPs hosted on GitHub, subject to a hardcoded whitelist of unmerged TIPs.",
     )
+    stats_parser = schema_subparsers.add_parser(
+        SchemaCommands.STATS.value,
+        help="Prints the number of schemas and the memory they retain.",
+    )
+    size_parser = schema_subparsers.add_parser(
+        SchemaCommands.SIZE.value,
+        help="Prints the minimum and maximum size of the schema as a function of the protocol limits, and evaluates it for other values of the limits.",
+    )
 
     generate_parser.add_argument(
         schema_name_argument,
@@ -75,6 +158,28 @@ def add_schema_parser(subparsers: argparse._SubParsersAction):
         help=dry_run_help,
         required=False,
     )
+    generate_parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        default=False,
+        help=cache_stats_help,
+        required=False,
+    )
+    generate_parser.add_argument(
+        "--references",
+        action="store_true",
+        default=False,
+        help=references_help,
+        required=False,
+    )
+    generate_parser.add_argument(
+        "--output",
+        "-o",
+        type=str,
+        default=None,
+        help=output_help,
+        required=False,
+    )
 
     replace_parser.add_argument(
         tips_repo_path_argument,
@@ -98,6 +203,104 @@ def add_schema_parser(subparsers: argparse._SubParsersAction):
         help=tip_number_help,
     )
 
+    update_all_parser.add_argument(
+        tips_repo_path_argument,
+        type=str,
+        help=tips_repo_path_help,
+    )
+    add_manifest_arguments(replace_parser)
+    add_manifest_arguments(update_parser)
+    add_manifest_arguments(update_all_parser)
+    update_all_parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=None,
+        help=jobs_help,
+        required=False,
+    )
+
+    update_affected_parser.add_argument(
+        tips_repo_path_argument,
+        type=str,
+        help=tips_repo_path_help,
+    )
+    update_affected_parser.add_argument(
+        schema_names_argument,
+        type=str,
+        nargs="+",
+        help=schema_names_help,
+    )
+    add_manifest_arguments(update_affected_parser)
+    update_affected_parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=None,
+        help=jobs_help,
+        required=False,
+    )
+    update_affected_parser.add_argument(
+        "--dry-run",
+        "-d",
+        action="store_true",
+        default=False,
+        help="Only prints the affected tables without updating them.",
+        required=False,
+    )
+
+    watch_parser.add_argument(
+        tips_repo_path_argument,
+        type=str,
+        help=tips_repo_path_help,
+    )
+    add_manifest_arguments(watch_parser)
+    watch_parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.5,
+        help="The number of seconds between two checks for changed files.",
+        required=False,
+    )
+
+    stats_parser.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        default=False,
+        help="Traces the memory allocated while loading the schemas and prints it per source file.",
+        required=False,
+    )
+
+    size_parser.add_argument(
+        schema_name_argument,
+        type=str,
+        help=schema_name_help,
+    )
+    size_parser.add_argument(
+        "--limit",
+        "-l",
+        type=parseLimitValues,
+        action="append",
+        default=[],
+        help=limit_help,
+        required=False,
+    )
+    size_parser.add_argument(
+        "--storage-score",
+        action="store_true",
+        default=False,
+        help=storage_score_help,
+        required=False,
+    )
+    size_parser.add_argument(
+        "--output",
+        "-o",
+        type=str,
+        default=None,
+        help=output_help,
+        required=False,
+    )
+
     links_parser.add_argument(
         tips_repo_path_argument,
         type=str,
@@ -110,6 +313,47 @@ def add_schema_parser(subparsers: argparse._SubParsersAction):
     )
 
 
+def add_catalog_parser(subparsers: argparse._SubParsersAction):
+    catalog_parser = subparsers.add_parser(
+        Commands.CATALOG.value, help="Catalog operations."
+    )
+
+    catalog_subparsers = catalog_parser.add_subparsers(
+        title="Catalog Commands", dest="catalog_operation", required=True
+    )
+
+    build_parser = catalog_subparsers.add_parser(
+        CatalogCommands.BUILD.value,
+        help="Writes all schemas with their sizes and deposits to a JSON catalog and a binary snapshot, which can be used without importing the schema modules.",
+    )
+    lookup_parser = catalog_subparsers.add_parser(
+        CatalogCommands.LOOKUP.value,
+        help="Prints the precomputed size and deposits of a schema from the binary snapshot.",
+    )
+
+    for parser in [build_parser, lookup_parser]:
+        parser.add_argument(
+            "--catalog",
+            type=str,
+            default=defaultCatalogDirectory(),
+            help=catalog_help,
+            required=False,
+        )
+    build_parser.add_argument(
+        "--rent-structure",
+        type=parseRentStructure,
+        action="append",
+        default=[],
+        help=rent_structure_help,
+        required=False,
+    )
+    lookup_parser.add_argument(
+        schema_name_argument,
+        type=str,
+        help="The name of the schema to look up.",
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(description="Schema Tool CLI")
 
@@ -118,6 +362,7 @@ def main():
     )
 
     add_schema_parser(subparsers)
+    add_catalog_parser(subparsers)
 
     deposit_parser = subparsers.add_parser(
         Commands.DEPOSIT.value, help="Generate deposit schema."
@@ -125,8 +370,40 @@ def main():
     deposit_parser.add_argument(
         "schema_name",
         type=str,
+        nargs="?",
+        default=None,
         help="The name of the schema to generate.",
     )
+    deposit_parser.add_argument(
+        "--input",
+        "-i",
+        type=str,
+        default=None,
+        help=input_help,
+        required=False,
+    )
+    deposit_parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=None,
+        help=jobs_help,
+        required=False,
+    )
+    deposit_parser.add_argument(
+        "--distribution",
+        action="store_true",
+        default=False,
+        help=distribution_help,
+        required=False,
+    )
+    deposit_parser.add_argument(
+        "--histogram",
+        type=int,
+        default=None,
+        help=histogram_help,
+        required=False,
+    )
     deposit_parser.add_argument(
         "--dry-run",
         "-d",
@@ -135,6 +412,40 @@ def main():
         help=dry_run_help,
         required=False,
     )
+    deposit_parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        default=False,
+        help=cache_stats_help,
+        required=False,
+    )
+    deposit_parser.add_argument(
+        "--output",
+        "-o",
+        type=str,
+        default=None,
+        help=output_help,
+        required=False,
+    )
+
+    serve_parser = subparsers.add_parser(
+        Commands.SERVE.value,
+        help="Keeps the schemas loaded and answers size, deposit and schema queries as JSON-RPC over HTTP.",
+    )
+    serve_parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="The address to listen on.",
+        required=False,
+    )
+    serve_parser.add_argument(
+        "--port",
+        type=int,
+        default=8080,
+        help="The port to listen on.",
+        required=False,
+    )
 
     subparsers.add_parser(Commands.TEST.value, help="Run tests.")
 
@@ -143,6 +454,9 @@ def main():
     schema_operation = None
     if hasattr(args, "schema_operation"):
         schema_operation = args.schema_operation
+    catalog_operation = None
+    if hasattr(args, "catalog_operation"):
+        catalog_operation = args.catalog_operation
     args = vars(args)
 
     match operation:
@@ -153,36 +467,111 @@ def main():
                         args[schema_name_argument],
                         GenerationType.Standalone,
                         dry_run=args[dry_run_argument],
+                        cache_stats=args[cache_stats_argument],
+                        output=args[output_argument],
+                        references=args[references_argument],
                     )
                 case SchemaCommands.REPLACE.value:
                     replaceSchemaCommand(
-                        args[schema_name_argument], args[tips_repo_path_argument]
+                        args[schema_name_argument],
+                        args[tips_repo_path_argument],
+                        load_manifest(args),
                     )
                 case SchemaCommands.UPDATE.value:
                     updateSchemaCommand(
-                        args[tips_repo_path_argument], args[tip_number_argument]
+                        args[tips_repo_path_argument],
+                        args[tip_number_argument],
+                        load_manifest(args),
+                    )
+                case SchemaCommands.UPDATE_ALL.value:
+                    updateAllSchemasCommand(
+                        args[tips_repo_path_argument],
+                        args[jobs_argument],
+                        load_manifest(args),
+                    )
+                case SchemaCommands.UPDATE_AFFECTED.value:
+                    updateAffectedSchemasCommand(
+                        args[tips_repo_path_argument],
+                        args[schema_names_argument],
+                        args[jobs_argument],
+                        load_manifest(args),
+                        dry_run=args[dry_run_argument],
+                    )
+                case SchemaCommands.WATCH.value:
+                    watchSchemasCommand(
+                        args[tips_repo_path_argument],
+                        args["interval"],
+                        load_manifest(args),
                     )
                 case SchemaCommands.LINKS.value:
                     replaceLinksCommand(
                         args[tips_repo_path_argument], args[tip_number_argument]
                     )
+                case SchemaCommands.STATS.value:
+                    schemaStatsCommand(args["tracemalloc"])
+                case SchemaCommands.SIZE.value:
+                    schemaSizeCommand(
+                        args[schema_name_argument],
+                        args[limit_argument],
+                        storage_score=args[storage_score_argument],
+                        output=args[output_argument],
+                    )
+        case Commands.DEPOSIT.value if args[input_argument] is not None:
+            scoreOutputsCommand(
+                args[input_argument],
+                args["schema_name"],
+                jobs=args[jobs_argument],
+                dry_run=args["dry_run"],
+                output=args[output_argument],
+            )
+        case Commands.DEPOSIT.value if args["schema_name"] is None:
+            parser.error("the schema name is required unless --input is given")
+        case Commands.DEPOSIT.value if (
+            args[distribution_argument] or args[histogram_argument] is not None
+        ):
+            sizeDistributionCommand(
+                args["schema_name"],
+                histogram=args[histogram_argument],
+                dry_run=args["dry_run"],
+                output=args[output_argument],
+            )
         case Commands.DEPOSIT.value:
-            generateDeposit(args["schema_name"], dry_run=args["dry_run"])
+            generateDeposit(
+                args["schema_name"],
+                dry_run=args["dry_run"],
+                cache_stats=args[cache_stats_argument],
+                output=args[output_argument],
+            )
+        case Commands.CATALOG.value:
+            match catalog_operation:
+                case CatalogCommands.BUILD.value:
+                    buildCatalogCommand(
+                        args[catalog_argument], args[rent_structure_argument]
+                    )
+                case CatalogCommands.LOOKUP.value:
+                    lookupCatalogCommand(
+                        args[catalog_argument], args[schema_name_argument]
+                    )
+        case Commands.SERVE.value:
+            serveCommand(args["host"], args["port"])
         case Commands.TEST.value:
-            RunDepositCalculationTests()
+            runTestsCommand()
         case _:
             parser.print_help()
 
 
-def find_schema(schema_name: str) -> Schema | None:
-    def find_schema(structure_name):
-        for struct in AVAILABLE_SCHEMAS:
-            if struct.name == structure_name:
-                return struct
+def load_manifest(args: dict) -> Optional["Manifest"]:
+    from generation.manifest import Manifest
+
+    if args[no_manifest_argument]:
         return None
+    return Manifest.load(args[manifest_argument])
 
-    schema = find_schema(schema_name)
+
+def find_schema(schema_name: str) -> Schema | None:
+    schema = loadSchema(schema_name)
     if schema is None:
+        loadAllSchemas()
         print(f"No schema with name `{schema_name}` exists.")
         print("Available schemas:")
         for schema in AVAILABLE_SCHEMAS:
@@ -192,30 +581,54 @@ def find_schema(schema_name: str) -> Schema | None:
         return schema
 
 
+@contextmanager
+def open_output(output: Optional[str], dry_run: bool):
+    """Opens the sink that generated HTML is written to, which is stdout unless an output path is given."""
+    if dry_run:
+        with open(os.devnull, "w") as sink:
+            yield sink
+    elif output is not None:
+        with open(output, "w") as sink:
+            yield sink
+            sink.write("\n")
+    else:
+        yield sys.stdout
+        sys.stdout.write("\n")
+
+
 def generateSchemaCommand(
     schema_name: str,
     generationType: GenerationType,
     dry_run: bool = False,
+    cache_stats: bool = False,
+    output: Optional[str] = None,
+    references: bool = False,
 ):
     schema = find_schema(schema_name)
     if schema is None:
         return
     else:
-        generated: str = SchemaGen().generateSchemaWithSummary(schema, generationType)
-        if not dry_run:
-            print(generated)
+        with open_output(output, dry_run) as sink:
+            SchemaGen(references=references).writeSchemaWithSummary(
+                schema, generationType, sink
+            )
+        if cache_stats:
+            print(FRAGMENT_CACHE)
 
 
 def replaceSchemaCommand(
     schema_name: str,
     tips_repo_path: str,
+    manifest: Optional["Manifest"] = None,
 ):
     schema = find_schema(schema_name)
     if schema is None:
         return
     else:
         if schema.tipRef is not None:
-            replaceSchema(tips_repo_path, schema.tipRef.tipNumber, [schema])
+            replaceSchema(
+                tips_repo_path, schema.tipRef.tipNumber, [schema], manifest
+            )
         else:
             print("Tip number on schema must be set for replacing.")
 
@@ -223,9 +636,11 @@ def replaceSchemaCommand(
 def updateSchemaCommand(
     tips_repo_path: str,
     tip_number_str: str,
+    manifest: Optional["Manifest"] = None,
 ):
     tip_number: int = int(tip_number_str)
 
+    loadAllSchemas()
     schemasToReplace = [
         schema
         for schema in AVAILABLE_SCHEMAS
@@ -236,7 +651,290 @@ def updateSchemaCommand(
         print(f"No schemas found that are defined in TIP-{tip_number}.")
         return
 
-    replaceSchema(tips_repo_path, tip_number, schemasToReplace)
+    replaceSchema(tips_repo_path, tip_number, schemasToReplace, manifest)
+
+
+def updateAllSchemasCommand(
+    tips_repo_path: str, jobs: Optional[int], manifest: Optional["Manifest"] = None
+):
+    loadAllSchemas()
+
+    schemasByTip: Dict[int, List[str]] = {}
+    for schema in AVAILABLE_SCHEMAS:
+        if schema.tipRef is not None:
+            schemasByTip.setdefault(schema.tipRef.tipNumber, []).append(schema.name)
+
+    updateTips(tips_repo_path, schemasByTip, jobs, manifest)
+
+
+def updateAffectedSchemasCommand(
+    tips_repo_path: str,
+    schema_names: List[str],
+    jobs: Optional[int],
+    manifest: Optional["Manifest"] = None,
+    dry_run: bool = False,
+):
+    from generation.dependencies import buildDependencies, indexTipFiles
+
+    for schema_name in schema_names:
+        if find_schema(schema_name) is None:
+            return
+
+    loadAllSchemas()
+    dependencies = buildDependencies(AVAILABLE_SCHEMAS)
+    indexTipFiles(dependencies, tips_repo_path)
+    schemasByTip = {
+        tip: [name for name in names if name in AVAILABLE_SCHEMAS]
+        for tip, names in dependencies.affectedTables(schema_names).items()
+    }
+    schemasByTip = {tip: names for tip, names in schemasByTip.items() if names}
+
+    if not schemasByTip:
+        print("No TIP contains a table that is affected by the given schemas.")
+        return
+    if dry_run:
+        for tip, names in schemasByTip.items():
+            print(f"TIP-{tip:04}: {', '.join(names)}")
+        return
+
+    updateTips(tips_repo_path, schemasByTip, jobs, manifest)
+
+
+def watchSchemasCommand(
+    tips_repo_path: str, interval: float, manifest: Optional["Manifest"] = None
+):
+    from generation.watch import SchemaWatcher
+
+    SchemaWatcher(tips_repo_path, manifest).run(interval)
+
+
+def buildCatalogCommand(catalog: str, rent_structures: List[Tuple[int, int, int]]):
+    from generation.catalog import writeCatalog
+    from typedefs.deposit_weight import RentStructure
+
+    rentStructures = [RentStructure(*weights) for weights in rent_structures] or [
+        RentStructure()
+    ]
+
+    loadAllSchemas()
+    start = time.perf_counter()
+    built = writeCatalog(catalog, AVAILABLE_SCHEMAS, rentStructures)
+    print(
+        f"Wrote {len(built['registered'])} schemas ({len(built['schemas'])} distinct schemas in total) "
+        f"to {catalog} in {(time.perf_counter() - start) * 1000:.1f} ms."
+    )
+
+
+def lookupCatalogCommand(catalog: str, schema_name: str):
+    from generation.catalog import CATALOG_SNAPSHOT, CatalogSnapshot
+
+    try:
+        snapshot = CatalogSnapshot(os.path.join(catalog, CATALOG_SNAPSHOT))
+    except (OSError, ValueError) as error:
+        print(f"Cannot open the catalog: {error}. Build it with `cli.py catalog build`.")
+        return
+
+    try:
+        if snapshot.isStale():
+            print("Warning: the schemas changed since the catalog was built.")
+        entry = snapshot.lookup(schema_name)
+        if entry is None:
+            print(f"No schema with name `{schema_name}` exists in the catalog.")
+            return
+        tip = "" if entry.tip is None else f" (TIP-{entry.tip})"
+        print(f"{entry.name}{tip}: {entry.size[0]}..{entry.size[1]} bytes")
+        for weights, deposit, offset in zip(
+            snapshot.rentStructures, entry.deposits, snapshot.outputOffsets
+        ):
+            print(
+                f"  rent structure {','.join(map(str, weights))}: deposit {deposit[0]}..{deposit[1]}, "
+                f"as an output {deposit[0] + offset[0]}..{deposit[1] + offset[1]}"
+            )
+    finally:
+        snapshot.close()
+
+
+def serveCommand(host: str, port: int):
+    from generation.query_service import QueryService, createServer
+
+    service = QueryService()
+    server = createServer(service, host, port)
+    print(f"Answering queries on http://{host}:{server.server_address[1]}, press Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(service.cache)
+
+
+def updateTips(
+    tips_repo_path: str,
+    schemasByTip: Dict[int, List[str]],
+    jobs: Optional[int],
+    manifest: Optional["Manifest"] = None,
+):
+    """Updates the tables of the given schemas in each TIP in parallel and prints the outcome."""
+    from concurrent.futures import ProcessPoolExecutor
+    from generation.tip_update import SchemaStatus, TipUpdate, tipPath
+
+    tips = sorted(schemasByTip)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        updates: List[TipUpdate] = list(
+            executor.map(
+                updateTipWorker,
+                [tips_repo_path] * len(tips),
+                tips,
+                [schemasByTip[tip] for tip in tips],
+                [
+                    None
+                    if manifest is None
+                    else manifest.get(tipPath(tips_repo_path, tip))
+                    for tip in tips
+                ],
+            )
+        )
+    seconds = time.perf_counter() - start
+
+    if manifest is not None:
+        for update in updates:
+            if update.manifestEntry is not None:
+                manifest.set(update.path, update.manifestEntry)
+        manifest.save()
+
+    totals = {status: 0 for status in SchemaStatus}
+    for update in updates:
+        if not update.exists:
+            print(f'TIP-{update.tip:04}: skipped because path "{update.path}" does not exist.')
+            continue
+
+        for status in SchemaStatus:
+            totals[status] += update.count(status)
+        counts = ", ".join(
+            f"{update.count(status)} {status.value}" for status in SchemaStatus
+        )
+        print(f"TIP-{update.tip:04}: {counts} ({update.seconds * 1000:.1f} ms)")
+        for name, status in update.schemas:
+            if status != SchemaStatus.UpToDate:
+                print(f"  {name} {status.value}.")
+
+    counts = ", ".join(f"{totals[status]} {status.value}" for status in SchemaStatus)
+    print(f"Total: {counts} in {len(tips)} TIPs ({seconds * 1000:.1f} ms)")
+
+
+def schemaStatsCommand(trace: bool = False):
+    if not trace:
+        loadAllSchemas()
+        print(f"{len(AVAILABLE_SCHEMAS)} available schemas")
+        print(ALL_SCHEMAS.footprint())
+        return
+
+    import tracemalloc
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    loadAllSchemas()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    print(f"{len(AVAILABLE_SCHEMAS)} available schemas")
+    print(ALL_SCHEMAS.footprint())
+    # The allocations include the code of the schema modules, not only the schemas.
+    ignoreTracemalloc = (tracemalloc.Filter(False, tracemalloc.__file__),)
+    differences = after.filter_traces(ignoreTracemalloc).compare_to(
+        before.filter_traces(ignoreTracemalloc), "filename"
+    )
+    size = sum(difference.size_diff for difference in differences)
+    count = sum(difference.count_diff for difference in differences)
+    print(f"Loading the schemas allocated {size / 1024:.1f} KiB in {count} blocks:")
+    root = os.path.dirname(os.path.abspath(__file__))
+    for difference in differences[:10]:
+        path = difference.traceback[0].filename
+        if path.startswith(root):
+            path = os.path.relpath(path, root)
+        print(f"  {path:<40} {difference.size_diff / 1024:8.1f} KiB {difference.count_diff:6} blocks")
+
+
+def parseLimitValues(limit: str) -> Tuple[str, List[int]]:
+    """Parses NAME=1,2,4 or NAME=start:end[:step], where the end is included."""
+    name, separator, values = limit.partition("=")
+    try:
+        if not name or not separator:
+            raise ValueError()
+        if ":" in values:
+            start, end, *step = (int(value) for value in values.split(":"))
+            if len(step) > 1 or (step and step[0] <= 0):
+                raise ValueError()
+            parsed = list(range(start, end + 1, step[0] if step else 1))
+        else:
+            parsed = [int(value) for value in values.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"`{limit}` is neither NAME=1,2,4 nor NAME=start:end[:step]"
+        )
+    if not parsed:
+        raise argparse.ArgumentTypeError(f"`{limit}` has no values")
+    return name, parsed
+
+
+def parseRentStructure(weights: str) -> Tuple[int, int, int]:
+    """Parses the block issuer key, staking and delegation weights, e.g. 100,100,100."""
+    try:
+        blockIssuerKey, staking, delegation = (int(weight) for weight in weights.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"`{weights}` is not BLOCK_ISSUER_KEY,STAKING,DELEGATION"
+        )
+    if min(blockIssuerKey, staking, delegation) < 0:
+        raise argparse.ArgumentTypeError(f"`{weights}` has a negative weight")
+    return blockIssuerKey, staking, delegation
+
+
+def schemaSizeCommand(
+    schema_name: str,
+    limits: List[Tuple[str, List[int]]],
+    storage_score: bool = False,
+    output: Optional[str] = None,
+):
+    # Only needed for size expressions, which are evaluated with numpy.
+    import itertools
+    import numpy as np
+    from generation.size_expression import compileSizeExpression
+    from typedefs.deposit_weight import RentStructure
+    from typedefs.limit import LIMITS
+
+    schema = find_schema(schema_name)
+    if schema is None:
+        return
+
+    expression = compileSizeExpression(
+        schema, RentStructure() if storage_score else None
+    )
+    print(expression)
+    if not limits:
+        return
+
+    # Limits are defined by the schema modules, which are only imported on demand.
+    loadAllSchemas()
+    values = dict(limits)
+    combinations = np.array(list(itertools.product(*values.values())), dtype=np.int64)
+    try:
+        sizes = expression.evaluate(
+            **{name: combinations[:, column] for column, name in enumerate(values)}
+        )
+    except KeyError as error:
+        print(f"{error.args[0]}, the limits are: {', '.join(sorted(LIMITS))}")
+        return
+
+    with open_output(output, False) as sink:
+        writer = csv.writer(sink, lineterminator="")
+        writer.writerow(list(values) + ["min", "max"])
+        for combination, size in zip(combinations, sizes):
+            sink.write("\n")
+            writer.writerow([int(x) for x in combination] + [int(x) for x in size])
 
 
 def replaceLinksCommand(
@@ -247,65 +945,193 @@ def replaceLinksCommand(
     replaceRelativeLinks(tips_repo_path, tip_number)
 
 
-def generateDeposit(schema_name: str, dry_run: bool = False):
+def runTestsCommand():
+    # The tests cover all schemas and need numpy, so they are only imported when run.
+    from generation.catalog_test import RunCatalogTests
+    from generation.codec_test import RunCodecTests
+    from generation.dependencies_test import RunDependenciesTests
+    from generation.deposit_test import RunDepositCalculationTests
+    from generation.deposit_coefficients_test import RunDepositCoefficientsTests
+    from generation.html_writer_test import RunHtmlWriterTests
+    from generation.query_service_test import RunQueryServiceTests
+    from generation.schema_test import RunSchemaGenerationTests
+    from generation.size_distribution_test import RunSizeDistributionTests
+    from generation.size_expression_test import RunSizeExpressionTests
+    from generation.storage_score_test import RunStorageScoreTests
+    from generation.tip_sections_test import RunTipSectionsTests
+    from generation.tip_update_test import RunTipUpdateTests
+    from generation.watch_test import RunWatchTests
+    from schemas.locations_test import RunSchemaLocationTests
+
+    RunSchemaLocationTests()
+    RunDepositCalculationTests()
+    RunDepositCoefficientsTests()
+    RunSchemaGenerationTests()
+    RunHtmlWriterTests()
+    RunCodecTests()
+    RunStorageScoreTests()
+    RunSizeDistributionTests()
+    RunSizeExpressionTests()
+    RunTipSectionsTests()
+    RunTipUpdateTests()
+    RunDependenciesTests()
+    RunWatchTests()
+    RunQueryServiceTests()
+    RunCatalogTests()
+
+
+def generateDeposit(
+    schema_name: str,
+    dry_run: bool = False,
+    cache_stats: bool = False,
+    output: Optional[str] = None,
+):
     schema = find_schema(schema_name)
     if schema is None:
         return
     else:
-        generated: str = generateSchemaDeposit(schema)
-        if not dry_run:
-            print(generated)
+        with open_output(output, dry_run) as sink:
+            writeSchemaDeposit(schema, sink)
+        if cache_stats:
+            print(DEPOSIT_CACHE)
 
 
-def replaceSchema(tipRepoPath: str, tip: int, schemas: List[Schema]):
-    paddedTipNo = f"{tip:04}"
-    tipPath = os.path.join(tipRepoPath, f"tips/TIP-{paddedTipNo}/tip-{paddedTipNo}.md")
+def scoreOutputsCommand(
+    input: str,
+    schema_name: Optional[str],
+    jobs: Optional[int] = None,
+    dry_run: bool = False,
+    output: Optional[str] = None,
+):
+    # Only needed for scoring, which compiles the codec of the outputs.
+    from generation.codec import CodecError
+    from generation.storage_score import ScoreSummary, scoreOutputs
+    from typedefs.deposit_weight import RentStructure
 
-    if not os.path.exists(tipPath):
-        print(
-            f'Cannot update schema(s) in TIP-{paddedTipNo} because path "{tipPath}" does not exist.'
-        )
+    if schema_name is not None and find_schema(schema_name) is None:
         return
 
-    with open(tipPath, "r") as f:
-        tip_content = f.read()
+    if not os.path.isfile(input):
+        print(f'Cannot score the outputs because path "{input}" does not exist.')
+        return
 
-    for schema in schemas:
-        generated: str = SchemaGen().generateSchemaWithSummary(
-            schema, GenerationType.Standalone
-        )
+    summary = ScoreSummary()
+    with open_output(output, dry_run) as sink:
+        # Rows are separated rather than terminated, like the other outputs of the cli.
+        writer = csv.writer(sink, lineterminator="")
+        writer.writerow(["index", "type", "bytes", "storage_score", "error"])
+        try:
+            for scored in scoreOutputs(input, schema_name, RentStructure(), jobs):
+                summary.add(scored)
+                sink.write("\n")
+                writer.writerow(
+                    [
+                        scored.index,
+                        scored.type,
+                        scored.size,
+                        scored.storageScore,
+                        scored.error or "",
+                    ]
+                )
+        except (CodecError, OSError) as error:
+            scoredCount = sum(summary.count.values()) + summary.errors
+            print(f"Cannot read the outputs after {scoredCount} of them: {error}")
+            return
+    print(summary)
+
+
+def sizeDistributionCommand(
+    schema_name: str,
+    histogram: Optional[int] = None,
+    dry_run: bool = False,
+    output: Optional[str] = None,
+):
+    # Only needed for distributions, which are computed with numpy.
+    from generation.size_distribution import (
+        DistributionTooLarge,
+        outputSizeDistribution,
+    )
+    from typedefs.deposit_weight import RentStructure
 
-        # Match the entire HTML section in which the schema is defined: <details>...</table>.
-        pattern = rf"^<details>\s*<summary>{schema.name}<\/summary>.*?^<\/table>"
+    schema = find_schema(schema_name)
+    if schema is None:
+        return
 
-        # - DOTALL so that . also match newlines
-        # - MULTILINE so that ^ matches not just the start of the string but also the start of a line.
-        mat = re.search(pattern, tip_content, flags=re.DOTALL | re.MULTILINE)
+    try:
+        distribution = outputSizeDistribution(schema, RentStructure())
+    except DistributionTooLarge as error:
+        print(f"The distribution of `{schema_name}` cannot be computed: {error}.")
+        return
 
-        if mat is None:
-            print(
-                f'Did not find schema "{schema.name}" at the top-level in TIP-{paddedTipNo}.'
-            )
-            continue
+    with open_output(output, dry_run) as sink:
+        writer = csv.writer(sink, lineterminator="")
+        writer.writerow(["bytes", "storage_score", "layouts"])
+        for size, score, count in distribution.pairs():
+            sink.write("\n")
+            writer.writerow([size, score, count])
+
+    minSize, maxSize = distribution.sizeRange()
+    minScore, maxScore = distribution.scoreRange()
+    print(
+        f"{distribution.total()} layouts, bytes {minSize} to {maxSize}, "
+        f"storage score {minScore} to {maxScore}"
+    )
+    if histogram is not None:
+        counts, edges = distribution.histogram(histogram)
+        for count, start, end in zip(counts, edges, edges[1:]):
+            print(f"{start:.0f} - {end:.0f}: {count}")
 
-        (start, end) = mat.span()
 
-        part1 = tip_content[:start]
-        part2 = generated
-        part3 = tip_content[end:]
-        new_tip_content = part1 + part2 + part3
+def replaceSchema(
+    tipRepoPath: str,
+    tip: int,
+    schemas: List[Schema],
+    manifest: Optional["Manifest"] = None,
+):
+    from generation.tip_update import SchemaStatus, tipPath, updateTip
 
-        schemaIsUpToDate = new_tip_content == tip_content
+    manifestEntry = None
+    if manifest is not None:
+        manifestEntry = manifest.get(tipPath(tipRepoPath, tip))
 
-        tip_content = new_tip_content
+    update = updateTip(tipRepoPath, tip, schemas, manifestEntry)
+    paddedTipNo = f"{tip:04}"
 
-        if schemaIsUpToDate:
-            print(f"{schema.name} is up-to-date.")
-        else:
-            print(f"{schema.name} updated.")
+    if manifest is not None and update.manifestEntry is not None:
+        manifest.set(update.path, update.manifestEntry)
+        manifest.save()
 
-    with open(tipPath, "w") as f:
-        f.write(tip_content)
+    if not update.exists:
+        print(
+            f'Cannot update schema(s) in TIP-{paddedTipNo} because path "{update.path}" does not exist.'
+        )
+        return
+
+    for name, status in update.schemas:
+        match status:
+            case SchemaStatus.Missing:
+                print(
+                    f'Did not find schema "{name}" at the top-level in TIP-{paddedTipNo}.'
+                )
+            case SchemaStatus.UpToDate:
+                print(f"{name} is up-to-date.")
+            case SchemaStatus.Updated:
+                print(f"{name} updated.")
+
+
+def updateTipWorker(
+    tipRepoPath: str,
+    tip: int,
+    schemaNames: List[str],
+    manifestEntry: Optional["TipManifestEntry"],
+) -> "TipUpdate":
+    # Runs in a worker process, which only receives the names of the schemas. The manifest is
+    # updated by the parent process with the entries returned by the workers.
+    from generation.tip_update import updateTip
+
+    loadAllSchemas()
+    schemas = [AVAILABLE_SCHEMAS.get(name) for name in schemaNames]
+    return updateTip(tipRepoPath, tip, schemas, manifestEntry)
 
 
 def replaceRelativeLinks(tipRepoPath: str, tip: int):
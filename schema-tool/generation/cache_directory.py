@@ -0,0 +1,16 @@
+import os
+
+# The command line uses these as argument defaults, so this module must stay cheap to import.
+
+
+def cacheDirectory() -> str:
+    cacheHome = os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
+    return os.path.join(cacheHome, "schema-tool")
+
+
+def defaultCatalogDirectory() -> str:
+    return os.path.join(cacheDirectory(), "catalog")
+
+
+def defaultManifestPath() -> str:
+    return os.path.join(cacheDirectory(), "manifest.json")
@@ -0,0 +1,410 @@
+import glob
+import hashlib
+import json
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from generation.deposit import calculateDeposit
+from schemas.common import AVAILABLE_SCHEMAS, OutputOffset
+from typedefs import datatype, subschema
+from typedefs.datatype import DataType, dataTypeValues
+from typedefs.deposit_weight import DepositWeight, RentStructure
+from typedefs.field import ComplexField, Schema, SchemaReference, SimpleField, TipReference
+from typedefs.limit import LIMITS, Limit
+
+CATALOG_VERSION = 2
+CATALOG_JSON = "catalog.json"
+CATALOG_SNAPSHOT = "catalog.bin"
+
+# The sources that determine the schemas and their sizes. A catalog built from other sources is stale.
+CATALOG_SOURCES = ["schemas/*.py", "typedefs/*.py", "generation/deposit.py"]
+
+# The snapshot starts with a header, followed by the weights and output offset deposit of every
+# rent structure, the records of the registered schemas sorted by their UTF-8 encoded name, and
+# the names. All integers are little-endian.
+SNAPSHOT_MAGIC = b"SCAT"
+# magic, version, number of rent structures, number of records, source hash
+SNAPSHOT_HEADER = struct.Struct("<4sHHI32s")
+# the weights in the order of DepositWeight, min and max deposit of the output offset
+SNAPSHOT_RENT_STRUCTURE = struct.Struct("<" + "I" * len(DepositWeight) + "QQ")
+# name offset, name length, tip number (0 if none), min size, max size
+SNAPSHOT_RECORD = struct.Struct("<IHHII")
+# min and max deposit, once per rent structure after every record
+SNAPSHOT_DEPOSIT = struct.Struct("<QQ")
+
+
+SOURCE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def sourcePaths() -> List[str]:
+    """Returns the sources the catalog is built from."""
+    paths = []
+    for pattern in CATALOG_SOURCES:
+        for path in sorted(glob.glob(os.path.join(SOURCE_ROOT, pattern))):
+            if not path.endswith("_test.py"):
+                paths.append(path)
+    return paths
+
+
+def sourceHash() -> str:
+    """Returns a hash of the sources the catalog is built from."""
+    hash = hashlib.sha256()
+    for path in sourcePaths():
+        hash.update(os.path.relpath(path, SOURCE_ROOT).encode())
+        with open(path, "rb") as f:
+            hash.update(f.read())
+    return hash.hexdigest()
+
+
+def encodeValue(value: Any) -> Any:
+    if isinstance(value, Limit):
+        return {"limit": value.name, "value": int(value)}
+    if isinstance(value, DataType):
+        return encodeDataType(value)
+    return value
+
+
+def decodeValue(value: Any) -> Any:
+    if isinstance(value, dict) and "limit" in value:
+        # Limits register themselves, so the limits of the catalog are available by name.
+        return LIMITS.get(value["limit"]) or Limit(value["limit"], value["value"])
+    if isinstance(value, dict):
+        return decodeDataType(value)
+    return value
+
+
+def encodeDataType(dataType: DataType) -> Dict[str, Any]:
+    encoded = {"type": type(dataType).__name__}
+    encoded.update((key, encodeValue(value)) for key, value in dataTypeValues(dataType).items())
+    return encoded
+
+
+def decodeDataType(encoded: Dict[str, Any]) -> DataType:
+    values = {key: decodeValue(value) for key, value in encoded.items() if key != "type"}
+    return getattr(datatype, encoded["type"])(**values)
+
+
+class CatalogEncoder:
+    """Numbers the distinct schemas of a schema graph, such that embedded schemas come first."""
+
+    indices: Dict[int, int]
+    schemas: List[Dict[str, Any]]
+
+    def __init__(self) -> None:
+        self.indices = {}
+        self.schemas = []
+
+    def encode(self, schema: Schema) -> int:
+        index = self.indices.get(id(schema))
+        if index is not None:
+            return index
+
+        fields = []
+        for field in schema.fields:
+            match field:
+                case SimpleField():
+                    fields.append(
+                        {
+                            "name": field.name,
+                            "type": encodeDataType(field.type),
+                            "description": field.description,
+                            "depositWeight": field.deposit_weight.name,
+                            "value": field.value,
+                        }
+                    )
+                case ComplexField():
+                    fields.append(
+                        {
+                            "name": field.name,
+                            "subschema": [type(field.subschema).__name__]
+                            + [encodeValue(value) for value in vars(field.subschema).values()],
+                            "schemas": [self.encode(child) for child in field.schemas],
+                        }
+                    )
+        tipRef = schema.tipRef
+        encoded = {
+            "name": schema.name,
+            "summary": schema.summary,
+            "fields": fields,
+            "mandatory": schema.mandatory,
+            "omitFields": schema.omitFields,
+            "detailsOpen": schema.detailsOpen,
+            "tipRef": None if tipRef is None else [tipRef.tipNumber, tipRef.customFragment],
+        }
+        if isinstance(schema, SchemaReference):
+            encoded["referenceDepth"] = schema.depth
+
+        # Schemas are interned, so every distinct schema is encoded once however often it is embedded.
+        self.indices[id(schema)] = len(self.schemas)
+        self.schemas.append(encoded)
+        return len(self.schemas) - 1
+
+
+def buildCatalog(
+    schemas: Iterable[Schema], rentStructures: List[RentStructure]
+) -> Dict[str, Any]:
+    """
+    Serializes the given schemas with all schemas they embed, together with their size in bytes
+    and their deposit for every rent structure, as a JSON compatible dictionary.
+    """
+    byteSize = RentStructure.byteSize()
+
+    encoder = CatalogEncoder()
+    registered = []
+    for schema in schemas:
+        registered.append(
+            {
+                "name": schema.name,
+                "schema": encoder.encode(schema),
+                "size": list(calculateDeposit(schema, byteSize)),
+                "deposits": [
+                    list(calculateDeposit(schema, rent_structure))
+                    for rent_structure in rentStructures
+                ],
+            }
+        )
+
+    return {
+        "version": CATALOG_VERSION,
+        "sourceHash": sourceHash(),
+        "rentStructures": [
+            {
+                "weights": {weight.name: rent_structure.weight(weight) for weight in DepositWeight},
+                "outputOffset": list(calculateDeposit(OutputOffset, rent_structure)),
+            }
+            for rent_structure in rentStructures
+        ],
+        "schemas": encoder.schemas,
+        "registered": registered,
+    }
+
+
+def importCatalog(catalog: Dict[str, Any]) -> List[Schema]:
+    """
+    Constructs the registered schemas of a catalog without importing the schema modules, and
+    registers them in AVAILABLE_SCHEMAS. Returns them in the order of the catalog.
+
+    The schemas are interned like the ones of the modules, so a schema that is already loaded is
+    returned as the same instance.
+    """
+    if catalog.get("version") != CATALOG_VERSION:
+        raise ValueError(f"unsupported catalog version {catalog.get('version')}")
+
+    schemas: List[Schema] = []
+    for encoded in catalog["schemas"]:
+        fields = []
+        for field in encoded["fields"]:
+            if "subschema" in field:
+                subschemaType, *values = field["subschema"]
+                fields.append(
+                    ComplexField(
+                        field["name"],
+                        getattr(subschema, subschemaType)(*map(decodeValue, values)),
+                        [schemas[index] for index in field["schemas"]],
+                    )
+                )
+            else:
+                fields.append(
+                    SimpleField(
+                        field["name"],
+                        decodeDataType(field["type"]),
+                        field["description"],
+                        DepositWeight[field["depositWeight"]],
+                        field["value"],
+                    )
+                )
+
+        tipRef = encoded["tipRef"]
+        tipReference = None if tipRef is None else TipReference(*tipRef)
+        if "referenceDepth" in encoded:
+            schema = SchemaReference(
+                encoded["name"], encoded["summary"], encoded["referenceDepth"], tipReference
+            )
+        else:
+            schema = Schema(
+                encoded["name"],
+                encoded["summary"],
+                fields,
+                mandatory=encoded["mandatory"],
+                omitFields=encoded["omitFields"],
+                detailsOpen=encoded["detailsOpen"],
+                tipReference=tipReference,
+            )
+        schemas.append(schema)
+
+    registered = [schemas[entry["schema"]] for entry in catalog["registered"]]
+    for schema in registered:
+        AVAILABLE_SCHEMAS.register(schema)
+    return registered
+
+
+def writeSnapshot(catalog: Dict[str, Any], path: str):
+    """Writes the names, sizes and deposits of the registered schemas of a catalog in binary."""
+    rentStructures = catalog["rentStructures"]
+    entries = sorted(catalog["registered"], key=lambda entry: entry["name"].encode())
+
+    recordSize = SNAPSHOT_RECORD.size + SNAPSHOT_DEPOSIT.size * len(rentStructures)
+    namesOffset = (
+        SNAPSHOT_HEADER.size
+        + SNAPSHOT_RENT_STRUCTURE.size * len(rentStructures)
+        + recordSize * len(entries)
+    )
+
+    chunks = [
+        SNAPSHOT_HEADER.pack(
+            SNAPSHOT_MAGIC,
+            CATALOG_VERSION,
+            len(rentStructures),
+            len(entries),
+            bytes.fromhex(catalog["sourceHash"]),
+        )
+    ]
+    for rent_structure in rentStructures:
+        weights = [rent_structure["weights"][weight.name] for weight in DepositWeight]
+        chunks.append(SNAPSHOT_RENT_STRUCTURE.pack(*weights, *rent_structure["outputOffset"]))
+
+    names = []
+    nameOffset = namesOffset
+    for entry in entries:
+        name = entry["name"].encode()
+        schema = catalog["schemas"][entry["schema"]]
+        tip = 0 if schema["tipRef"] is None else schema["tipRef"][0]
+        chunks.append(SNAPSHOT_RECORD.pack(nameOffset, len(name), tip, *entry["size"]))
+        for deposit in entry["deposits"]:
+            chunks.append(SNAPSHOT_DEPOSIT.pack(*deposit))
+        names.append(name)
+        nameOffset += len(name)
+
+    with open(path, "wb") as f:
+        f.write(b"".join(chunks + names))
+
+
+@dataclass
+class CatalogEntry:
+    """The precomputed sizes of a registered schema, as read from a snapshot."""
+
+    name: str
+    tip: Optional[int]
+    size: Tuple[int, int]
+    """The minimum and maximum size in bytes."""
+    deposits: List[Tuple[int, int]]
+    """The minimum and maximum deposit of the schema for every rent structure of the snapshot."""
+
+
+class CatalogSnapshot:
+    """
+    A memory-mapped snapshot written by writeSnapshot. Looking up a schema reads only its record
+    and the names compared during a binary search, so opening the snapshot is instantaneous
+    regardless of its size.
+    """
+
+    mapped: mmap.mmap
+    sourceHash: str
+    rentStructures: List[Tuple[int, ...]]
+    """The weights of every rent structure, in the order of DepositWeight."""
+    outputOffsets: List[Tuple[int, int]]
+    """The minimum and maximum deposit of the output offset for every rent structure."""
+    count: int
+    recordsOffset: int
+    recordSize: int
+    mtime: int
+    """The modification time of the snapshot file."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as f:
+            self.mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.mtime = os.fstat(f.fileno()).st_mtime_ns
+        magic, version, rentStructureCount, self.count, hash = SNAPSHOT_HEADER.unpack_from(
+            self.mapped
+        )
+        if magic != SNAPSHOT_MAGIC or version != CATALOG_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a catalog snapshot of version {CATALOG_VERSION}")
+        self.sourceHash = hash.hex()
+
+        self.rentStructures = []
+        self.outputOffsets = []
+        offset = SNAPSHOT_HEADER.size
+        for _ in range(rentStructureCount):
+            *weights, minOffset, maxOffset = SNAPSHOT_RENT_STRUCTURE.unpack_from(self.mapped, offset)
+            self.rentStructures.append(tuple(weights))
+            self.outputOffsets.append((minOffset, maxOffset))
+            offset += SNAPSHOT_RENT_STRUCTURE.size
+        self.recordsOffset = offset
+        self.recordSize = SNAPSHOT_RECORD.size + SNAPSHOT_DEPOSIT.size * rentStructureCount
+
+    def name(self, index: int) -> bytes:
+        nameOffset, nameLength = SNAPSHOT_RECORD.unpack_from(
+            self.mapped, self.recordsOffset + index * self.recordSize
+        )[:2]
+        return self.mapped[nameOffset : nameOffset + nameLength]
+
+    def entry(self, index: int) -> CatalogEntry:
+        offset = self.recordsOffset + index * self.recordSize
+        nameOffset, nameLength, tip, minSize, maxSize = SNAPSHOT_RECORD.unpack_from(
+            self.mapped, offset
+        )
+        offset += SNAPSHOT_RECORD.size
+        deposits = [
+            SNAPSHOT_DEPOSIT.unpack_from(self.mapped, offset + i * SNAPSHOT_DEPOSIT.size)
+            for i in range(len(self.rentStructures))
+        ]
+        return CatalogEntry(
+            self.mapped[nameOffset : nameOffset + nameLength].decode(),
+            tip or None,
+            (minSize, maxSize),
+            deposits,
+        )
+
+    def lookup(self, name: str) -> Optional[CatalogEntry]:
+        encoded = name.encode()
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.name(middle) < encoded:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self.name(low) == encoded:
+            return self.entry(low)
+        return None
+
+    def __iter__(self):
+        return (self.entry(index) for index in range(self.count))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def isStale(self) -> bool:
+        """
+        Whether the sources changed since the snapshot was built.
+
+        The sources are only hashed if one of them was modified after the snapshot was written, so
+        the check is a stat per source as long as nothing changed.
+        """
+        if all(os.stat(path).st_mtime_ns <= self.mtime for path in sourcePaths()):
+            return False
+        return self.sourceHash != sourceHash()
+
+    def close(self):
+        self.mapped.close()
+
+
+def writeCatalog(
+    directory: str, schemas: Iterable[Schema], rentStructures: List[RentStructure]
+) -> Dict[str, Any]:
+    """Writes the JSON catalog and its binary snapshot to the directory and returns the catalog."""
+    catalog = buildCatalog(schemas, rentStructures)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, CATALOG_JSON), "w") as f:
+        json.dump(catalog, f, separators=(",", ":"))
+    writeSnapshot(catalog, os.path.join(directory, CATALOG_SNAPSHOT))
+    return catalog
+
+
+def loadCatalog(directory: str) -> List[Schema]:
+    """Registers the schemas of the JSON catalog in the directory, see importCatalog."""
+    with open(os.path.join(directory, CATALOG_JSON), "r") as f:
+        return importCatalog(json.load(f))
@@ -0,0 +1,83 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from generation.catalog import (
+    CATALOG_SNAPSHOT,
+    CatalogSnapshot,
+    importCatalog,
+    writeCatalog,
+)
+from generation.deposit import calculateDeposit
+from generation.manifest import renderedFingerprint
+from schemas.common import AVAILABLE_SCHEMAS, OutputOffset
+from typedefs.deposit_weight import RentStructure
+
+
+def RunCatalogTests():
+    print("Testing the schema catalog")
+
+    rentStructures = [RentStructure(), RentStructure(50, 200, 0)]
+    with tempfile.TemporaryDirectory() as directory:
+        catalog = writeCatalog(directory, AVAILABLE_SCHEMAS, rentStructures)
+        # The catalog is plain JSON.
+        catalog = json.loads(json.dumps(catalog))
+
+        # Importing the catalog constructs the same, interned schemas.
+        imported = importCatalog(catalog)
+        assert len(imported) == len(AVAILABLE_SCHEMAS)
+        assert all(a is b for a, b in zip(imported, AVAILABLE_SCHEMAS))
+
+        snapshot = CatalogSnapshot(os.path.join(directory, CATALOG_SNAPSHOT))
+        try:
+            assert not snapshot.isStale()
+            assert len(snapshot) == len(AVAILABLE_SCHEMAS)
+            assert snapshot.lookup("Unknown") is None
+            for schema in AVAILABLE_SCHEMAS:
+                entry = snapshot.lookup(schema.name)
+                assert entry is not None, schema.name
+                assert entry.tip == (schema.tipRef and schema.tipRef.tipNumber)
+                assert entry.deposits == [
+                    calculateDeposit(schema, rent_structure) for rent_structure in rentStructures
+                ], schema.name
+            assert snapshot.outputOffsets == [
+                calculateDeposit(OutputOffset, rent_structure) for rent_structure in rentStructures
+            ]
+            assert snapshot.lookup("Tag Feature").size == (3, 257)
+        finally:
+            snapshot.close()
+
+        # The sources are only hashed if they are newer than the snapshot.
+        path = os.path.join(directory, CATALOG_SNAPSHOT)
+        os.utime(path, ns=(0, 0))
+        snapshot = CatalogSnapshot(path)
+        try:
+            assert not snapshot.isStale()
+            snapshot.sourceHash = "00" * 32
+            assert snapshot.isStale()
+            snapshot.mtime = time.time_ns() + 1_000_000_000
+            assert not snapshot.isStale()
+        finally:
+            snapshot.close()
+
+        # In a fresh interpreter, the schemas are loaded from the catalog without importing the
+        # schema modules and render the same tables.
+        fingerprints = {schema.name: renderedFingerprint(schema) for schema in AVAILABLE_SCHEMAS}
+        script = (
+            "import json, sys\n"
+            "from generation.catalog import loadCatalog\n"
+            "from generation.manifest import renderedFingerprint\n"
+            f"schemas = loadCatalog({directory!r})\n"
+            "assert [m for m in sys.modules if m.startswith('schemas.') and m != 'schemas.common'] == []\n"
+            "print(json.dumps({schema.name: renderedFingerprint(schema) for schema in schemas}))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert json.loads(result.stdout) == fingerprints
@@ -0,0 +1,451 @@
+from dataclasses import dataclass
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from schemas.common import resolveSchema
+from typedefs.datatype import (
+    ByteArray,
+    DataType,
+    LengthPrefixedArray,
+    UInt16,
+    UInt256,
+    UInt32,
+    UInt64,
+    UInt8,
+)
+from typedefs.field import ComplexField, Field, Schema, SimpleField, trackSchemaCache
+from typedefs.subschema import (
+    AnyOf,
+    AtMostOneOfEach,
+    Embedded,
+    OneOf,
+    OptAnyOf,
+    OptOneOf,
+)
+
+# The struct formats of the fixed-size integers. All integers are little-endian.
+INTEGER_FORMATS: Dict[type, str] = {UInt8: "B", UInt16: "H", UInt32: "I", UInt64: "Q"}
+
+
+class CodecError(ValueError):
+    """Raised when bytes do not match a schema or a value cannot be encoded with it."""
+
+    pass
+
+
+@dataclass
+class Decoded:
+    """A value of a schema. Byte arrays are memoryview slices of the decoded bytes."""
+
+    schema: Schema
+    fields: Dict[str, Any]
+    """The value of every field by name. Lists are lists of Decoded and absent optional values are None."""
+
+    def __getitem__(self, name: str) -> Any:
+        return self.fields[name]
+
+
+def typeValue(schema: Schema) -> Optional[int]:
+    """Returns the value of the type field with which the schema starts, if any."""
+    if not schema.fields:
+        return None
+    field = schema.fields[0]
+    if not isinstance(field, SimpleField) or not isinstance(field.type, UInt8):
+        return None
+    return field.value
+
+
+def isFixedSize(dataType: DataType) -> bool:
+    return type(dataType) in INTEGER_FORMATS or isinstance(dataType, (UInt256, ByteArray))
+
+
+class FixedRun:
+    """Consecutive fixed-size fields, which are decoded and encoded with a single struct."""
+
+    decodeStruct: struct.Struct
+    """Unpacks the integers and skips the byte arrays, which are sliced instead."""
+    encodeStruct: struct.Struct
+    integerNames: List[str]
+    slices: List[Tuple[str, int, int, bool]]
+    """The name, start, end and whether it is a uint256 of every field that is sliced."""
+    fields: List[Tuple[str, DataType]]
+    size: int
+
+    def __init__(self, fields: List[SimpleField]) -> None:
+        decodeFormat = "<"
+        encodeFormat = "<"
+        self.integerNames = []
+        self.slices = []
+        self.fields = []
+        position = 0
+        for field in fields:
+            self.fields.append((field.name, field.type))
+            format = INTEGER_FORMATS.get(type(field.type))
+            if format is not None:
+                decodeFormat += format
+                encodeFormat += format
+                self.integerNames.append(field.name)
+            else:
+                size = field.type.max_size()
+                decodeFormat += f"{size}x"
+                encodeFormat += f"{size}s"
+                self.slices.append(
+                    (
+                        field.name,
+                        position,
+                        position + size,
+                        isinstance(field.type, UInt256),
+                    )
+                )
+            position += field.type.max_size()
+
+        self.decodeStruct = struct.Struct(decodeFormat)
+        self.encodeStruct = struct.Struct(encodeFormat)
+        self.size = self.decodeStruct.size
+
+    def decode(self, view: memoryview, offset: int, values: Dict[str, Any]) -> int:
+        for name, value in zip(
+            self.integerNames, self.decodeStruct.unpack_from(view, offset)
+        ):
+            values[name] = value
+        for name, start, end, isInteger in self.slices:
+            value = view[offset + start : offset + end]
+            values[name] = int.from_bytes(value, "little") if isInteger else value
+        return offset + self.size
+
+    def prepare(self, values: Dict[str, Any]):
+        pass
+
+    def encode(self, values: Dict[str, Any], out: bytearray):
+        arguments = []
+        for name, dataType in self.fields:
+            value = values[name]
+            if isinstance(dataType, UInt256):
+                value = value.to_bytes(32, "little")
+            elif isinstance(dataType, ByteArray):
+                value = bytes(value)
+                if len(value) != dataType.byteSize:
+                    raise CodecError(
+                        f"{name} must be {dataType.byteSize} bytes long, not {len(value)}"
+                    )
+            arguments.append(value)
+        try:
+            out += self.encodeStruct.pack(*arguments)
+        except struct.error as error:
+            raise CodecError(f"cannot encode {self.fields}: {error}") from error
+
+
+class PrefixedArray:
+    """A length-prefixed array. The prefix is the number of elements."""
+
+    name: str
+    prefix: struct.Struct
+    element: Optional[struct.Struct]
+    """The format of a single element, or None for byte arrays, which are sliced."""
+    elementFormat: str
+
+    def __init__(self, field: SimpleField) -> None:
+        dataType: LengthPrefixedArray = field.type
+        self.name = field.name
+        self.prefix = struct.Struct("<" + INTEGER_FORMATS[type(dataType.typePrefix)])
+        self.elementFormat = INTEGER_FORMATS[type(dataType.typeElement)]
+        self.element = (
+            None
+            if isinstance(dataType.typeElement, UInt8)
+            else struct.Struct("<" + self.elementFormat)
+        )
+
+    def decode(self, view: memoryview, offset: int, values: Dict[str, Any]) -> int:
+        (length,) = self.prefix.unpack_from(view, offset)
+        offset += self.prefix.size
+        if self.element is None:
+            end = offset + length
+            if end > len(view):
+                raise CodecError(f"{self.name} is truncated")
+            values[self.name] = view[offset:end]
+        else:
+            end = offset + length * self.element.size
+            values[self.name] = list(
+                struct.unpack_from(f"<{length}{self.elementFormat}", view, offset)
+            )
+        return end
+
+    def prepare(self, values: Dict[str, Any]):
+        pass
+
+    def encode(self, values: Dict[str, Any], out: bytearray):
+        value = values[self.name]
+        try:
+            out += self.prefix.pack(len(value))
+            if self.element is None:
+                out += value
+            else:
+                out += struct.pack(f"<{len(value)}{self.elementFormat}", *value)
+        except struct.error as error:
+            raise CodecError(f"cannot encode {self.name}: {error}") from error
+
+
+class Variants:
+    """The schemas of a complex field, which are told apart by their type byte."""
+
+    fieldName: str
+    single: Optional["SchemaCodec"]
+    """The codec of the only schema, which then needs no type byte."""
+    byType: Dict[int, "SchemaCodec"]
+
+    def __init__(self, field: ComplexField) -> None:
+        self.fieldName = field.name
+        self.single = None
+        self.byType = {}
+        schemas = [resolveSchema(schema) for schema in field.schemas]
+        for schema in schemas:
+            codec = codecFor(schema)
+            if len(schemas) == 1:
+                self.single = codec
+                continue
+            value = typeValue(schema)
+            if value is None:
+                raise CodecError(
+                    f"{schema.name} in {field.name} has no type field to tell it apart"
+                )
+            self.byType[value] = codec
+
+    def decode(self, view: memoryview, offset: int) -> Tuple[Decoded, int]:
+        if self.single is not None:
+            return self.single.decodeAt(view, offset)
+        if offset >= len(view):
+            raise CodecError(f"{self.fieldName} is truncated")
+        codec = self.byType.get(view[offset])
+        if codec is None:
+            raise CodecError(f"unknown type {view[offset]} in {self.fieldName}")
+        return codec.decodeAt(view, offset)
+
+    def encode(self, value: Decoded, out: bytearray):
+        # Values may be of an equivalent schema object, e.g. one with omitFields set, so the
+        # variant is looked up by its type like when decoding.
+        schema = resolveSchema(value.schema)
+        codec = self.single
+        if codec is None:
+            codec = self.byType.get(typeValue(schema))
+        if codec is None or codec.schema.name != schema.name:
+            raise CodecError(f"{schema.name} is not allowed in {self.fieldName}")
+        codec.encodeInto(value, out)
+
+
+class EmbeddedSchema:
+    name: str
+    variants: Variants
+
+    def __init__(self, field: ComplexField) -> None:
+        self.name = field.name
+        self.variants = Variants(field)
+
+    def decode(self, view: memoryview, offset: int, values: Dict[str, Any]) -> int:
+        values[self.name], offset = self.variants.decode(view, offset)
+        return offset
+
+    def prepare(self, values: Dict[str, Any]):
+        pass
+
+    def encode(self, values: Dict[str, Any], out: bytearray):
+        self.variants.encode(values[self.name], out)
+
+
+class SchemaList:
+    """An anyOf, optAnyOf or atMostOneOfEach field, whose number of elements is given by the preceding count field."""
+
+    name: str
+    countName: str
+    variants: Variants
+
+    def __init__(self, field: ComplexField, countField: SimpleField) -> None:
+        self.name = field.name
+        self.countName = countField.name
+        self.variants = Variants(field)
+
+    def decode(self, view: memoryview, offset: int, values: Dict[str, Any]) -> int:
+        elements = []
+        for _ in range(values[self.countName]):
+            element, offset = self.variants.decode(view, offset)
+            elements.append(element)
+        values[self.name] = elements
+        return offset
+
+    def prepare(self, values: Dict[str, Any]):
+        values[self.countName] = len(values[self.name])
+
+    def encode(self, values: Dict[str, Any], out: bytearray):
+        for element in values[self.name]:
+            self.variants.encode(element, out)
+
+
+class OptionalSchema:
+    """An optOneOf field, whose length in bytes is given by the preceding length field. A length of 0 means absent."""
+
+    name: str
+    lengthName: str
+    variants: Variants
+
+    def __init__(self, field: ComplexField, lengthField: SimpleField) -> None:
+        self.name = field.name
+        self.lengthName = lengthField.name
+        self.variants = Variants(field)
+
+    def decode(self, view: memoryview, offset: int, values: Dict[str, Any]) -> int:
+        length = values[self.lengthName]
+        if length == 0:
+            values[self.name] = None
+            return offset
+        end = offset + length
+        if end > len(view):
+            raise CodecError(f"{self.name} is truncated")
+        values[self.name], offset = self.variants.decode(view[:end], offset)
+        if offset != end:
+            raise CodecError(f"{self.name} is {offset - end + length} bytes, not {length}")
+        return end
+
+    def prepare(self, values: Dict[str, Any]):
+        # The value has to be encoded before the length that precedes it.
+        value = values[self.name]
+        encoded = bytearray()
+        if value is not None:
+            self.variants.encode(value, encoded)
+        values[self.name] = encoded
+        values[self.lengthName] = len(encoded)
+
+    def encode(self, values: Dict[str, Any], out: bytearray):
+        out += values[self.name]
+
+
+class SchemaCodec:
+    """Decodes and encodes the values of a schema with steps that are compiled from its fields."""
+
+    schema: Schema
+    steps: List[Any]
+    typeValue: Optional[int]
+
+    def __init__(self, schema: Schema) -> None:
+        self.schema = schema
+        self.steps = []
+        self.typeValue = typeValue(schema)
+
+    def decode(self, data: bytes | bytearray | memoryview) -> Decoded:
+        """Decodes a single value, which must span all of the data."""
+        view = memoryview(data)
+        value, end = self.decodeFrom(view, 0)
+        if end != len(view):
+            raise CodecError(f"{len(view) - end} trailing bytes after {self.schema.name}")
+        return value
+
+    def decodeFrom(self, view: memoryview, offset: int) -> Tuple[Decoded, int]:
+        """Decodes a value at the offset and returns it with the offset after it."""
+        # Variants are dispatched by their type, but a value decoded directly has to be checked.
+        if (
+            self.typeValue is not None
+            and offset < len(view)
+            and view[offset] != self.typeValue
+        ):
+            raise CodecError(
+                f"type {view[offset]} does not denote {self.schema.name}, which has type {self.typeValue}"
+            )
+        try:
+            return self.decodeAt(view, offset)
+        except (struct.error, IndexError) as error:
+            raise CodecError(f"{self.schema.name} is truncated: {error}") from error
+
+    def decodeAll(self, data: bytes | bytearray | memoryview) -> Iterator[Decoded]:
+        """Decodes consecutive values until the end of the data."""
+        view = memoryview(data)
+        offset = 0
+        while offset < len(view):
+            value, offset = self.decodeFrom(view, offset)
+            yield value
+
+    def decodeAt(self, view: memoryview, offset: int) -> Tuple[Decoded, int]:
+        values: Dict[str, Any] = {}
+        for step in self.steps:
+            offset = step.decode(view, offset, values)
+        return Decoded(self.schema, values), offset
+
+    def encode(self, value: Decoded) -> bytes:
+        out = bytearray()
+        self.encodeInto(value, out)
+        return bytes(out)
+
+    def encodeInto(self, value: Decoded, out: bytearray):
+        """Appends the encoded value. Count and length fields are derived from the value."""
+        values = dict(value.fields)
+        for step in self.steps:
+            step.prepare(values)
+        try:
+            for step in self.steps:
+                step.encode(values, out)
+        except KeyError as error:
+            raise CodecError(f"{self.schema.name} has no value for {error}") from error
+
+
+def prefixField(field: ComplexField, previous: Optional[Field], kind: str) -> SimpleField:
+    """
+    Returns the field that holds the element count of a list or the byte length of an optional
+    schema, which is the integer field right before it.
+    """
+    if not isinstance(previous, SimpleField) or type(previous.type) not in INTEGER_FORMATS:
+        raise CodecError(f"{field.name} is not preceded by an integer {kind} field")
+    return previous
+
+
+def compileSteps(fields: List[Field]) -> List[Any]:
+    steps: List[Any] = []
+    run: List[SimpleField] = []
+    for index, field in enumerate(fields):
+        if isinstance(field, SimpleField) and isFixedSize(field.type):
+            run.append(field)
+            continue
+        if run:
+            steps.append(FixedRun(run))
+            run = []
+
+        if isinstance(field, SimpleField):
+            steps.append(PrefixedArray(field))
+            continue
+
+        previous = fields[index - 1] if index > 0 else None
+        match field.subschema:
+            case Embedded() | OneOf():
+                steps.append(EmbeddedSchema(field))
+            case AnyOf() | OptAnyOf() | AtMostOneOfEach():
+                steps.append(SchemaList(field, prefixField(field, previous, "count")))
+            case OptOneOf():
+                steps.append(OptionalSchema(field, prefixField(field, previous, "length")))
+    if run:
+        steps.append(FixedRun(run))
+
+    return steps
+
+
+COMPILED_CODECS: Dict[int, Tuple[Schema, SchemaCodec]] = trackSchemaCache({})
+
+
+def codecFor(schema: Schema) -> SchemaCodec:
+    """Returns the codec of the schema, which is compiled once."""
+    entry = COMPILED_CODECS.get(id(schema))
+    if entry is not None:
+        return entry[1]
+
+    codec = SchemaCodec(schema)
+    # Registered before its fields are compiled, so that recursive schemas refer to it.
+    COMPILED_CODECS[id(schema)] = (schema, codec)
+    try:
+        codec.steps = compileSteps(schema.fields)
+    except CodecError:
+        del COMPILED_CODECS[id(schema)]
+        raise
+
+    return codec
+
+
+def decode(schema: Schema, data: bytes | bytearray | memoryview) -> Decoded:
+    return codecFor(schema).decode(data)
+
+
+def encode(value: Decoded) -> bytes:
+    return codecFor(value.schema).encode(value)
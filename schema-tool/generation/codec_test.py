@@ -0,0 +1,185 @@
+import random
+from typing import Any, Dict
+from generation.codec import (
+    CodecError,
+    Decoded,
+    Variants,
+    codecFor,
+    decode,
+    encode,
+    resolveSchema,
+    typeValue,
+)
+from generation.deposit import calculateDeposit
+from schemas.address import Ed25519Address
+from schemas.common import AVAILABLE_SCHEMAS
+from typedefs.datatype import ByteArray, LengthPrefixedArray, UInt256, UInt8
+from typedefs.deposit_weight import RentStructure
+from typedefs.field import ComplexField, Schema, SimpleField
+from typedefs.subschema import (
+    AnyOf,
+    AtMostOneOfEach,
+    Embedded,
+    OneOf,
+    OptAnyOf,
+    OptOneOf,
+)
+
+def randomValue(schema: Schema, rng: random.Random, depth: int = 0) -> Decoded:
+    """Returns a random value of the schema. Counts and lengths are set by the encoder."""
+    schema = resolveSchema(schema)
+    values: Dict[str, Any] = {}
+    for field in schema.fields:
+        match field:
+            case SimpleField():
+                values[field.name] = randomSimpleValue(field, rng)
+            case ComplexField():
+                values[field.name] = randomComplexValue(field, rng, depth)
+
+    value = typeValue(schema)
+    if value is not None:
+        values[schema.fields[0].name] = value
+    return Decoded(schema, values)
+
+
+def randomSimpleValue(field: SimpleField, rng: random.Random) -> Any:
+    match field.type:
+        case ByteArray():
+            return rng.randbytes(field.type.byteSize)
+        case LengthPrefixedArray():
+            maxLength = field.type.maxLength or 40
+            length = rng.randint(field.type.minLength, maxLength)
+            if isinstance(field.type.typeElement, UInt8):
+                return rng.randbytes(length)
+            return [rng.randrange(256) for _ in range(length)]
+        case UInt256():
+            return rng.getrandbits(256)
+        case _:
+            return rng.getrandbits(8 * field.type.max_size())
+
+
+def randomComplexValue(field: ComplexField, rng: random.Random, depth: int) -> Any:
+    schemas = [resolveSchema(schema) for schema in field.schemas]
+    if depth > 3:
+        # Keep recursive schemas finite by preferring schemas that do not recurse.
+        schemas = [
+            schema for schema in schemas if schema.name != "Node"
+        ] or schemas
+    match field.subschema:
+        case Embedded() | OneOf():
+            return randomValue(rng.choice(schemas), rng, depth + 1)
+        case OptOneOf():
+            if rng.random() < 0.3:
+                return None
+            return randomValue(rng.choice(schemas), rng, depth + 1)
+        case AtMostOneOfEach():
+            chosen = [
+                schema for schema in schemas if schema.mandatory or rng.random() < 0.5
+            ]
+            return [randomValue(schema, rng, depth + 1) for schema in chosen]
+        case AnyOf() | OptAnyOf():
+            length = rng.randint(
+                field.subschema.minLength, min(field.subschema.maxLength, 3)
+            )
+            return [
+                randomValue(rng.choice(schemas), rng, depth + 1) for _ in range(length)
+            ]
+
+
+def RunCodecTests():
+    print("Testing the binary codec")
+
+    address = Ed25519Address()
+    data = bytes([0]) + bytes(range(32))
+    decoded = decode(address, data)
+    assert decoded["Address Type"] == 0
+    assert isinstance(decoded["Pub Key Hash"], memoryview)
+    assert decoded["Pub Key Hash"] == bytes(range(32))
+    assert encode(decoded) == data
+
+    for invalid in [data[:-1], data + bytes(1)]:
+        try:
+            decode(address, invalid)
+            assert False, f"decoding {invalid.hex()} should fail"
+        except CodecError:
+            pass
+
+    # The first output of the signed transaction of test-vectors/examples, laid out by hand as
+    # specified in TIP-41, with a known address instead of the one derived from a key pair.
+    tokenId = bytes.fromhex(
+        "086372557616532f714f104e5f44297b7a286d077956291a6d4f59081f484463712a64300c00"
+    )
+    known = b"".join(
+        [
+            bytes([0]),  # Output Type
+            (100_000).to_bytes(8, "little"),  # Amount
+            (0).to_bytes(8, "little"),  # Mana
+            bytes([1]),  # Unlock Conditions Count
+            bytes([0, 0]) + bytes(range(32)),  # Address Unlock Condition, Ed25519 Address
+            bytes([1]),  # Features Count
+            bytes([5]) + tokenId,  # Native Token Feature, Token ID
+            (0x14BE8149371263F4).to_bytes(32, "little"),  # Amount
+        ]
+    )
+    decoded = decode(AVAILABLE_SCHEMAS.get("Basic Output"), known)
+    assert decoded["Output Type"] == 0
+    assert decoded["Amount"] == 100_000
+    assert decoded["Mana"] == 0
+    [unlockCondition] = decoded["Unlock Conditions"]
+    assert unlockCondition.schema.name == "Address Unlock Condition"
+    assert unlockCondition["Address"].schema.name == "Ed25519 Address"
+    assert unlockCondition["Address"]["Pub Key Hash"] == bytes(range(32))
+    [feature] = decoded["Features"]
+    assert feature.schema.name == "Native Token Feature"
+    assert feature["Token ID"] == tokenId
+    assert feature["Amount"] == 0x14BE8149371263F4
+    assert encode(decoded) == known
+
+    # The count of a list is the integer field before it, whatever its name.
+    element = Schema("Element", "", [SimpleField("Byte", UInt8(), "")])
+    counted = Schema(
+        "Counted",
+        "",
+        [
+            SimpleField("Number", UInt8(), ""),
+            ComplexField("Elements", AnyOf(0, 3), [element]),
+        ],
+    )
+    assert [value["Byte"] for value in decode(counted, bytes([2, 7, 9]))["Elements"]] == [7, 9]
+    uncounted = Schema(
+        "Uncounted", "", [ComplexField("Elements", AnyOf(0, 3), [element])]
+    )
+    try:
+        codecFor(uncounted)
+        assert False, "a list without a count field should not compile"
+    except CodecError:
+        pass
+
+    rng = random.Random(11)
+    for schema in AVAILABLE_SCHEMAS:
+        codec = codecFor(schema)
+        minSize, maxSize = calculateDeposit(schema, RentStructure.byteSize())
+        for _ in range(20):
+            value = randomValue(schema, rng)
+            encoded = codec.encode(value)
+            assert len(encoded) >= minSize, f"{schema.name} encoded below its minimum size"
+
+            decoded = codec.decode(encoded)
+            assert codec.encode(decoded) == encoded, f"{schema.name} does not round-trip"
+
+    # Variants are dispatched by their type byte.
+    unlockConditions = [
+        field
+        for field in AVAILABLE_SCHEMAS.get("Basic Output").fields
+        if field.name == "Unlock Conditions"
+    ][0]
+    variants = Variants(unlockConditions)
+    assert sorted(variants.byType) == [0, 1, 2, 3], sorted(variants.byType)
+
+    # Concatenated values are decoded one after the other.
+    values = [randomValue(AVAILABLE_SCHEMAS.get("Basic Output"), rng) for _ in range(10)]
+    basicOutput = codecFor(AVAILABLE_SCHEMAS.get("Basic Output"))
+    dump = b"".join(basicOutput.encode(value) for value in values)
+    assert [basicOutput.encode(value) for value in basicOutput.decodeAll(dump)] == [
+        basicOutput.encode(value) for value in values
+    ]
@@ -0,0 +1,99 @@
+from dataclasses import dataclass, field
+import glob
+import os
+import re
+from typing import Dict, Iterable, List, Set
+from generation.tip_sections import indexSections
+from schemas.common import resolveSchema
+from typedefs.field import ComplexField, Schema
+
+# The TIP files of a tips repo, whose number is taken from the directory name.
+TIP_FILE = re.compile(r"TIP-(\d+)$")
+
+
+@dataclass
+class SchemaDependencies:
+    """
+    Which schemas embed which, by schema name, and which TIP files contain a table of a schema.
+
+    Schemas are identified by name, since the variants of a schema that omit its fields have the
+    same name and are rendered from the same definition.
+    """
+
+    children: Dict[str, Set[str]] = field(default_factory=dict)
+    """The names of the schemas that each schema embeds directly."""
+    parents: Dict[str, Set[str]] = field(default_factory=dict)
+    """The names of the schemas that directly embed each schema, the reverse of children."""
+    tips: Dict[str, Set[int]] = field(default_factory=dict)
+    """The TIPs that contain a top-level table of each schema."""
+
+    def addEdge(self, parent: str, child: str):
+        self.children.setdefault(parent, set()).add(child)
+        self.parents.setdefault(child, set()).add(parent)
+
+    def embeddingSchemas(self, name: str) -> Set[str]:
+        """Returns the names of all schemas that embed the schema directly or indirectly, including itself."""
+        found = {name}
+        stack = [name]
+        while stack:
+            for parent in self.parents.get(stack.pop(), ()):
+                if parent not in found:
+                    found.add(parent)
+                    stack.append(parent)
+        return found
+
+    def affectedTables(self, names: Iterable[str]) -> Dict[int, List[str]]:
+        """
+        Returns the tables that have to be regenerated when the given schemas change, as the
+        names of the schemas by TIP number. Only TIPs that contain such a table are included.
+        """
+        affected: Set[str] = set()
+        for name in names:
+            affected |= self.embeddingSchemas(name)
+
+        tables: Dict[int, List[str]] = {}
+        for name in sorted(affected):
+            for tip in self.tips.get(name, ()):
+                tables.setdefault(tip, []).append(name)
+        return dict(sorted(tables.items()))
+
+
+def buildDependencies(schemas: Iterable[Schema]) -> SchemaDependencies:
+    """
+    Builds the dependency graph of the given schemas and all schemas they embed. The TIP of a
+    schema is the one that defines it, see indexTipFiles for the tables that are actually there.
+    """
+    dependencies = SchemaDependencies()
+    visited: Set[int] = set()
+    stack = list(schemas)
+    for schema in stack:
+        if schema.tipRef is not None:
+            dependencies.tips.setdefault(schema.name, set()).add(schema.tipRef.tipNumber)
+
+    while stack:
+        schema = stack.pop()
+        if id(schema) in visited:
+            continue
+        visited.add(id(schema))
+        for schemaField in schema.fields:
+            if not isinstance(schemaField, ComplexField):
+                continue
+            for child in schemaField.schemas:
+                dependencies.addEdge(schema.name, child.name)
+                # A reference stands for the schema it refers to, which is walked by its name.
+                stack.append(resolveSchema(child))
+
+    return dependencies
+
+
+def indexTipFiles(dependencies: SchemaDependencies, tipsRepoPath: str):
+    """Replaces the TIPs of the schemas with the TIP files of the repo that contain a top-level table of them."""
+    dependencies.tips = {}
+    for path in sorted(glob.glob(os.path.join(tipsRepoPath, "tips", "TIP-*", "tip-*.md"))):
+        match = TIP_FILE.search(os.path.basename(os.path.dirname(path)))
+        if match is None:
+            continue
+        with open(path, "r") as f:
+            sections = indexSections(f.read())
+        for name in sections:
+            dependencies.tips.setdefault(name, set()).add(int(match.group(1)))
@@ -0,0 +1,64 @@
+import os
+import tempfile
+from generation.dependencies import buildDependencies, indexTipFiles
+from generation.schema import SchemaGen
+from generation.tip_update import tipPath
+from schemas.common import AVAILABLE_SCHEMAS
+from typedefs.generation_type import GenerationType
+
+
+def RunDependenciesTests():
+    print("Testing the schema dependency graph")
+
+    dependencies = buildDependencies(AVAILABLE_SCHEMAS)
+
+    # Every embedding is in both directions of the graph.
+    for parent, children in dependencies.children.items():
+        for child in children:
+            assert parent in dependencies.parents[child]
+
+    embedding = dependencies.embeddingSchemas("Ed25519 Address")
+    for name in ["Ed25519 Address", "Basic Output", "Transaction", "Signed Transaction", "Block"]:
+        assert name in embedding, name
+    for name in ["Tag Feature", "Ed25519 Signature", "Protocol Parameters"]:
+        assert name not in embedding, name
+
+    # Recursive schemas do not loop.
+    assert dependencies.embeddingSchemas("Node") >= {"Node", "Output ID Proof"}
+
+    # Without a tips repo, the tables are in the TIPs that define the schemas.
+    tables = dependencies.affectedTables(["Ed25519 Address"])
+    basicOutput = AVAILABLE_SCHEMAS.get("Basic Output")
+    assert "Basic Output" in tables[basicOutput.tipRef.tipNumber]
+    assert all("Tag Feature" not in names for names in tables.values())
+
+    # With a tips repo, only the TIPs that contain an affected table are included, wherever the
+    # schema is defined.
+    with tempfile.TemporaryDirectory() as tipRepoPath:
+        contents = {
+            41: ["Basic Output", "Tag Feature"],
+            45: ["Node"],
+            99: ["Basic Output"],
+        }
+        for tip, names in contents.items():
+            path = tipPath(tipRepoPath, tip)
+            os.makedirs(os.path.dirname(path))
+            with open(path, "w") as f:
+                for name in names:
+                    f.write(
+                        SchemaGen().generateSchemaWithSummary(
+                            AVAILABLE_SCHEMAS.get(name), GenerationType.Standalone
+                        )
+                    )
+                    f.write("\n\n")
+
+        indexTipFiles(dependencies, tipRepoPath)
+        assert dependencies.affectedTables(["Ed25519 Address"]) == {
+            41: ["Basic Output"],
+            99: ["Basic Output"],
+        }
+        assert dependencies.affectedTables(["Tag Feature", "Leaf Hash"]) == {
+            41: ["Basic Output", "Tag Feature"],
+            45: ["Node"],
+            99: ["Basic Output"],
+        }
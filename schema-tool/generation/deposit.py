@@ -1,133 +1,156 @@
-from typing import List, Tuple
+import io
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+from generation.html_writer import HtmlWriter
 from typedefs.deposit_weight import RentStructure
-from yattag.doc import Doc
-from yattag.indentation import indent
-from schemas.common import OutputOffset
+from schemas.common import OutputOffset, boundedSchemas
 from typedefs.datatype import (
     LengthPrefixedArray,
 )
-from typedefs.field import ComplexField, Schema, SimpleField
+from typedefs.field import ComplexField, Schema, SimpleField, trackSchemaCache
 from typedefs.generation_type import GenerationType
 
-from typedefs.subschema import AnyOf, AtMostOneOfEach, OneOf, OptAnyOf, OptOneOf
-
-doc, tag, _ = Doc().tagtext()
-# Generates unescaped text.
-asis = doc.asis
+from typedefs.subschema import (
+    AnyOf,
+    AtMostOneOfEach,
+    Embedded,
+    OneOf,
+    OptAnyOf,
+    OptOneOf,
+)
 
 
 def generateSchemaDeposit(schema: Schema, genType=GenerationType.Standalone) -> str:
-    if genType == GenerationType.Standalone:
-        with tag("details"):
-            generateSummary(schema)
-        generateSchema(schema, isTopLevel=True)
-    elif genType == GenerationType.Embedded:
-        with tag("details"):
-            generateSummary(schema)
-            generateSchema(schema)
-
-    return indent(doc.getvalue())
-
-
-def generateSummary(schema: Schema):
-    with tag("summary"):
-        asis(schema.name)
-    if schema.summary is not None:
-        with tag("blockquote"):
-            asis(schema.summary)
-
-
-def generateSchema(schema: Schema, isTopLevel=False):
-    with tag("table"):
-        if isTopLevel:
-            generateSection("Offset", OutputOffset)
-        generateSection("Fields", schema)
-        if isTopLevel:
-            generateVByteMinMax(schema)
-
-
-def generateSection(section: str, schema: Schema):
-    with tag("tr"):
-        with tag("td"):
-            asis(section)
-        with tag("td"):
-            with tag("table"):
-                generateTableHeader()
-                for field in schema.fields:
-                    match field:
-                        case SimpleField():
-                            generateSimpleField(field)
-                        case ComplexField():
-                            generateComplexField(field)
-
-
-def generateTableHeader():
-    with tag("tr"):
-        with tag("td"):
-            asis("<b>Field</b>")
-        with tag("td"):
-            asis("<b>Field type</b>")
-        with tag("td"):
-            asis("<b>Length Minimum</b>")
-        with tag("td"):
-            asis("<b>Length Maximum</b>")
-
-
-def generateSimpleField(field: SimpleField):
-    # Handle the length prefixed byte array specially during rendering.
-    # Add an extra field for the length prefix and subtract that from the field itself.
-    lengthPrefixMin = 0
-    lengthPrefixMax = 0
-    if isinstance(field.type, LengthPrefixedArray):
-        generateSimpleField(
-            SimpleField(
-                field.name + " Length",
-                field.type.typePrefix,
-                "Length of the following field.",
+    sink = io.StringIO()
+    writeSchemaDeposit(schema, sink, genType)
+
+    return sink.getvalue()
+
+
+def writeSchemaDeposit(
+    schema: Schema, sink: TextIO, genType=GenerationType.Standalone
+):
+    """Writes the indented HTML of the deposit table of the schema to the sink while it is generated."""
+    DepositGen(sink).renderSchemaDeposit(schema, genType)
+
+
+class DepositGen:
+    writer: HtmlWriter
+    tag: Any
+    # Generates unescaped text.
+    asis: Any
+
+    def __init__(self, sink: TextIO) -> None:
+        self.writer = HtmlWriter(sink)
+        self.tag = self.writer.tag
+        self.asis = self.writer.asis
+
+    def renderSchemaDeposit(self, schema: Schema, genType: GenerationType):
+        if genType == GenerationType.Standalone:
+            with self.tag("details"):
+                self.generateSummary(schema)
+            self.generateSchema(schema, isTopLevel=True)
+        elif genType == GenerationType.Embedded:
+            with self.tag("details"):
+                self.generateSummary(schema)
+                self.generateSchema(schema)
+
+    def generateSummary(self, schema: Schema):
+        with self.tag("summary"):
+            self.asis(schema.name)
+        if schema.summary is not None:
+            with self.tag("blockquote"):
+                self.asis(schema.summary)
+
+    def generateSchema(self, schema: Schema, isTopLevel=False):
+        with self.tag("table"):
+            if isTopLevel:
+                self.generateSection("Offset", OutputOffset)
+            self.generateSection("Fields", schema)
+            if isTopLevel:
+                self.generateVByteMinMax(schema)
+
+    def generateSection(self, section: str, schema: Schema):
+        with self.tag("tr"):
+            with self.tag("td"):
+                self.asis(section)
+            with self.tag("td"):
+                with self.tag("table"):
+                    self.generateTableHeader()
+                    for field in schema.fields:
+                        match field:
+                            case SimpleField():
+                                self.generateSimpleField(field)
+                            case ComplexField():
+                                self.generateComplexField(field)
+
+    def generateTableHeader(self):
+        with self.tag("tr"):
+            with self.tag("td"):
+                self.asis("<b>Field</b>")
+            with self.tag("td"):
+                self.asis("<b>Field type</b>")
+            with self.tag("td"):
+                self.asis("<b>Length Minimum</b>")
+            with self.tag("td"):
+                self.asis("<b>Length Maximum</b>")
+
+    def generateSimpleField(self, field: SimpleField):
+        # Handle the length prefixed byte array specially during rendering.
+        # Add an extra field for the length prefix and subtract that from the field itself.
+        lengthPrefixMin = 0
+        lengthPrefixMax = 0
+        if isinstance(field.type, LengthPrefixedArray):
+            self.generateSimpleField(
+                SimpleField(
+                    field.name + " Length",
+                    field.type.typePrefix,
+                    "Length of the following field.",
+                )
             )
+            lengthPrefixMin = field.type.typePrefix.min_size()
+            lengthPrefixMax = field.type.typePrefix.max_size()
+
+        with self.tag("tr"):
+            with self.tag("td"):
+                self.asis(field.name)
+            with self.tag("td"):
+                self.asis(str(field.deposit_weight))
+            with self.tag("td"):
+                self.asis(str(field.type.min_size() - lengthPrefixMin))
+            with self.tag("td"):
+                self.asis(str(field.type.max_size() - lengthPrefixMax))
+
+    def generateComplexField(self, field: ComplexField):
+        with self.tag("tr"):
+            with self.tag("td", ("valign", "top")):
+                match field.subschema:
+                    case Embedded():
+                        self.asis(field.name)
+                    case _:
+                        self.asis(field.name + " " + str(field.subschema))
+            with self.tag("td", ("colspan", 2)):
+                for schema in field.schemas:
+                    self.renderSchemaDeposit(schema, GenerationType.Embedded)
+
+    def generateVByteMinMax(self, schema: Schema):
+        offsetMinSize, offsetMaxSize = calculateDeposit(
+            OutputOffset, RentStructure(), debug=False
         )
-        lengthPrefixMin = field.type.typePrefix.min_size()
-        lengthPrefixMax = field.type.typePrefix.max_size()
-
-    with tag("tr"):
-        with tag("td"):
-            asis(field.name)
-        with tag("td"):
-            asis(str(field.deposit_weight))
-        with tag("td"):
-            asis(str(field.type.min_size() - lengthPrefixMin))
-        with tag("td"):
-            asis(str(field.type.max_size() - lengthPrefixMax))
-
-
-def generateComplexField(field: ComplexField):
-    with tag("tr"):
-        with tag("td", ("valign", "top")):
-            asis(field.name + " " + str(field.subschema))
-        with tag("td", ("colspan", 2)):
-            for schema in field.schemas:
-                generateSchemaDeposit(schema, genType=GenerationType.Embedded)
-
-
-def generateVByteMinMax(schema: Schema):
-    offsetMinSize, offsetMaxSize = calculateDeposit(
-        OutputOffset, RentStructure(), debug=False
-    )
-    minSize, maxSize = calculateDeposit(schema, RentStructure(), debug=False)
-
-    minSize += offsetMinSize
-    maxSize += offsetMaxSize
-
-    with tag("tr"):
-        with tag("td"):
-            asis("v_byte Minimum")
-        with tag("td"):
-            asis(str(minSize))
-    with tag("tr"):
-        with tag("td"):
-            asis("v_byte Maximum")
-        with tag("td"):
-            asis(str(maxSize))
+        minSize, maxSize = calculateDeposit(schema, RentStructure(), debug=False)
+
+        minSize += offsetMinSize
+        maxSize += offsetMaxSize
+
+        with self.tag("tr"):
+            with self.tag("td"):
+                self.asis("v_byte Minimum")
+            with self.tag("td"):
+                self.asis(str(minSize))
+        with self.tag("tr"):
+            with self.tag("td"):
+                self.asis("v_byte Maximum")
+            with self.tag("td"):
+                self.asis(str(maxSize))
 
 
 def calculateOutputDeposit(
@@ -141,72 +164,118 @@ def calculateOutputDeposit(
 
     return minSize, maxSize
 
+
+class DepositCache:
+    """Memoizes the minimum and maximum deposit of a schema per rent structure."""
+
+    entries: Dict[Tuple[int, Tuple[int, ...]], Tuple[Schema, Tuple[int, int]]]
+    hits: int
+    misses: int
+
+    def __init__(self) -> None:
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(
+        schema: Schema, rent_structure: RentStructure
+    ) -> Tuple[int, Tuple[int, ...]]:
+        # Keyed by the schema, see trackSchemaCache.
+        return id(schema), rent_structure.key()
+
+    def get(
+        self, schema: Schema, rent_structure: RentStructure
+    ) -> Optional[Tuple[int, int]]:
+        entry = self.entries.get(DepositCache.key(schema, rent_structure))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(
+        self, schema: Schema, rent_structure: RentStructure, size: Tuple[int, int]
+    ):
+        self.entries[DepositCache.key(schema, rent_structure)] = (schema, size)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self) -> str:
+        return f"deposit cache: {len(self.entries)} entries, {self.hits} hits, {self.misses} misses"
+
+
+DEPOSIT_CACHE = DepositCache()
+trackSchemaCache(DEPOSIT_CACHE.entries)
+
+
 def calculateDeposit(
     schema: Schema, rent_structure: RentStructure, debug=False
 ) -> Tuple[int, int]:
+    # Debug output is produced while walking the fields, so the cache is bypassed.
+    if not debug:
+        cached = DEPOSIT_CACHE.get(schema, rent_structure)
+        if cached is not None:
+            return cached
+
     minSize = 0
     maxSize = 0
 
     for field in schema.fields:
+        fieldMinSize, fieldMaxSize = minSize, maxSize
         match field:
             case SimpleField():
                 min, max = fieldSize(field, rent_structure)
                 minSize += min
                 maxSize += max
-                if debug:
-                    print(f"Added {field.name} with minLength={min}, maxLength={max}")
             case ComplexField():
+                schemas = boundedSchemas(field)
                 match field.subschema:
                     case OptAnyOf():
                         # minSize unaffected, since its optional
                         min, max = anyOfSchemaDeposit(
-                            field.subschema, field.schemas, rent_structure
+                            field.subschema, schemas, rent_structure
                         )
                         maxSize += max
-                        if debug:
-                            print(
-                                f"Added {field.name} with minLength={min}, maxLength={max}"
-                            )
                     case OptOneOf():
                         # minSize unaffected, since its optional
-                        min, max = oneOfSchemaDeposit(field.schemas, rent_structure)
+                        min, max = oneOfSchemaDeposit(schemas, rent_structure)
                         maxSize += max
-                        if debug:
-                            print(
-                                f"Added {field.name} with minLength={min}, maxLength={max}"
-                            )
                     case OneOf():
-                        min, max = oneOfSchemaDeposit(field.schemas, rent_structure)
+                        min, max = oneOfSchemaDeposit(schemas, rent_structure)
                         minSize += min
                         maxSize += max
-                        if debug:
-                            print(
-                                f"Added {field.name} with minLength={min}, maxLength={max}"
-                            )
                     case AtMostOneOfEach():
                         min, max = atMostOneOfEachSchemaDeposit(
-                            field.schemas, rent_structure
+                            schemas, rent_structure
                         )
                         minSize += min
                         maxSize += max
-                        if debug:
-                            print(
-                                f"Added {field.name} with minLength={min}, maxLength={max}"
-                            )
                     case AnyOf():
                         min, max = anyOfSchemaDeposit(
-                            field.subschema, field.schemas, rent_structure
+                            field.subschema, schemas, rent_structure
                         )
                         minSize += min
                         maxSize += max
-                        if debug:
-                            print(
-                                f"Added {field.name} with minLength={min}, maxLength={max}"
-                            )
+                    case Embedded():
+                        min, max = embeddedSchemaDeposit(schemas, rent_structure)
+                        minSize += min
+                        maxSize += max
+        if debug:
+            # What the field added, which excludes the minimum of optional fields.
+            print(
+                f"Added {field.name} with minLength={minSize - fieldMinSize}, "
+                f"maxLength={maxSize - fieldMaxSize}"
+            )
 
     if debug:
         print(f"{schema.name} has {minSize}, {maxSize}")
 
+    DEPOSIT_CACHE.put(schema, rent_structure, (minSize, maxSize))
+
     return minSize, maxSize
 
 
@@ -223,22 +292,16 @@ def atMostOneOfEachSchemaDeposit(
     schemas: List[Schema], rent_structure: RentStructure
 ) -> Tuple[int, int]:
     """Calculates the minimum and maximum size for an atMostOneOfEach Subschema."""
-    # Only include schemas that are mandatory.
-    minimallySizedSchemas = [
-        calculateDeposit(schema, rent_structure)[0]
-        for schema in schemas
-        if schema.mandatory
-    ]
-    # Include all schemas.
-    maximallySizedSchemas = [
-        calculateDeposit(schema, rent_structure)[1] for schema in schemas
-    ]
-
-    # The sum of deposits of all minimally-sized (mandatory) schemas.
-    minSize = sum(minimallySizedSchemas)
-
-    # The sum of deposits of all maximally-sized schemas.
-    maxSize = sum(maximallySizedSchemas)
+    minSize = 0
+    maxSize = 0
+
+    for schema in schemas:
+        schemaMin, schemaMax = calculateDeposit(schema, rent_structure)
+        # Only mandatory schemas contribute to the minimum.
+        if schema.mandatory:
+            minSize += schemaMin
+        # All schemas contribute to the maximum.
+        maxSize += schemaMax
 
     return minSize, maxSize
 
@@ -247,18 +310,13 @@ def oneOfSchemaDeposit(
     schemas: List[Schema], rent_structure: RentStructure
 ) -> Tuple[int, int]:
     """Calculates the minimum and maximum size for a oneOf Subschema."""
-    minimallySizedSchemas = [
-        calculateDeposit(schema, rent_structure)[0] for schema in schemas
-    ]
-    maximallySizedSchemas = [
-        calculateDeposit(schema, rent_structure)[1] for schema in schemas
-    ]
+    sizes = [calculateDeposit(schema, rent_structure) for schema in schemas]
 
     # The minimum of all the minimally-sized schemas.
-    minSize = min(minimallySizedSchemas)
+    minSize = min(size[0] for size in sizes)
 
     # The maximum of all the maximally-sized schemas.
-    maxSize = max(maximallySizedSchemas)
+    maxSize = max(size[1] for size in sizes)
 
     return minSize, maxSize
 
@@ -274,3 +332,18 @@ def anyOfSchemaDeposit(
     maxSize *= subschema.maxLength
 
     return minSize, maxSize
+
+
+def embeddedSchemaDeposit(
+    schemas: List[Schema], rent_structure: RentStructure
+) -> Tuple[int, int]:
+    """Calculates the minimum and maximum size for an embedded Subschema."""
+    minSize = 0
+    maxSize = 0
+
+    for schema in schemas:
+        schemaMin, schemaMax = calculateDeposit(schema, rent_structure)
+        minSize += schemaMin
+        maxSize += schemaMax
+
+    return minSize, maxSize
@@ -0,0 +1,170 @@
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+import numpy as np
+from schemas.common import OutputOffset, boundedSchemas
+from typedefs.deposit_weight import DepositWeight, RentStructure
+from typedefs.field import ComplexField, Schema, SimpleField, trackSchemaCache
+from typedefs.subschema import (
+    AnyOf,
+    AtMostOneOfEach,
+    Embedded,
+    OneOf,
+    OptAnyOf,
+    OptOneOf,
+)
+
+# The column of each deposit weight in a coefficient or weight vector.
+WEIGHT_INDEX: Dict[DepositWeight, int] = {
+    weight: index for index, weight in enumerate(DepositWeight)
+}
+
+
+@dataclass
+class DepositCoefficients:
+    """
+    The deposit of a schema as a linear function of the rent structure weights.
+
+    Each row holds the number of bytes per deposit weight of one candidate layout of the schema.
+    Which layout is the smallest (or largest) depends on the weights when the schema contains
+    oneOf subschemas whose alternatives use different weights, so the minimum (or maximum) deposit
+    is the minimum (or maximum) over all rows. Rows that can never be the extreme value for
+    non-negative weights are pruned.
+    """
+
+    minimum: np.ndarray
+    """The candidate byte counts per weight for the minimum deposit, shape (n, weights)."""
+    maximum: np.ndarray
+    """The candidate byte counts per weight for the maximum deposit, shape (m, weights)."""
+
+    def __add__(self, other: "DepositCoefficients") -> "DepositCoefficients":
+        return DepositCoefficients(
+            minimalRows(minkowskiSum(self.minimum, other.minimum)),
+            maximalRows(minkowskiSum(self.maximum, other.maximum)),
+        )
+
+    def scale(self, minFactor: int, maxFactor: int) -> "DepositCoefficients":
+        return DepositCoefficients(self.minimum * minFactor, self.maximum * maxFactor)
+
+    def optional(self) -> "DepositCoefficients":
+        return DepositCoefficients(zeroRows(), self.maximum)
+
+    def evaluate(self, weights: np.ndarray) -> np.ndarray:
+        """Returns the minimum and maximum deposit for each row of weights, shape (n, 2)."""
+        minSizes = (self.minimum @ weights.T).min(axis=0)
+        maxSizes = (self.maximum @ weights.T).max(axis=0)
+        return np.stack([minSizes, maxSizes], axis=1)
+
+
+def zeroRows() -> np.ndarray:
+    return np.zeros((1, len(WEIGHT_INDEX)), dtype=np.int64)
+
+
+def minkowskiSum(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return (a[:, None, :] + b[None, :, :]).reshape(-1, a.shape[1])
+
+
+def minimalRows(rows: np.ndarray) -> np.ndarray:
+    """Keeps only the rows that are not dominated from below by another row."""
+    rows = np.unique(rows, axis=0)
+    # lessEqual[i, j] is set if row j is smaller or equal to row i in every column.
+    lessEqual = (rows[None, :, :] <= rows[:, None, :]).all(axis=2)
+    np.fill_diagonal(lessEqual, False)
+    return rows[~lessEqual.any(axis=1)]
+
+
+def maximalRows(rows: np.ndarray) -> np.ndarray:
+    """Keeps only the rows that are not dominated from above by another row."""
+    return -minimalRows(-rows)
+
+
+def union(coefficients: List[DepositCoefficients]) -> DepositCoefficients:
+    return DepositCoefficients(
+        minimalRows(np.concatenate([c.minimum for c in coefficients])),
+        maximalRows(np.concatenate([c.maximum for c in coefficients])),
+    )
+
+
+COMPILED_SCHEMAS: Dict[int, Tuple[Schema, DepositCoefficients]] = trackSchemaCache({})
+
+
+def compileDeposit(schema: Schema) -> DepositCoefficients:
+    """Compiles the schema into its deposit coefficients. The result is cached per schema."""
+    entry = COMPILED_SCHEMAS.get(id(schema))
+    if entry is not None:
+        return entry[1]
+
+    coefficients = DepositCoefficients(zeroRows(), zeroRows())
+    for field in schema.fields:
+        match field:
+            case SimpleField():
+                coefficients = coefficients + fieldCoefficients(field)
+            case ComplexField():
+                coefficients = coefficients + complexFieldCoefficients(field)
+
+    COMPILED_SCHEMAS[id(schema)] = (schema, coefficients)
+
+    return coefficients
+
+
+def fieldCoefficients(field: SimpleField) -> DepositCoefficients:
+    minimum = zeroRows()
+    maximum = zeroRows()
+    minimum[0, WEIGHT_INDEX[field.deposit_weight]] = field.type.min_size()
+    maximum[0, WEIGHT_INDEX[field.deposit_weight]] = field.type.max_size()
+    return DepositCoefficients(minimum, maximum)
+
+
+def complexFieldCoefficients(field: ComplexField) -> DepositCoefficients:
+    schemas = boundedSchemas(field)
+    children = [compileDeposit(schema) for schema in schemas]
+
+    match field.subschema:
+        case OptAnyOf():
+            # The minimum is unaffected, since it is optional.
+            return (
+                union(children)
+                .scale(field.subschema.minLength, field.subschema.maxLength)
+                .optional()
+            )
+        case OptOneOf():
+            # The minimum is unaffected, since it is optional.
+            return union(children).optional()
+        case OneOf():
+            return union(children)
+        case AtMostOneOfEach():
+            coefficients = DepositCoefficients(zeroRows(), zeroRows())
+            for schema, child in zip(schemas, children):
+                # Only mandatory schemas contribute to the minimum.
+                if not schema.mandatory:
+                    child = child.optional()
+                coefficients = coefficients + child
+            return coefficients
+        case AnyOf():
+            return union(children).scale(
+                field.subschema.minLength, field.subschema.maxLength
+            )
+        case Embedded():
+            coefficients = DepositCoefficients(zeroRows(), zeroRows())
+            for child in children:
+                coefficients = coefficients + child
+            return coefficients
+        case _:
+            raise TypeError(f"unsupported subschema {type(field.subschema).__name__}")
+
+
+def weightMatrix(rent_structures: List[RentStructure]) -> np.ndarray:
+    """Stacks the weights of the rent structures into a matrix, shape (n, weights)."""
+    return np.array([rent.key() for rent in rent_structures], dtype=np.int64)
+
+
+def calculateDeposits(schema: Schema, weights: np.ndarray) -> np.ndarray:
+    """
+    Calculates the minimum and maximum deposit of the schema for every row of weights.
+    The columns of weights are ordered like DepositWeight, see weightMatrix.
+    """
+    return compileDeposit(schema).evaluate(weights)
+
+
+def calculateOutputDeposits(schema: Schema, weights: np.ndarray) -> np.ndarray:
+    """Like calculateDeposits but includes the offset that is added for outputs."""
+    return (compileDeposit(OutputOffset) + compileDeposit(schema)).evaluate(weights)
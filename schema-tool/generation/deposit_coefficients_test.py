@@ -0,0 +1,28 @@
+import random
+from generation.deposit import calculateDeposit
+from generation.deposit_coefficients import calculateDeposits, weightMatrix
+from schemas.common import AVAILABLE_SCHEMAS
+from typedefs.deposit_weight import DepositWeight, RentStructure
+
+
+def RunDepositCoefficientsTests():
+    rng = random.Random(0)
+    rent_structures = [RentStructure()]
+    for _ in range(20):
+        rent_structure = RentStructure(
+            block_issuer_key=rng.randrange(300),
+            staking=rng.randrange(300),
+            delegation=rng.randrange(300),
+        )
+        rent_structure.rent_structure[DepositWeight.Data] = rng.randrange(1, 5)
+        rent_structure.rent_structure[DepositWeight.Key] = rng.randrange(30)
+        rent_structures.append(rent_structure)
+    weights = weightMatrix(rent_structures)
+
+    for schema in AVAILABLE_SCHEMAS:
+        print("Testing deposit coefficients for", schema.name)
+        deposits = calculateDeposits(schema, weights)
+        for rent_structure, deposit in zip(rent_structures, deposits):
+            expected = calculateDeposit(schema, rent_structure)
+            actual = (int(deposit[0]), int(deposit[1]))
+            assert actual == expected, f"expected: {expected}, actual: {actual}"
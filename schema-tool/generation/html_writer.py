@@ -0,0 +1,246 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import re
+from typing import Any, Iterator, List, Optional, TextIO, Tuple
+
+# The tokens of raw HTML that is written with asis. Comments and other markup are kept as-is.
+HTML_TOKEN = re.compile(
+    r"(?P<comment><!--.*?-->)"
+    r"|<(?P<closing>/?)(?P<tag>[^\s/<>!?]+)(?P<rest>[^<>]*)>"
+    r"|(?P<text>[^<>]+)"
+    r"|(?P<other><[^<>]*>)",
+    flags=re.DOTALL,
+)
+
+# Elements that have no closing tag and are therefore laid out like text.
+VOID_ELEMENTS = frozenset(
+    ["area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "wbr"]
+)
+
+
+@dataclass
+class Token:
+    kind: str
+    """One of "open", "close" or "other". Text is "text"."""
+    content: str
+    name: Optional[str] = None
+    attributes: List[Tuple[str, str]] = field(default_factory=list)
+
+    def render(self) -> str:
+        if self.kind != "open" or not self.attributes:
+            return self.content
+        attributes = "".join(
+            f' {key}="{escapeAttribute(value)}"' for key, value in self.attributes
+        )
+        return self.content[:-1] + attributes + ">"
+
+    def isBlank(self) -> bool:
+        return self.kind == "text" and not self.content.strip()
+
+
+def escapeAttribute(value: Any) -> str:
+    return (
+        str(value)
+        .replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+    )
+
+
+def tokenize(html: str) -> Iterator[Token]:
+    for match in HTML_TOKEN.finditer(html):
+        if match.group("text") is not None:
+            yield Token("text", match.group("text"))
+        elif match.group("tag") is not None and not match.group("rest").endswith("/"):
+            name = match.group("tag").lower()
+            if match.group("closing"):
+                yield Token("close", match.group(0), name)
+            elif name in VOID_ELEMENTS:
+                yield Token("other", match.group(0))
+            else:
+                yield Token("open", match.group(0), name)
+        else:
+            yield Token("other", match.group(0))
+
+
+class HtmlWriter:
+    """
+    Writes indented HTML to a sink while it is being generated.
+
+    The layout is the same as that of yattag's indent: every element starts on its own line,
+    except that elements which directly contain text are written on a single line. Whether an
+    element directly contains text is decided once its first child element is opened, so only the
+    content of such leaf elements is held in memory. Text that only follows a child element does
+    not move its parent onto a single line.
+    """
+
+    sink: TextIO
+    indentation: str
+    newline: str
+    level: int
+    """The number of open elements that were written on their own line."""
+    sameline: int
+    """The number of open elements that are written on the current line."""
+    started: bool
+    """Whether anything was written yet, i.e. whether the next line needs a line break."""
+    justOpened: bool
+    pending: List[Token]
+    """The tokens from the first element whose layout is not decided yet."""
+    opening: Optional[Token]
+    """The open tag of the most recent tag() call, to which attr() adds attributes."""
+
+    def __init__(self, sink: TextIO, indentation: str = "  ", newline: str = "\n") -> None:
+        self.sink = sink
+        self.indentation = indentation
+        self.newline = newline
+        self.level = 0
+        self.sameline = 0
+        self.started = False
+        self.justOpened = False
+        self.pending = []
+        self.opening = None
+
+    @contextmanager
+    def tag(self, name: str, *attributes: Tuple[str, Any], **kwargs: Any):
+        self.decide()
+        self.opening = Token(
+            "open",
+            f"<{name}>",
+            name,
+            [(key, str(value)) for key, value in attributes]
+            + [(attributeName(key), str(value)) for key, value in kwargs.items()],
+        )
+        yield
+        self.flushOpening()
+        self.feed(Token("close", f"</{name}>", name))
+
+    def attr(self, *attributes: Tuple[str, Any], **kwargs: Any):
+        """Adds attributes to the element that was just opened, before any of its content."""
+        if self.opening is None:
+            raise ValueError("attributes can only be added before the content of an element")
+        self.opening.attributes.extend((key, str(value)) for key, value in attributes)
+        self.opening.attributes.extend(
+            (attributeName(key), str(value)) for key, value in kwargs.items()
+        )
+
+    def asis(self, html: str):
+        """Writes raw HTML. Its tags are laid out like the ones written with tag()."""
+        self.flushOpening()
+        for token in tokenize(html):
+            self.feed(token)
+
+    def fragment(self, fragment: str):
+        """
+        Writes HTML that was produced by another writer with the same indentation.
+
+        Its lines are only shifted to the current level, which avoids re-parsing it.
+        """
+        if not fragment:
+            return
+        self.decide()
+        if self.pending or self.sameline:
+            # Inside a single-line element the fragment has to be laid out again.
+            self.asis(fragment.replace(self.newline, ""))
+            return
+
+        prefix = self.indentation * self.level
+        for line in fragment.split(self.newline):
+            if self.started:
+                self.sink.write(self.newline)
+            self.sink.write(prefix)
+            self.sink.write(line)
+            self.started = True
+        self.justOpened = False
+
+    def flushOpening(self):
+        if self.opening is not None:
+            opening = self.opening
+            self.opening = None
+            self.feed(opening)
+
+    def decide(self):
+        """Decides that the pending element does not directly contain text, since a child element is opened."""
+        self.flushOpening()
+        if self.pending:
+            tokens = self.pending
+            self.pending = []
+            self.emit(tokens[0], False)
+            for token in tokens[1:]:
+                self.feed(token)
+
+    def feed(self, token: Token):
+        if self.pending:
+            self.pending.append(token)
+            self.resolve()
+        elif token.kind == "open" and not self.sameline:
+            # Whether the element goes on a single line is only known once its content is seen.
+            self.pending.append(token)
+        else:
+            self.emit(token, False)
+
+    def resolve(self):
+        """Decides the layout of the first pending element if its content allows it."""
+        depth = 0
+        for token in self.pending[1:]:
+            if token.kind == "open":
+                depth += 1
+            elif token.kind == "close":
+                if depth == 0:
+                    break
+                depth -= 1
+            elif token.kind == "text" and depth == 0 and not token.isBlank():
+                break
+        else:
+            return
+
+        tokens = self.pending
+        self.pending = []
+        self.emit(tokens[0], token.kind == "text")
+        for token in tokens[1:]:
+            self.feed(token)
+
+    def indent(self):
+        if self.started:
+            self.sink.write(self.newline)
+        self.sink.write(self.indentation * self.level)
+
+    def emit(self, token: Token, containsText: bool):
+        if token.kind == "text":
+            if token.isBlank():
+                return
+            if not self.sameline:
+                self.indent()
+            self.sink.write(token.content)
+            self.justOpened = False
+        elif token.kind == "open":
+            self.justOpened = True
+            if self.sameline:
+                self.sameline += 1
+            else:
+                self.indent()
+                if containsText:
+                    self.sameline = 1
+            self.sink.write(token.render())
+            self.level += 1
+            self.started = True
+        elif token.kind == "close":
+            self.level -= 1
+            self.started = True
+            if self.sameline:
+                self.sameline -= 1
+            elif not self.justOpened:
+                self.indent()
+            self.sink.write(token.content)
+            self.justOpened = False
+        else:
+            if not self.sameline:
+                self.indent()
+            self.sink.write(token.content)
+            self.justOpened = False
+            self.started = True
+
+
+def attributeName(key: str) -> str:
+    # Like in yattag, "klass" stands for the reserved word "class".
+    return "class" if key == "klass" else key
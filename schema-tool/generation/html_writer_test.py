@@ -0,0 +1,46 @@
+import io
+from yattag.indentation import indent
+from generation.deposit import generateSchemaDeposit
+from generation.html_writer import HtmlWriter
+from generation.schema import SchemaGen
+from schemas.common import AVAILABLE_SCHEMAS
+from schemas.output_basic import BasicOutput
+from typedefs.generation_type import GenerationType
+
+
+def RunHtmlWriterTests():
+    print("Testing the streaming HTML writer")
+
+    sink = io.StringIO()
+    writer = HtmlWriter(sink)
+    with writer.tag("table"):
+        with writer.tag("tr"):
+            with writer.tag("td", ("valign", "top")):
+                writer.asis("Set to <strong>value 0</strong>.")
+            with writer.tag("td"):
+                writer.asis("<b>Name</b>")
+            with writer.tag("td", colspan=2):
+                with writer.tag("details"):
+                    writer.attr(open="true")
+                    with writer.tag("summary"):
+                        writer.asis("Embedded")
+            with writer.tag("td"):
+                pass
+    html = sink.getvalue()
+    assert html == indent(html), html
+    assert '<td valign="top">Set to <strong>value 0</strong>.</td>' in html, html
+    assert '<details open="true">' in html, html
+    assert "<td></td>" in html, html
+
+    # The generated HTML is laid out like yattag would indent it.
+    for schema in AVAILABLE_SCHEMAS:
+        generated = SchemaGen().generateSchemaWithSummary(
+            schema, GenerationType.Standalone
+        )
+        assert generated == indent(generated), f"{schema.name} is not indented"
+
+    # Generating a deposit table does not depend on previous calls.
+    first = generateSchemaDeposit(BasicOutput())
+    second = generateSchemaDeposit(BasicOutput())
+    assert first == second, "repeated deposit generation changes the output"
+    assert first == indent(first), "deposit table is not indented"
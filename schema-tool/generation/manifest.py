@@ -0,0 +1,107 @@
+from dataclasses import dataclass, field
+import glob
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+from typedefs.field import Schema, schemaFingerprint
+
+MANIFEST_VERSION = 1
+
+# The rendered tables depend on the generator and on the text of the types, e.g. their __str__, as
+# well, so their sources are part of every fingerprint.
+SOURCE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GENERATOR_SOURCES = ["generation/schema.py", "generation/html_writer.py", "typedefs/*.py"]
+
+
+def generatorSources() -> List[str]:
+    paths = []
+    for pattern in GENERATOR_SOURCES:
+        for path in sorted(glob.glob(os.path.join(SOURCE_ROOT, pattern))):
+            if not path.endswith("_test.py"):
+                paths.append(path)
+    return paths
+
+
+generatorHash = hashlib.sha256()
+for path in generatorSources():
+    generatorHash.update(os.path.relpath(path, SOURCE_ROOT).encode())
+    with open(path, "rb") as f:
+        generatorHash.update(f.read())
+GENERATOR_HASH = generatorHash.hexdigest()
+
+
+def contentHash(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def renderedFingerprint(schema: Schema) -> str:
+    """Returns a hash that changes whenever the generated table of the schema may change."""
+    return hashlib.sha256(
+        (GENERATOR_HASH + schemaFingerprint(schema)).encode()
+    ).hexdigest()
+
+
+@dataclass
+class TipManifestEntry:
+    contentHash: str
+    """The hash of the TIP file content after it was last updated."""
+    schemas: Dict[str, str] = field(default_factory=dict)
+    """The fingerprint of every schema whose section in the TIP was last updated, by name."""
+
+    def isUpToDate(self, tipContentHash: str, schema: Schema) -> bool:
+        """Whether the section of the schema in the TIP with the given content hash is up-to-date."""
+        return (
+            self.contentHash == tipContentHash
+            and self.schemas.get(schema.name) == renderedFingerprint(schema)
+        )
+
+
+class Manifest:
+    """Remembers the state of previously updated TIP files, keyed by their absolute path."""
+
+    path: str
+    tips: Dict[str, TipManifestEntry]
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.tips = {}
+
+    @staticmethod
+    def load(path: str) -> "Manifest":
+        manifest = Manifest(path)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            # A missing or corrupt manifest only means that everything is regenerated.
+            return manifest
+
+        if data.get("version") == MANIFEST_VERSION:
+            for tipPath, entry in data["tips"].items():
+                manifest.tips[tipPath] = TipManifestEntry(
+                    entry["contentHash"], entry["schemas"]
+                )
+
+        return manifest
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        data = {
+            "version": MANIFEST_VERSION,
+            "tips": {
+                tipPath: {"contentHash": entry.contentHash, "schemas": entry.schemas}
+                for tipPath, entry in self.tips.items()
+            },
+        }
+        # Write to a temporary file first so an interrupted run cannot corrupt the manifest.
+        temporaryPath = self.path + ".tmp"
+        with open(temporaryPath, "w") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(temporaryPath, self.path)
+
+    def get(self, tipPath: str) -> Optional[TipManifestEntry]:
+        return self.tips.get(os.path.abspath(tipPath))
+
+    def set(self, tipPath: str, entry: TipManifestEntry):
+        self.tips[os.path.abspath(tipPath)] = entry
@@ -0,0 +1,292 @@
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlparse
+from generation.deposit import calculateDeposit, calculateOutputDeposit
+from schemas import loadAllSchemas
+from schemas.common import AVAILABLE_SCHEMAS
+from typedefs.deposit_weight import DepositWeight, RentStructure
+from typedefs.field import ComplexField, Schema, SchemaReference, SimpleField
+
+# The error codes of JSON-RPC 2.0.
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+
+# The number of responses that are kept in the cache.
+CACHE_SIZE = 4096
+
+
+class QueryError(Exception):
+    code: int
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+class ResponseCache:
+    """Keeps the serialized results of the most recent queries, evicting the least recently used."""
+
+    entries: "OrderedDict[str, str]"
+    size: int
+    hits: int
+    misses: int
+    lock: threading.Lock
+    """Queries are answered on several threads, which share the cache."""
+
+    def __init__(self, size: int = CACHE_SIZE) -> None:
+        self.entries = OrderedDict()
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            result = self.entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return result
+
+    def put(self, key: str, result: str):
+        with self.lock:
+            self.entries[key] = result
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def __str__(self) -> str:
+        return f"response cache: {len(self.entries)} entries, {self.hits} hits, {self.misses} misses"
+
+
+def findSchema(params: Dict[str, Any]) -> Schema:
+    name = params.get("schema")
+    if not isinstance(name, str):
+        raise QueryError(INVALID_PARAMS, "the schema name must be given as `schema`")
+    schema = AVAILABLE_SCHEMAS.get(name)
+    if schema is None:
+        raise QueryError(INVALID_PARAMS, f"no schema with name `{name}` exists")
+    return schema
+
+
+def rentStructure(params: Dict[str, Any]) -> RentStructure:
+    """Returns the rent structure of the params, with the default weights for missing ones."""
+    weights = params.get("rentStructure", {})
+    if not isinstance(weights, dict) or not all(
+        # JSON booleans are ints in Python, but not valid weights.
+        type(value) is int and value >= 0 for value in weights.values()
+    ):
+        raise QueryError(INVALID_PARAMS, "the weights of `rentStructure` must be non-negative integers")
+    names = {weight.name[0].lower() + weight.name[1:]: weight for weight in DepositWeight}
+    unknown = set(weights) - set(names)
+    if unknown:
+        raise QueryError(INVALID_PARAMS, f"unknown weights: {', '.join(sorted(unknown))}")
+    rent_structure = RentStructure()
+    for name, value in weights.items():
+        rent_structure.rent_structure[names[name]] = value
+    return rent_structure
+
+
+def schemasQuery(params: Dict[str, Any]) -> Any:
+    return [schema.name for schema in AVAILABLE_SCHEMAS]
+
+
+def sizeQuery(params: Dict[str, Any]) -> Any:
+    """The minimum and maximum size of the schema in bytes."""
+    minSize, maxSize = calculateDeposit(findSchema(params), RentStructure.byteSize())
+    return {"min": minSize, "max": maxSize}
+
+
+def depositQuery(params: Dict[str, Any]) -> Any:
+    """The minimum and maximum storage score of the output, including the output offset."""
+    minScore, maxScore = calculateOutputDeposit(findSchema(params), rentStructure(params))
+    return {"min": minScore, "max": maxScore}
+
+
+def schemaTree(schema: Schema) -> Dict[str, Any]:
+    if isinstance(schema, SchemaReference):
+        # References are not expanded, so that recursive schemas give a finite tree.
+        return {"name": schema.name, "reference": True}
+    fields = []
+    for field in schema.fields:
+        match field:
+            case SimpleField():
+                fields.append(
+                    {
+                        "name": field.name,
+                        "type": str(field.type),
+                        "minSize": field.type.min_size(),
+                        "maxSize": field.type.max_size(),
+                        "depositWeight": field.deposit_weight.name,
+                        "description": field.description,
+                    }
+                )
+            case ComplexField():
+                subschema = {"type": type(field.subschema).__name__}
+                subschema.update(
+                    (key, int(value)) for key, value in vars(field.subschema).items()
+                )
+                fields.append(
+                    {
+                        "name": field.name,
+                        "subschema": subschema,
+                        "schemas": [schemaTree(child) for child in field.schemas],
+                    }
+                )
+    return {
+        "name": schema.name,
+        "summary": schema.summary,
+        "mandatory": schema.mandatory,
+        "tip": None if schema.tipRef is None else schema.tipRef.tipNumber,
+        "fields": fields,
+    }
+
+
+def schemaQuery(params: Dict[str, Any]) -> Any:
+    """The schema with all fields and embedded schemas."""
+    return schemaTree(findSchema(params))
+
+
+METHODS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "schemas": schemasQuery,
+    "size": sizeQuery,
+    "deposit": depositQuery,
+    "schema": schemaQuery,
+}
+
+
+class QueryService:
+    """
+    Answers JSON-RPC 2.0 queries about the schemas, which are loaded once.
+
+    A request body is either a single request or a batch, i.e. a list of requests that is answered
+    with a list of responses. The result of every query is cached in its serialized form, so a
+    repeated query is answered without computing or serializing it again.
+    """
+
+    cache: ResponseCache
+
+    def __init__(self, cache: Optional[ResponseCache] = None) -> None:
+        loadAllSchemas()
+        self.cache = ResponseCache() if cache is None else cache
+
+    def handle(self, body: bytes) -> Optional[bytes]:
+        """Answers a request body. Returns None if it only contained notifications."""
+        try:
+            request = json.loads(body)
+        except ValueError as error:
+            return self.error(None, PARSE_ERROR, f"invalid JSON: {error}").encode()
+
+        if isinstance(request, list):
+            if not request:
+                return self.error(None, INVALID_REQUEST, "empty batch").encode()
+            responses = [self.answer(entry) for entry in request]
+            responses = [response for response in responses if response is not None]
+            if not responses:
+                return None
+            return ("[" + ",".join(responses) + "]").encode()
+
+        response = self.answer(request)
+        return None if response is None else response.encode()
+
+    def answer(self, request: Any) -> Optional[str]:
+        """Answers a single request with its serialized response."""
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return self.error(None, INVALID_REQUEST, "a request needs a method")
+        requestId = request.get("id")
+        if type(requestId) not in (str, int, float, type(None)):
+            return self.error(None, INVALID_REQUEST, "the id must be a string, a number or null")
+        isNotification = "id" not in request
+        params = request.get("params", {})
+        if not isinstance(params, dict):
+            return self.error(requestId, INVALID_PARAMS, "params must be an object")
+
+        try:
+            result = self.query(request["method"], params)
+        except QueryError as error:
+            return None if isNotification else self.error(requestId, error.code, str(error))
+        if isNotification:
+            return None
+        return f'{{"jsonrpc":"2.0","id":{json.dumps(requestId)},"result":{result}}}'
+
+    def query(self, method: str, params: Dict[str, Any]) -> str:
+        """Returns the serialized result of a query, from the cache if it was answered before."""
+        key = method + json.dumps(params, sort_keys=True)
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+
+        function = METHODS.get(method)
+        if function is None:
+            raise QueryError(METHOD_NOT_FOUND, f"unknown method `{method}`")
+        result = json.dumps(function(params), separators=(",", ":"))
+        self.cache.put(key, result)
+        return result
+
+    @staticmethod
+    def error(requestId: Any, code: int, message: str) -> str:
+        return json.dumps(
+            {"jsonrpc": "2.0", "id": requestId, "error": {"code": code, "message": message}},
+            separators=(",", ":"),
+        )
+
+
+def queryParams(query: str) -> Dict[str, Any]:
+    """Reads the params of a GET request, where numbers are given as strings."""
+    params: Dict[str, Any] = {}
+    for key, value in parse_qsl(query):
+        if key in ("blockIssuerKey", "staking", "delegation", "data", "key"):
+            params.setdefault("rentStructure", {})[key] = int(value) if value.isdigit() else value
+        else:
+            params[key] = value
+    return params
+
+
+def createServer(
+    service: QueryService, host: str = "127.0.0.1", port: int = 0
+) -> ThreadingHTTPServer:
+    """
+    Creates a server that answers JSON-RPC requests posted to any path. For quick lookups, a GET
+    request to /<method>?schema=<name> is answered like a request with these params.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            self.respond(service.handle(self.rfile.read(length)))
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            request = {
+                "jsonrpc": "2.0",
+                "id": None,
+                "method": url.path.strip("/"),
+                "params": queryParams(url.query),
+            }
+            self.respond(service.handle(json.dumps(request).encode()))
+
+        def respond(self, body: Optional[bytes]):
+            if body is None:
+                self.send_response(204)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any):
+            # Queries are frequent, so they are not logged.
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
@@ -0,0 +1,95 @@
+import json
+import threading
+from urllib.request import Request, urlopen
+from generation.deposit import calculateOutputDeposit
+from generation.query_service import (
+    INVALID_PARAMS,
+    INVALID_REQUEST,
+    METHOD_NOT_FOUND,
+    PARSE_ERROR,
+    QueryService,
+    createServer,
+)
+from schemas.common import AVAILABLE_SCHEMAS
+from typedefs.deposit_weight import RentStructure
+
+
+def RunQueryServiceTests():
+    print("Testing the query service")
+
+    service = QueryService()
+
+    def query(request) -> object:
+        return json.loads(service.handle(json.dumps(request).encode()))
+
+    response = query(
+        {"jsonrpc": "2.0", "id": 1, "method": "deposit", "params": {"schema": "Basic Output"}}
+    )
+    expected = calculateOutputDeposit(AVAILABLE_SCHEMAS.get("Basic Output"), RentStructure())
+    assert response == {"jsonrpc": "2.0", "id": 1, "result": {"min": expected[0], "max": expected[1]}}
+
+    # A repeated query is answered from the cache.
+    hits = service.cache.hits
+    assert query({"jsonrpc": "2.0", "id": 2, "method": "deposit", "params": {"schema": "Basic Output"}})[
+        "result"
+    ] == response["result"]
+    assert service.cache.hits == hits + 1
+
+    # A batch is answered in order, without responses for notifications.
+    responses = query(
+        [
+            {"jsonrpc": "2.0", "id": "a", "method": "size", "params": {"schema": "Tag Feature"}},
+            {"jsonrpc": "2.0", "method": "size", "params": {"schema": "Tag Feature"}},
+            {"jsonrpc": "2.0", "id": "b", "method": "unknown"},
+            {"jsonrpc": "2.0", "id": "c", "method": "size", "params": {"schema": "Unknown"}},
+            {
+                "jsonrpc": "2.0",
+                "id": "d",
+                "method": "deposit",
+                "params": {"schema": "Basic Output", "rentStructure": {"staking": -1}},
+            },
+        ]
+    )
+    assert [response["id"] for response in responses] == ["a", "b", "c", "d"]
+    assert responses[0]["result"] == {"min": 3, "max": 257}, responses[0]
+    assert responses[1]["error"]["code"] == METHOD_NOT_FOUND
+    assert responses[2]["error"]["code"] == INVALID_PARAMS
+    assert responses[3]["error"]["code"] == INVALID_PARAMS
+
+    # Booleans are not weights, and ids that are neither a string, a number nor null are invalid.
+    invalid = query(
+        {
+            "jsonrpc": "2.0",
+            "id": 6,
+            "method": "deposit",
+            "params": {"schema": "Basic Output", "rentStructure": {"staking": True}},
+        }
+    )
+    assert invalid["error"]["code"] == INVALID_PARAMS
+    for requestId in [{"a": 1}, [1], True]:
+        invalid = query({"jsonrpc": "2.0", "id": requestId, "method": "schemas"})
+        assert invalid["id"] is None and invalid["error"]["code"] == INVALID_REQUEST, invalid
+
+    assert query({"jsonrpc": "2.0", "id": 3, "method": "schemas"})["result"] == [
+        schema.name for schema in AVAILABLE_SCHEMAS
+    ]
+    assert json.loads(service.handle(b"{"))["error"]["code"] == PARSE_ERROR
+
+    # Recursive schemas give a finite tree.
+    tree = query({"jsonrpc": "2.0", "id": 4, "method": "schema", "params": {"schema": "Node"}})["result"]
+    assert tree["fields"][1]["schemas"][0] == {"name": "Node", "reference": True}
+
+    # The same queries over HTTP.
+    server = createServer(service)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        body = json.dumps({"jsonrpc": "2.0", "id": 5, "method": "size", "params": {"schema": "Tag Feature"}})
+        with urlopen(Request(url, body.encode(), {"Content-Type": "application/json"})) as reply:
+            assert json.loads(reply.read())["result"] == {"min": 3, "max": 257}
+        with urlopen(f"{url}/deposit?schema=Basic+Output") as reply:
+            assert json.loads(reply.read())["result"] == response["result"]
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -1,23 +1,146 @@
-from typing import Any
-from yattag import SimpleDoc
-from yattag.doc import Doc
-from yattag.indentation import indent
-from typedefs.field import ComplexField, Schema, SimpleField
+import io
+from typing import Any, Dict, Optional, Set, TextIO, Tuple
+from generation.html_writer import HtmlWriter
+from typedefs.field import ComplexField, Schema, SimpleField, trackSchemaCache
 from typedefs.generation_type import GenerationType
 from typedefs.subschema import Embedded
 
 
+class FragmentCache:
+    """
+    Caches the rendered HTML of embedded schemas, which does not depend on where they are embedded.
+
+    Fragments are stored as indented at the top level and shifted to the level at which they are embedded.
+    """
+
+    fragments: Dict[Tuple[int, GenerationType, bool, bool], Tuple[Schema, str]]
+    hits: int
+    misses: int
+
+    def __init__(self) -> None:
+        self.fragments = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(
+        schema: Schema, genType: GenerationType
+    ) -> Tuple[int, GenerationType, bool, bool]:
+        # Keyed by the schema, see trackSchemaCache.
+        return id(schema), genType, schema.omitFields, schema.detailsOpen
+
+    def get(self, schema: Schema, genType: GenerationType) -> str | None:
+        entry = self.fragments.get(FragmentCache.key(schema, genType))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(self, schema: Schema, genType: GenerationType, fragment: str):
+        self.fragments[FragmentCache.key(schema, genType)] = (schema, fragment)
+
+    def clear(self):
+        self.fragments.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self) -> str:
+        return f"fragment cache: {len(self.fragments)} entries, {self.hits} hits, {self.misses} misses"
+
+
+FRAGMENT_CACHE = FragmentCache()
+trackSchemaCache(FRAGMENT_CACHE.fragments)
+
+
+def referencedSchemas(schema: Schema) -> Set[int]:
+    """
+    Returns the ids of the schemas that are embedded more than once in the rendered schema, where
+    every schema is only expanded the first time.
+    """
+    occurrences: Dict[int, int] = {}
+    stack = [schema]
+    while stack:
+        for field in stack.pop().fields:
+            if not isinstance(field, ComplexField):
+                continue
+            for embedded in field.schemas:
+                if embedded.omitFields:
+                    continue
+                occurrences[id(embedded)] = occurrences.get(id(embedded), 0) + 1
+                # Only the first occurrence is expanded.
+                if occurrences[id(embedded)] == 1:
+                    stack.append(embedded)
+    return {key for key, count in occurrences.items() if count > 1}
+
+
+class SchemaAnchors:
+    """The anchors of the schemas that were already rendered in a document."""
+
+    anchors: Dict[int, Tuple[Schema, str]]
+    names: Set[str]
+    referenced: Set[int]
+    """The schemas that are referenced after they were rendered, which are the only ones with an anchor."""
+
+    def __init__(self, schema: Schema) -> None:
+        self.anchors = {}
+        self.names = set()
+        self.referenced = referencedSchemas(schema)
+
+    def get(self, schema: Schema) -> Optional[str]:
+        entry = self.anchors.get(id(schema))
+        if entry is None:
+            return None
+        return entry[1]
+
+    def add(self, schema: Schema) -> str:
+        """Assigns an anchor to the schema that is unique within the document."""
+        base = "schema-" + "-".join([part.lower() for part in schema.name.split(" ")])
+        anchor = base
+        suffix = 2
+        while anchor in self.names:
+            anchor = f"{base}-{suffix}"
+            suffix += 1
+        self.names.add(anchor)
+        self.anchors[id(schema)] = (schema, anchor)
+        return anchor
+
+
 class SchemaGen:
-    doc: SimpleDoc
+    writer: HtmlWriter
     tag: Any
     asis: Any
+    cache: FragmentCache | None
+    references: bool
+    """Whether embedded schemas are only rendered the first time and referenced afterwards."""
+    anchors: Optional[SchemaAnchors]
 
-    def __init__(self) -> None:
-        self.doc = Doc()
-        _, self.tag, _ = self.doc.tagtext()
-        self.asis = self.doc.asis
+    def __init__(
+        self, cache: FragmentCache | None = FRAGMENT_CACHE, references: bool = False
+    ) -> None:
+        self.cache = cache
+        self.references = references
+        self.anchors = None
 
     def generateSchemaWithSummary(self, schema: Schema, genType: GenerationType) -> str:
+        sink = io.StringIO()
+        self.writeSchemaWithSummary(schema, genType, sink)
+
+        return sink.getvalue()
+
+    def writeSchemaWithSummary(
+        self, schema: Schema, genType: GenerationType, sink: TextIO
+    ):
+        """Writes the indented HTML of the schema to the sink while it is generated."""
+        self.writer = HtmlWriter(sink)
+        self.tag = self.writer.tag
+        self.asis = self.writer.asis
+        self.anchors = SchemaAnchors(schema) if self.references else None
+        self.renderSchemaWithSummary(schema, genType)
+
+    def renderSchemaWithSummary(
+        self, schema: Schema, genType: GenerationType, anchor: Optional[str] = None
+    ):
         if genType == GenerationType.Standalone:
             if schema.summary is not None:
                 with self.tag("details"):
@@ -26,13 +149,48 @@ class SchemaGen:
 
         elif genType == GenerationType.Embedded:
             with self.tag("details"):
+                if anchor is not None:
+                    self.writer.attr(id=anchor)
                 if schema.detailsOpen:
-                    self.doc.attr(open="true")
+                    self.writer.attr(open="true")
                 self.generateSummary(schema, genType)
                 if not schema.omitFields:
                     self.generateSchema(schema)
 
-        return indent(self.doc.getvalue())
+    def renderEmbeddedSchema(self, schema: Schema):
+        if self.anchors is not None and not schema.omitFields:
+            # Cached fragments would repeat the schemas nested in them, so they are not used here.
+            anchor = self.anchors.get(schema)
+            if anchor is None:
+                if id(schema) in self.anchors.referenced:
+                    anchor = self.anchors.add(schema)
+                self.renderSchemaWithSummary(schema, GenerationType.Embedded, anchor)
+            else:
+                self.renderSchemaReference(schema, anchor)
+            return
+
+        if self.cache is None:
+            self.renderSchemaWithSummary(schema, GenerationType.Embedded)
+            return
+
+        fragment = self.cache.get(schema, GenerationType.Embedded)
+        if fragment is None:
+            fragment = SchemaGen(self.cache).generateSchemaWithSummary(
+                schema, GenerationType.Embedded
+            )
+            self.cache.put(schema, GenerationType.Embedded, fragment)
+        self.writer.fragment(fragment)
+
+    def renderSchemaReference(self, schema: Schema, anchor: str):
+        """Renders a schema that was already rendered in the document as a link to it."""
+        with self.tag("details"):
+            with self.tag("summary"):
+                self.asis(schema.name)
+            reference = f"See <a href='#{anchor}'>{schema.name}</a> above."
+            if schema.tipRef is not None:
+                reference = reference + " " + schema.definedIn()
+            with self.tag("blockquote"):
+                self.asis(reference)
 
     def generateSummary(self, schema: Schema, genType: GenerationType):
         with self.tag("summary"):
@@ -85,4 +243,4 @@ class SchemaGen:
                 self.asis(fieldName)
             with self.tag("td", ("colspan", 2)):
                 for schema in field.schemas:
-                    self.generateSchemaWithSummary(schema, GenerationType.Embedded)
+                    self.renderEmbeddedSchema(schema)
@@ -0,0 +1,48 @@
+import re
+from generation.schema import FragmentCache, SchemaGen
+from schemas.common import AVAILABLE_SCHEMAS
+from typedefs.field import ComplexField
+from typedefs.generation_type import GenerationType
+
+
+def RunSchemaGenerationTests():
+    print("Testing that schemas are immutable")
+
+    for schema in AVAILABLE_SCHEMAS:
+        hash(schema)
+        assert isinstance(schema.fields, tuple), schema.name
+        for field in schema.fields:
+            if isinstance(field, ComplexField):
+                assert isinstance(field.schemas, tuple), f"{schema.name}.{field.name}"
+
+    print("Testing schema generation with the fragment cache")
+
+    cache = FragmentCache()
+    for schema in AVAILABLE_SCHEMAS:
+        uncached = SchemaGen(None).generateSchemaWithSummary(
+            schema, GenerationType.Standalone
+        )
+        cached = SchemaGen(cache).generateSchemaWithSummary(
+            schema, GenerationType.Standalone
+        )
+        assert cached == uncached, f"cached fragments change the output of {schema.name}"
+
+    assert cache.hits > 0, str(cache)
+
+    print("Testing schema generation with references")
+
+    references = 0
+    for schema in AVAILABLE_SCHEMAS:
+        generated = SchemaGen(references=True).generateSchemaWithSummary(
+            schema, GenerationType.Standalone
+        )
+        anchors = re.findall(r'<details id="([^"]+)"', generated)
+        assert len(anchors) == len(set(anchors)), f"duplicate anchors in {schema.name}"
+        links = re.findall(r"<a href='#(schema-[^']+)'>", generated)
+        for link in links:
+            assert link in anchors, f"{schema.name} links to the missing anchor {link}"
+            references += 1
+        # Only schemas that are referenced get an anchor.
+        assert set(anchors) == set(links), f"unreferenced anchors in {schema.name}"
+
+    assert references > 0, "no schema is referenced"
@@ -0,0 +1,293 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Tuple
+import numpy as np
+from schemas.common import OutputOffset, boundedSchemas
+from typedefs.datatype import LengthPrefixedArray
+from typedefs.deposit_weight import RentStructure
+from typedefs.field import ComplexField, Schema, SimpleField, trackSchemaCache
+from typedefs.subschema import (
+    AnyOf,
+    AtMostOneOfEach,
+    Embedded,
+    OneOf,
+    OptAnyOf,
+    OptOneOf,
+)
+
+# Counts are int64 as long as they provably fit, and exact Python integers otherwise.
+INT64_LIMIT = float(2**62)
+# The largest number of cells a distribution may have, to fail early for schemas like Block whose
+# distribution would not fit into memory.
+MAX_CELLS = 20_000_000
+# The largest number of count multiplications a single convolution may take.
+MAX_WORK = 2_000_000_000
+
+
+class DistributionTooLarge(ValueError):
+    pass
+
+
+@dataclass
+class SizeDistribution:
+    """
+    The multiset of the (byte size, storage score) pairs of all layouts of a schema.
+
+    A layout is one choice of the variants, list lengths and array lengths the schema allows. The
+    storage score of a layout is its byte size plus an excess from the bytes whose weight is not 1.
+    Since only few fields have such weights, the pairs are grouped by their excess, and the number
+    of layouts per byte size is held in a dense array for each excess.
+    """
+
+    counts: Dict[int, Tuple[int, np.ndarray]] = field(default_factory=dict)
+    """The smallest byte size and the number of layouts per byte size from it, by excess."""
+
+    @staticmethod
+    def point(size: int, excess: int) -> "SizeDistribution":
+        return SizeDistribution({excess: (size, np.ones(1, dtype=np.int64))})
+
+    @staticmethod
+    def empty() -> "SizeDistribution":
+        """The distribution of a schema without fields, which has a single layout of 0 bytes."""
+        return SizeDistribution.point(0, 0)
+
+    def cells(self) -> int:
+        return sum(len(counts) for _, counts in self.counts.values())
+
+    def add(self, excess: int, offset: int, counts: np.ndarray):
+        """Adds the counts of the layouts with the given excess, starting at the size offset."""
+        if excess not in self.counts:
+            self.counts[excess] = (offset, counts)
+            return
+        ownOffset, own = self.counts[excess]
+        start = min(ownOffset, offset)
+        end = max(ownOffset + len(own), offset + len(counts))
+        dtype = countType(own, counts)
+        merged = np.zeros(end - start, dtype=dtype)
+        merged[ownOffset - start : ownOffset - start + len(own)] += own.astype(dtype)
+        merged[offset - start : offset - start + len(counts)] += counts.astype(dtype)
+        self.counts[excess] = (start, merged)
+
+    def __add__(self, other: "SizeDistribution") -> "SizeDistribution":
+        """The union of the layouts of both distributions."""
+        result = SizeDistribution(dict(self.counts))
+        for excess, (offset, counts) in other.counts.items():
+            result.add(excess, offset, counts)
+        return result
+
+    def __mul__(self, other: "SizeDistribution") -> "SizeDistribution":
+        """The layouts of both distributions one after the other, i.e. their convolution."""
+        # The size of the result is known beforehand, so that too large results fail early.
+        spans: Dict[int, Tuple[int, int]] = {}
+        work = 0
+        for excess, (offset, counts) in self.counts.items():
+            for otherExcess, (otherOffset, otherCounts) in other.counts.items():
+                work += len(counts) * len(otherCounts)
+                start = offset + otherOffset
+                end = start + len(counts) + len(otherCounts) - 1
+                span = spans.get(excess + otherExcess, (start, end))
+                spans[excess + otherExcess] = (min(span[0], start), max(span[1], end))
+        if sum(end - start for start, end in spans.values()) > MAX_CELLS:
+            raise DistributionTooLarge(
+                f"the size distribution has more than {MAX_CELLS} cells"
+            )
+        if work > MAX_WORK:
+            raise DistributionTooLarge(
+                f"the size distribution takes more than {MAX_WORK} multiplications"
+            )
+
+        result = SizeDistribution()
+        for excess, (offset, counts) in self.counts.items():
+            for otherExcess, (otherOffset, otherCounts) in other.counts.items():
+                result.add(
+                    excess + otherExcess,
+                    offset + otherOffset,
+                    convolveCounts(counts, otherCounts),
+                )
+        return result
+
+    def total(self) -> int:
+        """The number of layouts."""
+        return sum(int(counts.sum()) for _, counts in self.counts.values())
+
+    def pairs(self) -> Iterator[Tuple[int, int, int]]:
+        """Yields the (byte size, storage score, number of layouts) of every reachable pair, ordered by score."""
+        entries = []
+        for excess, (offset, counts) in self.counts.items():
+            for index in np.flatnonzero(counts):
+                size = offset + int(index)
+                entries.append((size + excess, size, int(counts[index])))
+        for score, size, count in sorted(entries):
+            yield size, score, count
+
+    def sizeRange(self) -> Tuple[int, int]:
+        sizes = [size for size, _, _ in self.pairs()]
+        return min(sizes), max(sizes)
+
+    def scoreRange(self) -> Tuple[int, int]:
+        scores = [score for _, score, _ in self.pairs()]
+        return min(scores), max(scores)
+
+    def histogram(self, bins: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the number of layouts per storage score bin and the bin edges, like np.histogram.
+
+        The counts are exact, so they are summed as Python integers rather than float weights.
+        """
+        _, scores, counts = zip(*self.pairs())
+        edges = np.histogram_bin_edges(np.array(scores), bins=bins)
+        # The last bin includes its upper edge.
+        indices = np.minimum(np.searchsorted(edges, scores, side="right") - 1, bins - 1)
+        binCounts = np.zeros(bins, dtype=object)
+        np.add.at(binCounts, indices, np.array(counts, dtype=object))
+        return binCounts, edges
+
+
+def countType(a: np.ndarray, b: np.ndarray, product: bool = False) -> type:
+    """Returns the dtype in which the sum or product of two count arrays is exact."""
+    if a.dtype == object or b.dtype == object:
+        return object
+    # Every count of the result is at most the sum or product of the totals.
+    aTotal = float(a.sum(dtype=np.float64))
+    bTotal = float(b.sum(dtype=np.float64))
+    bound = aTotal * bTotal if product else aTotal + bTotal
+    return np.int64 if bound < INT64_LIMIT else object
+
+
+def convolveCounts(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if countType(a, b, product=True) is np.int64:
+        return np.convolve(a, b)
+
+    # Exact counts that exceed int64 are convolved by packing each array into a single Python
+    # integer with fixed-width digits and multiplying those (Kronecker substitution), which is much
+    # faster than convolving object arrays.
+    bound = int(max(a)) * int(max(b)) * min(len(a), len(b))
+    width = (bound.bit_length() + 8) // 8
+    packedA = int.from_bytes(b"".join(int(x).to_bytes(width, "little") for x in a), "little")
+    packedB = int.from_bytes(b"".join(int(x).to_bytes(width, "little") for x in b), "little")
+    length = len(a) + len(b) - 1
+    product = (packedA * packedB).to_bytes(width * length, "little")
+    result = np.empty(length, dtype=object)
+    for index in range(length):
+        result[index] = int.from_bytes(
+            product[index * width : (index + 1) * width], "little"
+        )
+    return result
+
+
+def power(distribution: SizeDistribution, exponent: int) -> SizeDistribution:
+    result = SizeDistribution.empty()
+    while exponent > 0:
+        if exponent & 1:
+            result = result * distribution
+        exponent >>= 1
+        if exponent:
+            distribution = distribution * distribution
+    return result
+
+
+# Keyed by the schema, see trackSchemaCache, and the weights of the rent structure.
+DISTRIBUTIONS: Dict[Tuple[int, Tuple[int, ...]], Tuple[Schema, SizeDistribution]] = trackSchemaCache({})
+
+
+def sizeDistribution(schema: Schema, rent_structure: RentStructure) -> SizeDistribution:
+    """Computes the distribution of the (byte size, storage score) pairs of all layouts of the schema."""
+    key = (id(schema), rent_structure.key())
+    entry = DISTRIBUTIONS.get(key)
+    if entry is not None:
+        return entry[1]
+
+    distribution = SizeDistribution.empty()
+    for schemaField in schema.fields:
+        match schemaField:
+            case SimpleField():
+                distribution = distribution * fieldDistribution(
+                    schemaField, rent_structure
+                )
+            case ComplexField():
+                distribution = distribution * complexFieldDistribution(
+                    schemaField, rent_structure
+                )
+
+    DISTRIBUTIONS[key] = (schema, distribution)
+
+    return distribution
+
+
+def fieldDistribution(
+    schemaField: SimpleField, rent_structure: RentStructure
+) -> SizeDistribution:
+    extraWeight = rent_structure.weight(schemaField.deposit_weight) - 1
+    minSize = schemaField.type.min_size()
+    maxSize = schemaField.type.max_size()
+    step = 1
+    if isinstance(schemaField.type, LengthPrefixedArray):
+        step = schemaField.type.typeElement.max_size()
+
+    distribution = SizeDistribution()
+    for size in range(minSize, maxSize + 1, step):
+        distribution.add(size * extraWeight, size, np.ones(1, dtype=np.int64))
+    return distribution
+
+
+def union(distributions: List[SizeDistribution]) -> SizeDistribution:
+    result = SizeDistribution()
+    for distribution in distributions:
+        result = result + distribution
+    return result
+
+
+def lengthRange(
+    element: SizeDistribution, minLength: int, maxLength: int
+) -> SizeDistribution:
+    """The layouts of lists of minLength to maxLength elements."""
+    current = power(element, minLength)
+    result = current
+    for _ in range(minLength, maxLength):
+        current = current * element
+        result = result + current
+    return result
+
+
+def complexFieldDistribution(
+    schemaField: ComplexField, rent_structure: RentStructure
+) -> SizeDistribution:
+    schemas = boundedSchemas(schemaField)
+    children = [sizeDistribution(schema, rent_structure) for schema in schemas]
+
+    match schemaField.subschema:
+        case OptAnyOf() | AnyOf():
+            return lengthRange(
+                union(children),
+                schemaField.subschema.minLength,
+                schemaField.subschema.maxLength,
+            )
+        case OptOneOf():
+            return union(children) + SizeDistribution.empty()
+        case OneOf():
+            return union(children)
+        case AtMostOneOfEach():
+            distribution = SizeDistribution.empty()
+            for schema, child in zip(schemas, children):
+                # Only mandatory schemas are always present.
+                if not schema.mandatory:
+                    child = child + SizeDistribution.empty()
+                distribution = distribution * child
+            return distribution
+        case Embedded():
+            distribution = SizeDistribution.empty()
+            for child in children:
+                distribution = distribution * child
+            return distribution
+        case _:
+            raise TypeError(
+                f"unsupported subschema {type(schemaField.subschema).__name__}"
+            )
+
+
+def outputSizeDistribution(
+    schema: Schema, rent_structure: RentStructure
+) -> SizeDistribution:
+    """Like sizeDistribution but includes the offset that is added for outputs."""
+    return sizeDistribution(OutputOffset, rent_structure) * sizeDistribution(
+        schema, rent_structure
+    )
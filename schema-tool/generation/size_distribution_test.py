@@ -0,0 +1,161 @@
+from collections import Counter
+from typing import Optional
+from generation.deposit import calculateDeposit, calculateOutputDeposit
+from generation.size_distribution import (
+    DistributionTooLarge,
+    SizeDistribution,
+    convolveCounts,
+    outputSizeDistribution,
+    sizeDistribution,
+)
+from schemas.common import AVAILABLE_SCHEMAS, boundedSchemas
+from typedefs.datatype import LengthPrefixedArray
+from typedefs.deposit_weight import RentStructure
+from typedefs.field import ComplexField, Schema, SimpleField
+from typedefs.subschema import (
+    AnyOf,
+    AtMostOneOfEach,
+    Embedded,
+    OneOf,
+    OptAnyOf,
+    OptOneOf,
+)
+import numpy as np
+
+# Schemas with more layouts than this are not enumerated by the tests.
+MAX_ENUMERATED = 20_000
+
+
+def enumerateLayouts(
+    schema: Schema, rent_structure: RentStructure
+) -> Optional[Counter]:
+    """Counts the layouts per (byte size, storage score) by listing them, or returns None if there are too many."""
+    layouts = Counter({(0, 0): 1})
+    for field in schema.fields:
+        match field:
+            case SimpleField():
+                options = simpleFieldLayouts(field, rent_structure)
+            case ComplexField():
+                options = complexFieldLayouts(field, rent_structure)
+        if options is None:
+            return None
+        layouts = combine(layouts, options)
+        if layouts is None:
+            return None
+    return layouts
+
+
+def simpleFieldLayouts(field: SimpleField, rent_structure: RentStructure) -> Counter:
+    weight = rent_structure.weight(field.deposit_weight)
+    step = 1
+    if isinstance(field.type, LengthPrefixedArray):
+        step = field.type.typeElement.max_size()
+    return Counter(
+        (size, size * weight)
+        for size in range(field.type.min_size(), field.type.max_size() + 1, step)
+    )
+
+
+def complexFieldLayouts(
+    field: ComplexField, rent_structure: RentStructure
+) -> Optional[Counter]:
+    schemas = boundedSchemas(field)
+    children = [enumerateLayouts(schema, rent_structure) for schema in schemas]
+    if any(child is None for child in children):
+        return None
+    variants = sum(children, Counter())
+    nothing = Counter({(0, 0): 1})
+    match field.subschema:
+        case OptAnyOf() | AnyOf():
+            layouts = nothing if field.subschema.minLength == 0 else Counter()
+            current = nothing
+            for length in range(1, field.subschema.maxLength + 1):
+                current = combine(current, variants)
+                if current is None:
+                    return None
+                if length >= field.subschema.minLength:
+                    layouts += current
+            return layouts
+        case OptOneOf():
+            return variants + nothing
+        case OneOf():
+            return variants
+        case AtMostOneOfEach():
+            layouts = nothing
+            for schema, child in zip(schemas, children):
+                layouts = combine(layouts, child if schema.mandatory else child + nothing)
+                if layouts is None:
+                    return None
+            return layouts
+        case Embedded():
+            layouts = nothing
+            for child in children:
+                layouts = combine(layouts, child)
+                if layouts is None:
+                    return None
+            return layouts
+
+
+def combine(a: Counter, b: Counter) -> Optional[Counter]:
+    if sum(a.values()) * sum(b.values()) > MAX_ENUMERATED:
+        return None
+    result = Counter()
+    for (size, score), count in a.items():
+        for (otherSize, otherScore), otherCount in b.items():
+            result[(size + otherSize, score + otherScore)] += count * otherCount
+    return result
+
+
+def RunSizeDistributionTests():
+    print("Testing the size distribution of schemas")
+
+    # Counts that exceed int64 are convolved exactly.
+    large = np.array([2**70, 1, 2**40], dtype=object)
+    assert list(convolveCounts(large, large)) == [
+        int(x) for x in np.convolve(large, large)
+    ]
+
+    rent_structure = RentStructure()
+    byteSize = RentStructure.byteSize()
+    enumerated = 0
+    for schema in AVAILABLE_SCHEMAS:
+        try:
+            distribution = sizeDistribution(schema, rent_structure)
+        except DistributionTooLarge:
+            # Only the schemas that contain a whole transaction are too large.
+            assert schema.name in [
+                "Transaction",
+                "Signed Transaction",
+                "Basic Block Body",
+                "Block",
+            ], f"{schema.name} should have a distribution"
+            continue
+
+        # The extremes of the distribution are the ones of the deposit calculation.
+        assert distribution.sizeRange() == calculateDeposit(schema, byteSize), schema.name
+        assert distribution.scoreRange() == calculateDeposit(
+            schema, rent_structure
+        ), schema.name
+
+        layouts = enumerateLayouts(schema, rent_structure)
+        if layouts is not None:
+            enumerated += 1
+            assert distribution.total() == sum(layouts.values()), schema.name
+            assert list(distribution.pairs()) == [
+                (size, score, count)
+                for (size, score), count in sorted(
+                    layouts.items(), key=lambda item: (item[0][1], item[0][0])
+                )
+            ], schema.name
+    assert enumerated > 20, enumerated
+
+    output = AVAILABLE_SCHEMAS.get("NFT Output")
+    distribution = outputSizeDistribution(output, rent_structure)
+    assert distribution.scoreRange() == calculateOutputDeposit(output, rent_structure)
+    counts, edges = distribution.histogram(10)
+    assert len(counts) == 10 and len(edges) == 11
+    assert int(counts.sum()) == distribution.total()
+
+    # A union counts the layouts of both sides.
+    both = SizeDistribution.point(1, 0) + SizeDistribution.point(1, 0)
+    assert list(both.pairs()) == [(1, 1, 2)]
@@ -0,0 +1,276 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from generation.deposit_coefficients import maximalRows, minimalRows, minkowskiSum
+from schemas.common import OutputOffset, boundedSchemas
+from typedefs.datatype import LengthPrefixedArray
+from typedefs.deposit_weight import RentStructure
+from typedefs.field import ComplexField, Schema, SimpleField, trackSchemaCache
+from typedefs.limit import LIMITS, Limit
+from typedefs.subschema import (
+    AnyOf,
+    AtMostOneOfEach,
+    Embedded,
+    OneOf,
+    OptAnyOf,
+    OptOneOf,
+)
+
+# A product of limits given by their sorted names. The empty product is the constant term.
+Monomial = Tuple[str, ...]
+
+
+@dataclass
+class Polynomials:
+    """
+    Candidate polynomials over the limits, of which the size is the smallest (or largest) value.
+
+    Like the rows of DepositCoefficients, there are several candidates because which alternative of
+    a oneOf is the smallest or largest depends on the values of the limits. Limits and coefficients
+    are never negative, so a candidate that is dominated in every coefficient is pruned.
+    """
+
+    monomials: Tuple[Monomial, ...]
+    """The monomial of each column."""
+    rows: np.ndarray
+    """The coefficients of each candidate, shape (candidates, monomials)."""
+
+    @staticmethod
+    def constant(value: int) -> "Polynomials":
+        return Polynomials(((),), np.array([[value]], dtype=np.int64))
+
+    def withMonomials(self, monomials: Tuple[Monomial, ...]) -> np.ndarray:
+        """Returns the rows expanded to the given monomials, which include the own ones."""
+        rows = np.zeros((len(self.rows), len(monomials)), dtype=np.int64)
+        columns = [monomials.index(monomial) for monomial in self.monomials]
+        rows[:, columns] = self.rows
+        return rows
+
+    def times(self, factor: int) -> "Polynomials":
+        """Multiplies every candidate by a number or a limit."""
+        if not isinstance(factor, Limit):
+            return Polynomials(self.monomials, self.rows * factor)
+        return Polynomials(
+            tuple(tuple(sorted(monomial + (factor.name,))) for monomial in self.monomials),
+            self.rows,
+        )
+
+    def evaluate(self, values: Dict[str, np.ndarray], largest: bool) -> np.ndarray:
+        """Returns the smallest or largest candidate for each combination of limit values."""
+        count = len(next(iter(values.values())))
+        monomialValues = np.ones((count, len(self.monomials)), dtype=np.int64)
+        for column, monomial in enumerate(self.monomials):
+            for name in monomial:
+                monomialValues[:, column] *= values[name]
+        sizes = monomialValues @ self.rows.T
+        return sizes.max(axis=1) if largest else sizes.min(axis=1)
+
+    def format(self, largest: bool) -> str:
+        candidates = []
+        for row in self.rows:
+            terms = []
+            for monomial, coefficient in zip(self.monomials, row):
+                if coefficient == 0:
+                    continue
+                factors = ([str(coefficient)] if coefficient != 1 or not monomial else []) + list(
+                    monomial
+                )
+                terms.append(" * ".join(factors))
+            candidates.append(" + ".join(terms) or "0")
+        if len(candidates) == 1:
+            return candidates[0]
+        return ("max" if largest else "min") + "(" + ", ".join(candidates) + ")"
+
+
+def commonMonomials(polynomials: List[Polynomials]) -> Tuple[Monomial, ...]:
+    monomials = {monomial for p in polynomials for monomial in p.monomials}
+    # The constant term comes first, then by degree.
+    return tuple(sorted(monomials, key=lambda monomial: (len(monomial), monomial)))
+
+
+def combine(a: Polynomials, b: Polynomials, largest: bool) -> Polynomials:
+    """The candidates of two fields that follow each other, i.e. their pairwise sums."""
+    monomials = commonMonomials([a, b])
+    rows = minkowskiSum(a.withMonomials(monomials), b.withMonomials(monomials))
+    return Polynomials(monomials, prune(rows, largest))
+
+
+def union(polynomials: List[Polynomials], largest: bool) -> Polynomials:
+    """The candidates of alternatives, of which any one can be chosen."""
+    monomials = commonMonomials(polynomials)
+    rows = np.concatenate([p.withMonomials(monomials) for p in polynomials])
+    return Polynomials(monomials, prune(rows, largest))
+
+
+def prune(rows: np.ndarray, largest: bool) -> np.ndarray:
+    return maximalRows(rows) if largest else minimalRows(rows)
+
+
+@dataclass
+class SizeExpression:
+    """The minimum and maximum size of a schema as a function of the protocol limits."""
+
+    minimum: Polynomials
+    maximum: Polynomials
+
+    @staticmethod
+    def constant(minimum: int, maximum: int) -> "SizeExpression":
+        return SizeExpression(Polynomials.constant(minimum), Polynomials.constant(maximum))
+
+    def __add__(self, other: "SizeExpression") -> "SizeExpression":
+        return SizeExpression(
+            combine(self.minimum, other.minimum, largest=False),
+            combine(self.maximum, other.maximum, largest=True),
+        )
+
+    def scale(self, minFactor: int, maxFactor: int) -> "SizeExpression":
+        return SizeExpression(self.minimum.times(minFactor), self.maximum.times(maxFactor))
+
+    def optional(self) -> "SizeExpression":
+        return SizeExpression(Polynomials.constant(0), self.maximum)
+
+    def limits(self) -> List[str]:
+        """The names of the limits the size depends on."""
+        return sorted(
+            {
+                name
+                for polynomials in [self.minimum, self.maximum]
+                for monomial in polynomials.monomials
+                for name in monomial
+            }
+        )
+
+    def evaluate(self, **limits) -> np.ndarray:
+        """
+        Returns the minimum and maximum size for every combination of limit values, shape (n, 2).
+
+        Each limit is given by name as a number or an array of n values. Limits that are not given
+        keep their current value.
+        """
+        arrays = [np.asarray(value, dtype=np.int64) for value in limits.values()]
+        count = max([len(array) if array.ndim else 1 for array in arrays] or [1])
+        values = {name: np.full(count, int(limit)) for name, limit in LIMITS.items()}
+        for name, array in zip(limits, arrays):
+            if name not in LIMITS:
+                raise KeyError(f"unknown limit {name}")
+            values[name] = np.broadcast_to(array, count)
+        return np.stack(
+            [
+                self.minimum.evaluate(values, largest=False),
+                self.maximum.evaluate(values, largest=True),
+            ],
+            axis=1,
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"min: {self.minimum.format(largest=False)}\n"
+            f"max: {self.maximum.format(largest=True)}"
+        )
+
+
+# Keyed by the schema, see trackSchemaCache, and the weights of the rent structure.
+COMPILED_EXPRESSIONS: Dict[
+    Tuple[int, Optional[Tuple[int, ...]]], Tuple[Schema, SizeExpression]
+] = trackSchemaCache({})
+
+
+def compileSizeExpression(
+    schema: Schema, rent_structure: Optional[RentStructure] = None
+) -> SizeExpression:
+    """
+    Compiles the schema into its size as a function of the protocol limits.
+
+    Without a rent structure the size is in bytes, otherwise it is the storage score. The result is
+    cached, so re-evaluating it for other limits does not walk the schema again.
+    """
+    key = (id(schema), None if rent_structure is None else rent_structure.key())
+    entry = COMPILED_EXPRESSIONS.get(key)
+    if entry is not None:
+        return entry[1]
+
+    expression = SizeExpression.constant(0, 0)
+    for field in schema.fields:
+        match field:
+            case SimpleField():
+                expression = expression + fieldExpression(field, rent_structure)
+            case ComplexField():
+                expression = expression + complexFieldExpression(field, rent_structure)
+
+    COMPILED_EXPRESSIONS[key] = (schema, expression)
+
+    return expression
+
+
+def fieldExpression(
+    field: SimpleField, rent_structure: Optional[RentStructure]
+) -> SizeExpression:
+    weight = 1 if rent_structure is None else rent_structure.weight(field.deposit_weight)
+    if not isinstance(field.type, LengthPrefixedArray):
+        return SizeExpression.constant(
+            field.type.min_size() * weight, field.type.max_size() * weight
+        )
+    # The lengths of an array may be limits, so the prefix and the content are added separately.
+    prefix = SizeExpression.constant(
+        field.type.typePrefix.min_size() * weight,
+        field.type.typePrefix.max_size() * weight,
+    )
+    content = SizeExpression.constant(weight, weight).scale(
+        field.type.minLength, field.type.maxLength
+    )
+    return prefix + content
+
+
+def complexFieldExpression(
+    field: ComplexField, rent_structure: Optional[RentStructure]
+) -> SizeExpression:
+    schemas = boundedSchemas(field)
+    children = [compileSizeExpression(schema, rent_structure) for schema in schemas]
+
+    def alternatives() -> SizeExpression:
+        return SizeExpression(
+            union([child.minimum for child in children], largest=False),
+            union([child.maximum for child in children], largest=True),
+        )
+
+    match field.subschema:
+        case OptAnyOf():
+            # The minimum is unaffected, since it is optional.
+            return (
+                alternatives()
+                .scale(field.subschema.minLength, field.subschema.maxLength)
+                .optional()
+            )
+        case OptOneOf():
+            # The minimum is unaffected, since it is optional.
+            return alternatives().optional()
+        case OneOf():
+            return alternatives()
+        case AtMostOneOfEach():
+            expression = SizeExpression.constant(0, 0)
+            for schema, child in zip(schemas, children):
+                # Only mandatory schemas contribute to the minimum.
+                if not schema.mandatory:
+                    child = child.optional()
+                expression = expression + child
+            return expression
+        case AnyOf():
+            return alternatives().scale(
+                field.subschema.minLength, field.subschema.maxLength
+            )
+        case Embedded():
+            expression = SizeExpression.constant(0, 0)
+            for child in children:
+                expression = expression + child
+            return expression
+        case _:
+            raise TypeError(f"unsupported subschema {type(field.subschema).__name__}")
+
+
+def compileOutputSizeExpression(
+    schema: Schema, rent_structure: Optional[RentStructure] = None
+) -> SizeExpression:
+    """Like compileSizeExpression but includes the offset that is added for outputs."""
+    return compileSizeExpression(OutputOffset, rent_structure) + compileSizeExpression(
+        schema, rent_structure
+    )
@@ -0,0 +1,65 @@
+import numpy as np
+from generation.deposit import calculateDeposit, calculateOutputDeposit
+from generation.size_expression import (
+    compileOutputSizeExpression,
+    compileSizeExpression,
+)
+from schemas.common import AVAILABLE_SCHEMAS
+from schemas.input import UTXOInput
+from schemas.output_basic import BasicOutput
+from schemas.output_nft import NftOutput
+from schemas.transaction import MAX_INPUTS_COUNT, MAX_OUTPUTS_COUNT
+from typedefs.deposit_weight import RentStructure
+from typedefs.field import ComplexField, Schema
+from typedefs.subschema import AnyOf, OptAnyOf
+
+
+def limitedSchema(maxInputs: int, maxOutputs: int) -> Schema:
+    return Schema(
+        "Limited Transaction",
+        "A transaction-like schema whose list lengths are given.",
+        [
+            ComplexField("Inputs", AnyOf(1, maxInputs), [UTXOInput()]),
+            ComplexField("Outputs", OptAnyOf(maxOutputs), [BasicOutput(), NftOutput()]),
+        ],
+    )
+
+
+def RunSizeExpressionTests():
+    print("Testing size expressions over protocol limits")
+
+    # With the current limits, the expressions are the deposit bounds.
+    rent_structure = RentStructure()
+    byteSize = RentStructure.byteSize()
+    for schema in AVAILABLE_SCHEMAS:
+        sizes = compileSizeExpression(schema).evaluate()
+        assert tuple(int(x) for x in sizes[0]) == calculateDeposit(schema, byteSize), schema.name
+        scores = compileSizeExpression(schema, rent_structure).evaluate()
+        assert tuple(int(x) for x in scores[0]) == calculateDeposit(
+            schema, rent_structure
+        ), schema.name
+
+    output = AVAILABLE_SCHEMAS.get("Account Output")
+    scores = compileOutputSizeExpression(output, rent_structure).evaluate()
+    assert tuple(int(x) for x in scores[0]) == calculateOutputDeposit(output, rent_structure)
+
+    # Other limits give the bounds of a schema that uses them as numbers.
+    expression = compileSizeExpression(limitedSchema(MAX_INPUTS_COUNT, MAX_OUTPUTS_COUNT))
+    assert {"MAX_INPUTS_COUNT", "MAX_OUTPUTS_COUNT"} <= set(expression.limits())
+    inputs = np.array([1, 2, 7, 128, 300])
+    outputs = np.array([0, 1, 3, 64, 1000])
+    sizes = expression.evaluate(MAX_INPUTS_COUNT=inputs, MAX_OUTPUTS_COUNT=outputs)
+    for maxInputs, maxOutputs, size in zip(inputs, outputs, sizes):
+        expected = calculateDeposit(limitedSchema(int(maxInputs), int(maxOutputs)), byteSize)
+        assert tuple(int(x) for x in size) == expected, (maxInputs, maxOutputs)
+
+    # A single limit may be given as a number, the other limits keep their values.
+    size = expression.evaluate(MAX_OUTPUTS_COUNT=3)
+    assert tuple(int(x) for x in size[0]) == calculateDeposit(
+        limitedSchema(int(MAX_INPUTS_COUNT), 3), byteSize
+    )
+    try:
+        expression.evaluate(MAX_UNKNOWN=1)
+        assert False, "unknown limits should be rejected"
+    except KeyError:
+        pass
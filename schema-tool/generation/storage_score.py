@@ -0,0 +1,254 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+import json
+import os
+import struct
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+from generation.codec import CodecError, Decoded, SchemaCodec, Variants, codecFor
+from generation.deposit import calculateDeposit
+from schemas import loadSchema
+from schemas.common import OutputOffset
+from typedefs.datatype import LengthPrefixedArray
+from typedefs.deposit_weight import RentStructure
+from typedefs.field import ComplexField, SimpleField
+
+# Every record of a binary dump is prefixed with its length, so that dumps can be split into
+# batches without decoding them.
+RECORD_LENGTH = struct.Struct("<I")
+# The number of outputs that a worker process scores at once.
+BATCH_SIZE = 4096
+
+
+def simpleFieldSize(field: SimpleField, value) -> int:
+    """Returns the number of bytes a decoded value of the field takes up."""
+    if isinstance(field.type, LengthPrefixedArray):
+        return field.type.typePrefix.max_size() + len(
+            value
+        ) * field.type.typeElement.max_size()
+    return field.type.max_size()
+
+
+def storageScore(value: Decoded, rent_structure: RentStructure) -> int:
+    """Calculates the exact storage score of a decoded value by weighting each of its fields."""
+    score = 0
+    for field in value.schema.fields:
+        fieldValue = value.fields[field.name]
+        match field:
+            case SimpleField():
+                score += simpleFieldSize(field, fieldValue) * rent_structure.weight(
+                    field.deposit_weight
+                )
+            case ComplexField():
+                match fieldValue:
+                    case None:
+                        pass
+                    case list():
+                        for element in fieldValue:
+                            score += storageScore(element, rent_structure)
+                    case _:
+                        score += storageScore(fieldValue, rent_structure)
+    return score
+
+
+def outputOffsetScore(rent_structure: RentStructure) -> int:
+    # All offset fields have a fixed size, so the minimum is the exact score.
+    return calculateDeposit(OutputOffset, rent_structure)[0]
+
+
+def outputVariants(schemaName: Optional[str]) -> Variants | SchemaCodec:
+    """Returns the codec of the given output schema, or one that accepts every output type."""
+    if schemaName is not None:
+        return codecFor(loadSchema(schemaName))
+    transaction = loadSchema("Transaction")
+    outputs = [field for field in transaction.fields if field.name == "Outputs"][0]
+    return Variants(outputs)
+
+
+@dataclass
+class ScoredOutput:
+    index: int
+    """The position of the output in the input."""
+    type: str
+    """The name of the output schema, or empty if the output could not be decoded."""
+    size: int
+    """The serialized size of the output in bytes."""
+    storageScore: int
+    """The storage score including the output offset, or 0 if the output could not be decoded."""
+    error: Optional[str] = None
+
+
+@dataclass
+class MalformedRecord:
+    """A record of the dump that is not an output at all, which is reported like an undecodable output."""
+
+    size: int
+    error: str
+
+
+# The codec of each worker process, which is compiled once per process.
+WORKER_CODECS: Dict[Optional[str], Variants | SchemaCodec] = {}
+
+
+def scoreBatch(
+    schemaName: Optional[str],
+    rent_structure: RentStructure,
+    start: int,
+    records: List[bytes | MalformedRecord],
+) -> List[ScoredOutput]:
+    codec = WORKER_CODECS.get(schemaName)
+    if codec is None:
+        codec = WORKER_CODECS[schemaName] = outputVariants(schemaName)
+    offsetScore = outputOffsetScore(rent_structure)
+
+    scored = []
+    for index, record in enumerate(records, start):
+        if isinstance(record, MalformedRecord):
+            scored.append(ScoredOutput(index, "", record.size, 0, record.error))
+            continue
+        view = memoryview(record)
+        try:
+            if isinstance(codec, SchemaCodec):
+                output, end = codec.decodeFrom(view, 0)
+            else:
+                output, end = codec.decode(view, 0)
+            if end != len(view):
+                raise CodecError(f"{len(view) - end} trailing bytes")
+        except (CodecError, struct.error, IndexError) as error:
+            scored.append(ScoredOutput(index, "", len(record), 0, str(error)))
+            continue
+        scored.append(
+            ScoredOutput(
+                index,
+                output.schema.name,
+                len(record),
+                offsetScore + storageScore(output, rent_structure),
+            )
+        )
+    return scored
+
+
+def readBinaryRecords(file: BinaryIO) -> Iterator[bytes | MalformedRecord]:
+    """Reads the length-prefixed outputs of a binary dump. A truncated last record is malformed."""
+    while True:
+        prefix = file.read(RECORD_LENGTH.size)
+        if not prefix:
+            return
+        if len(prefix) != RECORD_LENGTH.size:
+            yield MalformedRecord(len(prefix), "the dump ends inside a length prefix")
+            return
+        (length,) = RECORD_LENGTH.unpack(prefix)
+        record = file.read(length)
+        if len(record) != length:
+            yield MalformedRecord(
+                len(record), f"the dump ends after {len(record)} of {length} bytes of an output"
+            )
+            return
+        yield record
+
+
+def readJsonRecords(file: BinaryIO) -> Iterator[bytes | MalformedRecord]:
+    """
+    Reads outputs from JSON lines that are either a hex string or an object with an "output" hex
+    string. Lines that are not are malformed records.
+    """
+    for number, line in enumerate(file, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            if isinstance(record, dict):
+                record = record["output"]
+            record = bytes.fromhex(record.removeprefix("0x"))
+        except (ValueError, KeyError, AttributeError) as error:
+            record = MalformedRecord(
+                len(line), f"line {number} is not a hex output: {type(error).__name__} {error}"
+            )
+        yield record
+
+
+def readRecords(path: str) -> Iterator[bytes | MalformedRecord]:
+    with open(path, "rb") as file:
+        if path.endswith(".jsonl") or path.endswith(".json"):
+            yield from readJsonRecords(file)
+        else:
+            yield from readBinaryRecords(file)
+
+
+def batches(
+    records: Iterator[bytes | MalformedRecord],
+) -> Iterator[Tuple[int, List[bytes | MalformedRecord]]]:
+    start = 0
+    batch: List[bytes | MalformedRecord] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == BATCH_SIZE:
+            yield start, batch
+            start += len(batch)
+            batch = []
+    if batch:
+        yield start, batch
+
+
+def scoreOutputs(
+    path: str,
+    schemaName: Optional[str],
+    rent_structure: RentStructure,
+    jobs: Optional[int] = None,
+) -> Iterator[ScoredOutput]:
+    """
+    Scores every output of a dump in the order of the dump.
+
+    Batches are scored by a pool of worker processes. Only a few batches per worker are read
+    ahead, so memory stays bounded however large the dump is.
+    """
+    workers = jobs or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        maxPending = 2 * workers
+        pending: List[Future] = []
+        for start, batch in batches(readRecords(path)):
+            pending.append(
+                executor.submit(scoreBatch, schemaName, rent_structure, start, batch)
+            )
+            if len(pending) >= maxPending:
+                yield from pending.pop(0).result()
+        for future in pending:
+            yield from future.result()
+
+
+@dataclass
+class ScoreSummary:
+    """Aggregates scored outputs per output type."""
+
+    count: Dict[str, int] = field(default_factory=dict)
+    totalScore: Dict[str, int] = field(default_factory=dict)
+    minScore: Dict[str, int] = field(default_factory=dict)
+    maxScore: Dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+
+    def add(self, output: ScoredOutput):
+        if output.error is not None:
+            self.errors += 1
+            return
+        name = output.type
+        self.count[name] = self.count.get(name, 0) + 1
+        self.totalScore[name] = self.totalScore.get(name, 0) + output.storageScore
+        self.minScore[name] = min(
+            self.minScore.get(name, output.storageScore), output.storageScore
+        )
+        self.maxScore[name] = max(
+            self.maxScore.get(name, output.storageScore), output.storageScore
+        )
+
+    def __str__(self) -> str:
+        lines = []
+        for name in sorted(self.count):
+            lines.append(
+                f"{name}: {self.count[name]} outputs, storage score total {self.totalScore[name]}, "
+                f"min {self.minScore[name]}, max {self.maxScore[name]}"
+            )
+        lines.append(
+            f"Total: {sum(self.count.values())} outputs, storage score {sum(self.totalScore.values())}, "
+            f"{self.errors} invalid"
+        )
+        return "\n".join(lines)
@@ -0,0 +1,96 @@
+from dataclasses import replace
+import json
+import os
+import random
+import tempfile
+from generation.codec import Decoded, codecFor
+from generation.codec_test import randomValue
+from generation.deposit import calculateOutputDeposit
+from generation.storage_score import (
+    RECORD_LENGTH,
+    outputVariants,
+    scoreOutputs,
+    storageScore,
+    outputOffsetScore,
+)
+from schemas.address import Ed25519Address
+from schemas.output_basic import BasicOutput
+from schemas.unlock_condition import AddressUnlockCondition
+from typedefs.deposit_weight import RentStructure
+
+
+def RunStorageScoreTests():
+    print("Testing the storage score of serialized outputs")
+
+    rent_structure = RentStructure()
+
+    # The smallest basic output has the minimum deposit of the schema.
+    address = Decoded(Ed25519Address(), {"Address Type": 0, "Pub Key Hash": bytes(32)})
+    unlockCondition = Decoded(
+        AddressUnlockCondition(includeImplicitAccountCreationAddress=True),
+        {"Unlock Condition Type": 0, "Address": address},
+    )
+    output = Decoded(
+        BasicOutput(),
+        {
+            "Output Type": 0,
+            "Amount": 1,
+            "Mana": 0,
+            "Unlock Conditions": [unlockCondition],
+            "Features": [],
+        },
+    )
+    encoded = codecFor(BasicOutput()).encode(output)
+    decoded = codecFor(BasicOutput()).decode(encoded)
+    score = outputOffsetScore(rent_structure) + storageScore(decoded, rent_structure)
+    assert score == 445, score
+
+    rng = random.Random(12)
+    outputs = outputVariants(None)
+    values = [
+        randomValue(rng.choice(list(outputs.byType.values())).schema, rng)
+        for _ in range(200)
+    ]
+    records = [codecFor(value.schema).encode(value) for value in values]
+
+    with tempfile.TemporaryDirectory() as directory:
+        binaryPath = os.path.join(directory, "outputs.bin")
+        with open(binaryPath, "wb") as f:
+            for record in records:
+                f.write(RECORD_LENGTH.pack(len(record)) + record)
+            # An output of an unknown type is reported instead of aborting the run.
+            f.write(RECORD_LENGTH.pack(1) + bytes([200]))
+
+        jsonPath = os.path.join(directory, "outputs.jsonl")
+        with open(jsonPath, "w") as f:
+            for record in records:
+                f.write(json.dumps({"output": "0x" + record.hex()}) + "\n")
+
+        binaryScores = list(scoreOutputs(binaryPath, None, rent_structure, jobs=1))
+        jsonScores = list(scoreOutputs(jsonPath, None, rent_structure, jobs=1))
+
+        # Malformed records are reported like outputs that cannot be decoded.
+        with open(binaryPath, "ab") as f:
+            f.write(RECORD_LENGTH.pack(len(records[0])) + records[0][:-1])
+        truncated = list(scoreOutputs(binaryPath, None, rent_structure, jobs=1))
+        assert len(truncated) == len(records) + 2
+        assert truncated[-1].error is not None and truncated[-1].size == len(records[0]) - 1
+
+        with open(jsonPath, "a") as f:
+            f.write('"0xzz"\n{"input": "0x00"}\n42\n')
+            f.write(json.dumps({"output": "0x" + records[0].hex()}) + "\n")
+        malformed = list(scoreOutputs(jsonPath, None, rent_structure, jobs=1))
+        assert len(malformed) == len(records) + 4
+        assert all(scored.error is not None for scored in malformed[-4:-1])
+        assert malformed[-1] == replace(jsonScores[0], index=len(records) + 3)
+
+    assert len(binaryScores) == len(records) + 1
+    assert binaryScores[-1].error is not None
+    assert binaryScores[:-1] == jsonScores
+
+    for value, record, scored in zip(values, records, jsonScores):
+        assert scored.error is None, scored.error
+        assert scored.type == value.schema.name
+        assert scored.size == len(record)
+        minScore, maxScore = calculateOutputDeposit(value.schema, rent_structure)
+        assert minScore <= scored.storageScore <= maxScore, (scored, minScore, maxScore)
@@ -0,0 +1,79 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# The tags that determine the structure of a schema section.
+SECTION_TOKEN = re.compile(
+    r"<(?P<closing>/?)(?P<tag>details|table)\b[^>]*>|<summary>(?P<summary>.*?)</summary>",
+    flags=re.DOTALL,
+)
+
+
+def indexSections(content: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Finds all top-level schema sections in the content of a TIP in a single pass.
+
+    A section starts with a <details> tag at the start of a line that is not nested in another
+    <details> or <table> and whose <summary> is the schema name. It ends with the </table> that
+    closes the first top-level table after it. Returns the (start, end) span of each section by
+    schema name. If a name occurs more than once, the first section is returned.
+    """
+    sections: Dict[str, Tuple[int, int]] = {}
+
+    detailsDepth = 0
+    tableDepth = 0
+    # The start and name of the section that is currently being scanned.
+    sectionStart: Optional[int] = None
+    sectionName: Optional[str] = None
+    sectionHasTable = False
+
+    for token in SECTION_TOKEN.finditer(content):
+        summary = token.group("summary")
+        if summary is not None:
+            if sectionStart is not None and sectionName is None and detailsDepth == 1:
+                sectionName = summary.strip()
+            continue
+
+        isClosing = token.group("closing") == "/"
+        match token.group("tag"), isClosing:
+            case "details", False:
+                atLineStart = token.start() == 0 or content[token.start() - 1] == "\n"
+                if (
+                    detailsDepth == 0
+                    and tableDepth == 0
+                    and atLineStart
+                    and not sectionHasTable
+                ):
+                    # A section without a table is not a schema section, so a new top-level
+                    # <details> replaces it.
+                    sectionStart = token.start()
+                    sectionName = None
+                detailsDepth += 1
+            case "details", True:
+                detailsDepth = max(detailsDepth - 1, 0)
+            case "table", False:
+                if tableDepth == 0 and detailsDepth == 0 and sectionStart is not None:
+                    sectionHasTable = True
+                tableDepth += 1
+            case "table", True:
+                tableDepth = max(tableDepth - 1, 0)
+                if tableDepth == 0 and detailsDepth == 0 and sectionHasTable:
+                    if sectionName is not None and sectionName not in sections:
+                        sections[sectionName] = (sectionStart, token.end())
+                    sectionStart = None
+                    sectionName = None
+                    sectionHasTable = False
+
+    return sections
+
+
+def spliceSections(content: str, replacements: List[Tuple[int, int, str]]) -> str:
+    """Replaces the given non-overlapping (start, end) spans of the content with new text."""
+    parts: List[str] = []
+    position = 0
+    for start, end, text in sorted(replacements):
+        parts.append(content[position:start])
+        parts.append(text)
+        position = end
+    parts.append(content[position:])
+
+    return "".join(parts)
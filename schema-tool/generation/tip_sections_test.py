@@ -0,0 +1,33 @@
+from generation.schema import SchemaGen
+from generation.tip_sections import indexSections, spliceSections
+from schemas.common import AVAILABLE_SCHEMAS
+from typedefs.generation_type import GenerationType
+
+
+def RunTipSectionsTests():
+    print("Testing TIP section indexing")
+
+    # A TIP with every schema as a top-level section, separated by markdown and by tables and
+    # details which are not schema sections.
+    schemas = [schema for schema in AVAILABLE_SCHEMAS if schema.summary is not None]
+    generated = [
+        SchemaGen().generateSchemaWithSummary(schema, GenerationType.Standalone)
+        for schema in schemas
+    ]
+    separator = "\n\n## Section\n\n<table>\n  <tr><td>Not a schema</td></tr>\n</table>\n\n<details>\n<summary>Unrelated</summary>\nText\n</details>\n\n"
+    content = separator + separator.join(generated) + separator
+
+    sections = indexSections(content)
+    for schema, text in zip(schemas, generated):
+        assert schema.name in sections, f"section {schema.name} not found"
+        start, end = sections[schema.name]
+        assert content[start:end] == text, f"wrong span for {schema.name}"
+    assert "Unrelated" not in sections
+
+    replacements = [
+        (*sections[schema.name], f"<replaced {schema.name}>") for schema in schemas
+    ]
+    expected = separator + separator.join(
+        f"<replaced {schema.name}>" for schema in schemas
+    ) + separator
+    assert spliceSections(content, replacements) == expected
@@ -0,0 +1,117 @@
+from dataclasses import dataclass, field
+from enum import Enum
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+from generation.manifest import TipManifestEntry, contentHash, renderedFingerprint
+from generation.schema import SchemaGen
+from generation.tip_sections import indexSections, spliceSections
+from typedefs.field import Schema
+from typedefs.generation_type import GenerationType
+
+
+class SchemaStatus(Enum):
+    Updated = "updated"
+    UpToDate = "up-to-date"
+    Missing = "missing"
+
+
+@dataclass
+class TipUpdate:
+    """The outcome of updating the schemas of a single TIP."""
+
+    tip: int
+    path: str
+    exists: bool = True
+    """Whether the TIP file exists."""
+    schemas: List[Tuple[str, SchemaStatus]] = field(default_factory=list)
+    """The status of every to-be-updated schema, in the order in which they were given."""
+    seconds: float = 0.0
+    """The wall-clock time the update took."""
+    written: bool = False
+    """Whether the TIP file was written, which only happens if its content changed."""
+    manifestEntry: Optional[TipManifestEntry] = None
+    """The manifest entry that describes the TIP after the update."""
+
+    def count(self, status: SchemaStatus) -> int:
+        return sum(1 for _, schemaStatus in self.schemas if schemaStatus == status)
+
+
+def tipPath(tipRepoPath: str, tip: int) -> str:
+    paddedTipNo = f"{tip:04}"
+    return os.path.join(tipRepoPath, f"tips/TIP-{paddedTipNo}/tip-{paddedTipNo}.md")
+
+
+def updateTip(
+    tipRepoPath: str,
+    tip: int,
+    schemas: List[Schema],
+    manifestEntry: Optional[TipManifestEntry] = None,
+) -> TipUpdate:
+    """
+    Replaces the top-level sections of the given schemas in the TIP with newly generated ones.
+
+    If a manifest entry from a previous update is given, schemas whose definition did not change
+    since then are not regenerated, as long as the TIP file did not change either.
+    """
+    start = time.perf_counter()
+    update = TipUpdate(tip, tipPath(tipRepoPath, tip))
+
+    if not os.path.exists(update.path):
+        update.exists = False
+        return update
+
+    with open(update.path, "r") as f:
+        tip_content = f.read()
+
+    tipContentHash = contentHash(tip_content)
+    fingerprints: Dict[str, str] = {}
+    if manifestEntry is not None and manifestEntry.contentHash == tipContentHash:
+        # Sections of other schemas are not touched, so they stay up-to-date.
+        fingerprints.update(manifestEntry.schemas)
+    # The sections are only indexed if at least one schema needs to be regenerated.
+    sections: Optional[Dict[str, Tuple[int, int]]] = None
+    replacements: List[Tuple[int, int, str]] = []
+
+    for schema in schemas:
+        if manifestEntry is not None and manifestEntry.isUpToDate(
+            tipContentHash, schema
+        ):
+            update.schemas.append((schema.name, SchemaStatus.UpToDate))
+            fingerprints[schema.name] = renderedFingerprint(schema)
+            continue
+
+        if sections is None:
+            sections = indexSections(tip_content)
+        section = sections.get(schema.name)
+
+        if section is None:
+            update.schemas.append((schema.name, SchemaStatus.Missing))
+            continue
+
+        generated: str = SchemaGen().generateSchemaWithSummary(
+            schema, GenerationType.Standalone
+        )
+
+        (sectionStart, sectionEnd) = section
+        replacements.append((sectionStart, sectionEnd, generated))
+        fingerprints[schema.name] = renderedFingerprint(schema)
+
+        if tip_content[sectionStart:sectionEnd] == generated:
+            update.schemas.append((schema.name, SchemaStatus.UpToDate))
+        else:
+            update.schemas.append((schema.name, SchemaStatus.Updated))
+
+    new_tip_content = spliceSections(tip_content, replacements)
+
+    # Leave unchanged files alone, so their modification time is preserved.
+    if new_tip_content != tip_content:
+        with open(update.path, "w") as f:
+            f.write(new_tip_content)
+        update.written = True
+        tipContentHash = contentHash(new_tip_content)
+
+    update.manifestEntry = TipManifestEntry(tipContentHash, fingerprints)
+    update.seconds = time.perf_counter() - start
+
+    return update
@@ -0,0 +1,51 @@
+import os
+import tempfile
+from generation.manifest import SOURCE_ROOT, generatorSources
+from generation.schema import SchemaGen
+from generation.tip_update import SchemaStatus, tipPath, updateTip
+from schemas.common import AVAILABLE_SCHEMAS
+from typedefs.generation_type import GenerationType
+
+
+def RunTipUpdateTests():
+    print("Testing TIP updates with a manifest")
+
+    # The text of the types is rendered into the tables, so editing it invalidates them.
+    sources = [os.path.relpath(path, SOURCE_ROOT) for path in generatorSources()]
+    for source in ["generation/schema.py", "typedefs/datatype.py", "typedefs/subschema.py"]:
+        assert os.path.join(*source.split("/")) in sources, sources
+    assert not any(source.endswith("_test.py") for source in sources), sources
+
+    schemas = [AVAILABLE_SCHEMAS.get("Basic Output"), AVAILABLE_SCHEMAS.get("NFT Output")]
+    generated = [
+        SchemaGen().generateSchemaWithSummary(schema, GenerationType.Standalone)
+        for schema in schemas
+    ]
+
+    with tempfile.TemporaryDirectory() as tipRepoPath:
+        path = tipPath(tipRepoPath, 41)
+        os.makedirs(os.path.dirname(path))
+        with open(path, "w") as f:
+            # The first section is stale, the second one is up-to-date.
+            stale = generated[0].replace("</td>", "</td> ", 1)
+            f.write(f"# TIP\n\n{stale}\n\n{generated[1]}\n")
+
+        update = updateTip(tipRepoPath, 41, schemas)
+        assert update.written
+        assert update.schemas == [
+            (schemas[0].name, SchemaStatus.Updated),
+            (schemas[1].name, SchemaStatus.UpToDate),
+        ], update.schemas
+
+        # Nothing changed, so nothing is regenerated or written.
+        again = updateTip(tipRepoPath, 41, schemas, update.manifestEntry)
+        assert not again.written
+        assert again.count(SchemaStatus.UpToDate) == 2
+        assert again.manifestEntry == update.manifestEntry
+
+        # An edited TIP file invalidates the manifest entry.
+        with open(path, "a") as f:
+            f.write("\nEdited.\n")
+        edited = updateTip(tipRepoPath, 41, schemas, update.manifestEntry)
+        assert not edited.written
+        assert edited.manifestEntry != update.manifestEntry
@@ -0,0 +1,267 @@
+import ast
+from dataclasses import dataclass, field
+import glob
+import importlib
+import os
+import sys
+import time
+import traceback
+from typing import Dict, Iterable, List, Optional, Set
+from generation.dependencies import TIP_FILE, buildDependencies, indexTipFiles
+from generation.manifest import Manifest, renderedFingerprint
+from generation.tip_update import SchemaStatus, TipUpdate, tipPath, updateTip
+from typedefs.field import ALL_SCHEMAS
+# The package is used by attribute, so that a reloaded schemas/__init__.py takes effect.
+import schemas
+from schemas.common import AVAILABLE_SCHEMAS
+
+SCHEMAS_DIRECTORY = os.path.dirname(os.path.abspath(schemas.__file__))
+
+
+def moduleName(path: str) -> str:
+    """Returns the name of the schema module in the given file."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    return "schemas" if name == "__init__" else f"schemas.{name}"
+
+
+def moduleImports(path: str) -> Set[str]:
+    """Returns the schema modules that the module in the given file imports."""
+    with open(path, "r") as f:
+        tree = ast.parse(f.read(), path)
+    imported = set()
+    for node in ast.walk(tree):
+        match node:
+            case ast.ImportFrom(module=str(module)) if module.split(".")[0] == "schemas":
+                imported.add(module)
+            case ast.Import():
+                imported.update(
+                    alias.name for alias in node.names if alias.name.split(".")[0] == "schemas"
+                )
+    return imported
+
+
+def reloadOrder(changed: Iterable[str], imports: Dict[str, Set[str]]) -> List[str]:
+    """
+    Returns the changed modules and all modules that import them, directly or indirectly, such
+    that every module comes after the modules it imports.
+    """
+    importers: Dict[str, Set[str]] = {}
+    for module, imported in imports.items():
+        for dependency in imported:
+            importers.setdefault(dependency, set()).add(module)
+
+    affected = set()
+    stack = list(changed)
+    while stack:
+        module = stack.pop()
+        if module not in affected:
+            affected.add(module)
+            stack.extend(importers.get(module, ()))
+
+    order: List[str] = []
+    visiting: Set[str] = set()
+
+    def visit(module: str):
+        if module in order or module in visiting:
+            return
+        visiting.add(module)
+        for dependency in sorted(imports.get(module, ())):
+            if dependency in affected:
+                visit(dependency)
+        order.append(module)
+
+    for module in sorted(affected):
+        visit(module)
+    return order
+
+
+def reloadModules(modules: List[str]) -> Set[str]:
+    """
+    Reloads the given schema modules in order and returns the names of the schemas whose
+    definition changed, including the ones that were added or removed.
+
+    Unchanged schemas keep their identity, since the reloaded modules construct structurally
+    identical schemas, which are interned. So the caches of unchanged schemas stay warm, while the
+    replaced schemas and their cache entries are dropped.
+
+    If a module fails to reload, the registered schemas are restored and the exception is raised,
+    so that a later reload compares against the schemas before the failed one.
+    """
+    before = {schema.name: renderedFingerprint(schema) for schema in AVAILABLE_SCHEMAS}
+    previousNames = {
+        name for name, module in schemas.SCHEMA_LOCATIONS.items() if module in modules
+    }
+
+    with AVAILABLE_SCHEMAS.replacing() as registered:
+        for module in modules:
+            if module in sys.modules:
+                importlib.reload(sys.modules[module])
+            else:
+                importlib.import_module(module)
+            # The registry is shared by all modules, so a reloaded schemas.common keeps it.
+            if module == "schemas.common":
+                sys.modules[module].AVAILABLE_SCHEMAS = AVAILABLE_SCHEMAS
+        # Modules that were added to the package are imported as well.
+        schemas.loadAllSchemas()
+
+    for name in previousNames - registered:
+        AVAILABLE_SCHEMAS.unregister(name)
+    ALL_SCHEMAS.prune(AVAILABLE_SCHEMAS)
+
+    after = {schema.name: renderedFingerprint(schema) for schema in AVAILABLE_SCHEMAS}
+    return {
+        name
+        for name in before.keys() | after.keys()
+        if before.get(name) != after.get(name)
+    }
+
+
+@dataclass
+class WatchReport:
+    """The outcome of handling one batch of changed files."""
+
+    changedFiles: List[str] = field(default_factory=list)
+    changedSchemas: Set[str] = field(default_factory=set)
+    updates: List[TipUpdate] = field(default_factory=list)
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    def __str__(self) -> str:
+        files = ", ".join(os.path.basename(path) for path in self.changedFiles)
+        if self.error is not None:
+            return f"{files} changed: {self.error}"
+        lines = [
+            f"{files} changed: {len(self.changedSchemas)} schemas changed, "
+            f"{len(self.updates)} TIPs checked ({self.seconds * 1000:.1f} ms)"
+        ]
+        for update in self.updates:
+            for name, status in update.schemas:
+                if status != SchemaStatus.UpToDate:
+                    lines.append(f"  TIP-{update.tip:04}: {name} {status.value}.")
+        return "\n".join(lines)
+
+
+class SchemaWatcher:
+    """
+    Keeps the schemas loaded and regenerates the affected tables whenever a schema module or a TIP
+    file changes.
+
+    Files are polled by their modification time, which needs no dependencies and works on every
+    platform. A changed schema module is reloaded together with the modules that import it, and
+    only the tables of the schemas whose definition changed (and of the schemas embedding them)
+    are regenerated. A changed TIP file gets all its tables regenerated, which only writes the
+    file if one of them differs.
+    """
+
+    tipsRepoPath: str
+    manifest: Optional[Manifest]
+    mtimes: Dict[str, int]
+    """The modification time of every watched file when it was last handled."""
+    pendingModules: Set[str]
+    """The changed modules whose reload failed, which are reloaded again with the next change."""
+
+    def __init__(self, tipsRepoPath: str, manifest: Optional[Manifest] = None) -> None:
+        self.tipsRepoPath = tipsRepoPath
+        self.manifest = manifest
+        self.pendingModules = set()
+        schemas.loadAllSchemas()
+        self.mtimes = self.scan()
+
+    def schemaFiles(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(SCHEMAS_DIRECTORY, "*.py")))
+
+    def tipFiles(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.tipsRepoPath, "tips", "TIP-*", "tip-*.md")))
+
+    def scan(self) -> Dict[str, int]:
+        mtimes = {}
+        for path in self.schemaFiles() + self.tipFiles():
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                # The file was removed in the meantime.
+                pass
+        return mtimes
+
+    def poll(self) -> Optional[WatchReport]:
+        """Handles the files that changed since the last poll, if any."""
+        mtimes = self.scan()
+        changed = sorted(
+            path
+            for path in mtimes.keys() | self.mtimes.keys()
+            if mtimes.get(path) != self.mtimes.get(path)
+        )
+        self.mtimes = mtimes
+        if not changed:
+            return None
+
+        start = time.perf_counter()
+        report = WatchReport(changed)
+        changedModules = self.pendingModules | {
+            moduleName(path)
+            for path in changed
+            if path.startswith(SCHEMAS_DIRECTORY) and not path.endswith("_test.py")
+        }
+        changedTips = [path for path in changed if path.endswith(".md")]
+
+        if changedModules:
+            try:
+                imports = {moduleName(path): moduleImports(path) for path in self.schemaFiles()}
+                report.changedSchemas = reloadModules(reloadOrder(changedModules, imports))
+            except Exception:
+                # The previous schemas are kept until the module is fixed.
+                self.pendingModules = changedModules
+                report.error = traceback.format_exc(limit=-1).strip()
+                report.seconds = time.perf_counter() - start
+                return report
+            self.pendingModules = set()
+
+        report.updates = self.update(report.changedSchemas, changedTips)
+        # Files written by the update are not changes to react to.
+        self.mtimes = self.scan()
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def update(self, changedSchemas: Set[str], changedTips: List[str]) -> List[TipUpdate]:
+        dependencies = buildDependencies(AVAILABLE_SCHEMAS)
+        indexTipFiles(dependencies, self.tipsRepoPath)
+
+        schemasByTip = dependencies.affectedTables(changedSchemas)
+        # All tables of a changed TIP file are regenerated.
+        for path in changedTips:
+            match = TIP_FILE.search(os.path.basename(os.path.dirname(path)))
+            if match is None:
+                continue
+            tip = int(match.group(1))
+            names = {name for name, tips in dependencies.tips.items() if tip in tips}
+            schemasByTip[tip] = sorted(names | set(schemasByTip.get(tip, [])))
+
+        updates = []
+        for tip, names in sorted(schemasByTip.items()):
+            tipSchemas = [
+                AVAILABLE_SCHEMAS.get(name) for name in names if name in AVAILABLE_SCHEMAS
+            ]
+            if not tipSchemas:
+                continue
+            manifestEntry = None
+            if self.manifest is not None:
+                manifestEntry = self.manifest.get(tipPath(self.tipsRepoPath, tip))
+            update = updateTip(self.tipsRepoPath, tip, tipSchemas, manifestEntry)
+            if self.manifest is not None and update.manifestEntry is not None:
+                self.manifest.set(update.path, update.manifestEntry)
+            updates.append(update)
+
+        if self.manifest is not None and updates:
+            self.manifest.save()
+        return updates
+
+    def run(self, interval: float):
+        print(f"Watching {SCHEMAS_DIRECTORY} and {self.tipsRepoPath}, press Ctrl+C to stop.")
+        try:
+            while True:
+                report = self.poll()
+                if report is not None:
+                    print(report, flush=True)
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
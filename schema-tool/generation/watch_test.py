@@ -0,0 +1,144 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from generation.schema import SchemaGen
+from generation.tip_update import SchemaStatus, tipPath
+from generation.watch import (
+    SCHEMAS_DIRECTORY,
+    SchemaWatcher,
+    moduleImports,
+    reloadModules,
+    reloadOrder,
+)
+from schemas.common import AVAILABLE_SCHEMAS
+from typedefs.field import ALL_SCHEMAS
+from typedefs.generation_type import GenerationType
+
+# Edits a schema module of a copy of the tree so that its reload fails, then fixes it.
+FAIL_THEN_FIX_SCRIPT = """
+import json, os, sys, time
+from generation.schema import SchemaGen
+from generation.tip_update import tipPath
+from generation.watch import SCHEMAS_DIRECTORY, SchemaWatcher
+from schemas import loadAllSchemas
+from schemas.common import AVAILABLE_SCHEMAS
+from typedefs.generation_type import GenerationType
+
+def render():
+    return "\\n\\n".join(
+        SchemaGen(cache=None).generateSchemaWithSummary(AVAILABLE_SCHEMAS.get(name), GenerationType.Standalone)
+        for name in ["Basic Output", "Tag Feature"]
+    )
+
+def write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+
+loadAllSchemas()
+tipRepoPath = sys.argv[1]
+path = tipPath(tipRepoPath, 41)
+os.makedirs(os.path.dirname(path))
+write(path, render())
+watcher = SchemaWatcher(tipRepoPath)
+
+module = os.path.join(SCHEMAS_DIRECTORY, "feature.py")
+with open(module, "r") as f:
+    source = f.read()
+edited = source.replace("by additional node plugins.", "by additional node plugins (edited).")
+assert edited != source
+write(module, edited + "\\nraise RuntimeError('broken')\\n")
+failed = watcher.poll()
+write(module, edited)
+fixed = watcher.poll()
+with open(path, "r") as f:
+    upToDate = f.read() == render()
+print(json.dumps({
+    "failed": failed.error is not None,
+    "changed": sorted(fixed.changedSchemas),
+    "upToDate": upToDate,
+}))
+"""
+
+
+def RunWatchTests():
+    print("Testing the schema watcher")
+
+    imports = {}
+    for name in os.listdir(SCHEMAS_DIRECTORY):
+        if name.endswith(".py") and name != "__init__.py":
+            imports[f"schemas.{name[:-3]}"] = moduleImports(
+                os.path.join(SCHEMAS_DIRECTORY, name)
+            )
+    assert "schemas.address" in imports["schemas.feature"]
+
+    # Modules are reloaded after the modules they import.
+    order = reloadOrder(["schemas.address"], imports)
+    assert order[0] == "schemas.address", order
+    assert order.index("schemas.feature") < order.index("schemas.output_basic")
+    assert order.index("schemas.output_basic") < order.index("schemas.transaction")
+    assert "schemas.signature" not in order
+
+    # Reloading unchanged modules keeps the schemas and their order.
+    before = list(AVAILABLE_SCHEMAS)
+    assert reloadModules(reloadOrder(["schemas.unlock"], imports)) == set()
+    after = list(AVAILABLE_SCHEMAS)
+    assert len(before) == len(after)
+    assert all(a is b for a, b in zip(before, after))
+    # Reloads do not grow the interned schemas.
+    interned = len(ALL_SCHEMAS)
+    reloadModules(reloadOrder(["schemas.feature"], imports))
+    assert len(ALL_SCHEMAS) <= interned, (len(ALL_SCHEMAS), interned)
+
+    # A failed reload keeps the previous schemas, so the fixed module regenerates every schema
+    # that changed since then.
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory() as directory:
+        tree = os.path.join(directory, "schema-tool")
+        shutil.copytree(
+            root,
+            tree,
+            ignore=shutil.ignore_patterns("__pycache__", ".*"),
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", FAIL_THEN_FIX_SCRIPT, os.path.join(directory, "tips")],
+            cwd=tree,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        outcome = json.loads(result.stdout)
+        assert outcome["failed"], outcome
+        assert "Tag Feature" in outcome["changed"], outcome
+        assert outcome["upToDate"], outcome
+
+    with tempfile.TemporaryDirectory() as tipRepoPath:
+        path = tipPath(tipRepoPath, 41)
+        os.makedirs(os.path.dirname(path))
+        generated = SchemaGen().generateSchemaWithSummary(
+            AVAILABLE_SCHEMAS.get("Basic Output"), GenerationType.Standalone
+        )
+        with open(path, "w") as f:
+            f.write(generated)
+
+        watcher = SchemaWatcher(tipRepoPath)
+        assert watcher.poll() is None
+
+        # An edited table is regenerated.
+        with open(path, "w") as f:
+            f.write(generated.replace("</td>", "</td> ", 1))
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000_000))
+        report = watcher.poll()
+        assert report is not None and report.error is None
+        assert [update.schemas for update in report.updates] == [
+            [("Basic Output", SchemaStatus.Updated)]
+        ], report.updates
+        with open(path, "r") as f:
+            assert f.read() == generated
+
+        # The write of the watcher itself is not a change.
+        assert watcher.poll() is None
@@ -1,25 +1,108 @@
-# Every file in this directory should be added here in order for the structures
-# to be initialized correctly for the main script.
+import importlib
+from typing import Dict, List, Optional
+from schemas.common import AVAILABLE_SCHEMAS
+from typedefs.field import Schema
 
-from .address import *
-from .common import *
-from .feature import *
-from .block_issuer_key import *
-from .output import *
-from .output_account import *
-from .output_anchor import *
-from .output_basic import *
-from .output_nft import *
-from .output_foundry import *
-from .output_delegation import *
-from .unlock_condition import *
-from .unlock import *
-from .signature import *
-from .protocol_parameters import *
-from .transaction import *
-from .input import *
-from .block import *
-from .output_id_proof import *
-from .merkle_tree import *
-from .tagged_data import *
-from .candidacy_announcement import *
+# Every file in this directory should be added here in order for all the structures
+# to be initialized by loadAllSchemas. The order determines the order of AVAILABLE_SCHEMAS.
+SCHEMA_MODULES: List[str] = [
+    "schemas.address",
+    "schemas.common",
+    "schemas.feature",
+    "schemas.block_issuer_key",
+    "schemas.output",
+    "schemas.output_account",
+    "schemas.output_anchor",
+    "schemas.output_basic",
+    "schemas.output_nft",
+    "schemas.output_foundry",
+    "schemas.output_delegation",
+    "schemas.unlock_condition",
+    "schemas.unlock",
+    "schemas.signature",
+    "schemas.protocol_parameters",
+    "schemas.transaction",
+    "schemas.input",
+    "schemas.block",
+    "schemas.output_id_proof",
+    "schemas.merkle_tree",
+    "schemas.tagged_data",
+    "schemas.candidacy_announcement",
+    "schemas.allotment",
+]
+
+# The module that registers each available schema, so that a schema can be loaded by importing
+# only its module and the modules it depends on. Every registered schema should be added here.
+SCHEMA_LOCATIONS: Dict[str, str] = {
+    "Ed25519 Address": "schemas.address",
+    "Account Address": "schemas.address",
+    "NFT Address": "schemas.address",
+    "Anchor Address": "schemas.address",
+    "Implicit Account Creation Address": "schemas.address",
+    "Multi Address": "schemas.address",
+    "Restricted Address": "schemas.address",
+    "Ed25519 Public Key Hash Block Issuer Key": "schemas.block_issuer_key",
+    "Sender Feature": "schemas.feature",
+    "Issuer Feature": "schemas.feature",
+    "Metadata Feature": "schemas.feature",
+    "State Metadata Feature": "schemas.feature",
+    "Tag Feature": "schemas.feature",
+    "Native Token Feature": "schemas.feature",
+    "Block Issuer Feature": "schemas.feature",
+    "Staking Feature": "schemas.feature",
+    "Address Unlock Condition": "schemas.unlock_condition",
+    "Storage Deposit Return Unlock Condition": "schemas.unlock_condition",
+    "Timelock Unlock Condition": "schemas.unlock_condition",
+    "Expiration Unlock Condition": "schemas.unlock_condition",
+    "State Controller Address Unlock Condition": "schemas.unlock_condition",
+    "Governor Address Unlock Condition": "schemas.unlock_condition",
+    "Immutable Account Address Unlock Condition": "schemas.unlock_condition",
+    "Account Output": "schemas.output_account",
+    "Anchor Output": "schemas.output_anchor",
+    "Basic Output": "schemas.output_basic",
+    "NFT Output": "schemas.output_nft",
+    "Simple Token Scheme": "schemas.output_foundry",
+    "Foundry Output": "schemas.output_foundry",
+    "Delegation Output": "schemas.output_delegation",
+    "Ed25519 Signature": "schemas.signature",
+    "Signature Unlock": "schemas.unlock",
+    "Reference Unlock": "schemas.unlock",
+    "Account Unlock": "schemas.unlock",
+    "Anchor Unlock": "schemas.unlock",
+    "NFT Unlock": "schemas.unlock",
+    "Empty Unlock": "schemas.unlock",
+    "Multi Unlock": "schemas.unlock",
+    "Protocol Parameters": "schemas.protocol_parameters",
+    "Tagged Data": "schemas.tagged_data",
+    "Allotment": "schemas.allotment",
+    "UTXO Input": "schemas.input",
+    "Commitment Input": "schemas.input",
+    "Block Issuance Credit Input": "schemas.input",
+    "Reward Input": "schemas.input",
+    "Transaction": "schemas.transaction",
+    "Signed Transaction": "schemas.transaction",
+    "Candidacy Announcement": "schemas.candidacy_announcement",
+    "Parent": "schemas.block",
+    "Basic Block Body": "schemas.block",
+    "Validation Block Body": "schemas.block",
+    "Block": "schemas.block",
+    "Leaf Hash": "schemas.merkle_tree",
+    "Value Hash": "schemas.merkle_tree",
+    "Node": "schemas.merkle_tree",
+    "Output ID Proof": "schemas.output_id_proof",
+}
+
+
+def loadSchema(name: str) -> Optional[Schema]:
+    """Imports the module that defines the schema with the given name and returns the schema."""
+    module = SCHEMA_LOCATIONS.get(name)
+    if module is None:
+        return None
+    importlib.import_module(module)
+    return AVAILABLE_SCHEMAS.get(name)
+
+
+def loadAllSchemas():
+    """Imports all schema modules so that AVAILABLE_SCHEMAS contains every schema."""
+    for module in SCHEMA_MODULES:
+        importlib.import_module(module)
@@ -9,10 +9,11 @@ from typedefs.datatype import (
     UInt8,
 )
 from typedefs.field import ComplexField, Field, Schema, SimpleField
+from typedefs.limit import Limit
 from typedefs.subschema import AnyOf, OneOf
 
-MIN_MULTI_ADDRESSES = 2
-MAX_MULTI_ADDRESSES = 10
+MIN_MULTI_ADDRESSES = Limit("MIN_MULTI_ADDRESSES", 2)
+MAX_MULTI_ADDRESSES = Limit("MAX_MULTI_ADDRESSES", 10)
 
 
 class AddressType(Enum):
@@ -32,6 +33,7 @@ def address_type_field(
         "Address Type",
         UInt8(),
         f"Set to <strong>value {address_type.value}</strong> to denote {article} <i>{name}</i>.",
+        value=address_type.value,
     )
 
 
@@ -62,7 +64,7 @@ def Ed25519Address(
     )
 
 
-AVAILABLE_SCHEMAS.append(Ed25519Address())
+AVAILABLE_SCHEMAS.register(Ed25519Address())
 
 
 # Account Address
@@ -92,7 +94,7 @@ def AccountAddress(
     )
 
 
-AVAILABLE_SCHEMAS.append(AccountAddress())
+AVAILABLE_SCHEMAS.register(AccountAddress())
 
 
 # NFT Address
@@ -122,7 +124,7 @@ def NftAddress(
     )
 
 
-AVAILABLE_SCHEMAS.append(NftAddress())
+AVAILABLE_SCHEMAS.register(NftAddress())
 
 
 # Anchor Address
@@ -152,7 +154,7 @@ def AnchorAddress(
     )
 
 
-AVAILABLE_SCHEMAS.append(AnchorAddress())
+AVAILABLE_SCHEMAS.register(AnchorAddress())
 
 
 # Implicit Account Creation Address
@@ -186,7 +188,7 @@ def ImplicitAccountCreationAddress(
     )
 
 
-AVAILABLE_SCHEMAS.append(ImplicitAccountCreationAddress())
+AVAILABLE_SCHEMAS.register(ImplicitAccountCreationAddress())
 
 
 # Multi Address
@@ -240,7 +242,7 @@ def MultiAddress(
     )
 
 
-AVAILABLE_SCHEMAS.append(MultiAddress())
+AVAILABLE_SCHEMAS.register(MultiAddress())
 
 # Restricted Address
 
@@ -281,4 +283,4 @@ def RestrictedAddress(
     )
 
 
-AVAILABLE_SCHEMAS.append(RestrictedAddress())
+AVAILABLE_SCHEMAS.register(RestrictedAddress())
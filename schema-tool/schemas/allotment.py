@@ -32,4 +32,4 @@ def Allotment(
     )
 
 
-AVAILABLE_SCHEMAS.append(Allotment())
+AVAILABLE_SCHEMAS.register(Allotment())
@@ -20,6 +20,7 @@ def block_body_type(type_value: int, name: str, article="a") -> SimpleField:
         "Block Body Type",
         UInt8(),
         f"Set to <strong>value {type_value}</strong> to denote {article} <i>{name}</i>.",
+        value=type_value,
     )
 
 
@@ -80,7 +81,7 @@ def Parent(
     )
 
 
-AVAILABLE_SCHEMAS.append(Parent())
+AVAILABLE_SCHEMAS.register(Parent())
 
 basic_block_body_name = "Basic Block Body"
 
@@ -140,7 +141,7 @@ def BasicBlockBody(
     )
 
 
-AVAILABLE_SCHEMAS.append(BasicBlockBody())
+AVAILABLE_SCHEMAS.register(BasicBlockBody())
 
 
 validation_block_body_name = "Validation Block Body"
@@ -192,7 +193,7 @@ def ValidationBlockBody(
     )
 
 
-AVAILABLE_SCHEMAS.append(ValidationBlockBody())
+AVAILABLE_SCHEMAS.register(ValidationBlockBody())
 
 
 def Block(
@@ -215,4 +216,4 @@ def Block(
     )
 
 
-AVAILABLE_SCHEMAS.append(Block())
+AVAILABLE_SCHEMAS.register(Block())
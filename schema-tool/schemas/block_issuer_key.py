@@ -12,6 +12,7 @@ def block_issuer_key_type_field(type_value: int, name: str, article="a") -> Simp
         # TODO: Factor out.
         f"Set to <strong>value {type_value}</strong> to denote {article} <i>{name}</i>.",
         deposit_weight=DepositWeight.BlockIssuerKey,
+        value=type_value,
     )
 
 # Ed25519 Public Key Hash Block Issuer Key
@@ -46,4 +47,4 @@ def Ed25519PublicKeyHashBlockIssuerKey(
     )
 
 
-AVAILABLE_SCHEMAS.append(Ed25519PublicKeyHashBlockIssuerKey())
+AVAILABLE_SCHEMAS.register(Ed25519PublicKeyHashBlockIssuerKey())
@@ -21,4 +21,4 @@ def CandidacyAnnouncement(
     )
 
 
-AVAILABLE_SCHEMAS.append(CandidacyAnnouncement())
+AVAILABLE_SCHEMAS.register(CandidacyAnnouncement())
@@ -1,9 +1,67 @@
 from typing import List
 from typedefs.datatype import ByteArray, UInt64, UInt8
 from typedefs.deposit_weight import DepositWeight
-from typedefs.field import Field, Schema, SimpleField
+from typedefs.field import ComplexField, Field, Schema, SchemaReference, SimpleField
+from typedefs.registry import SchemaRegistry
 
-AVAILABLE_SCHEMAS: List[Schema] = []
+AVAILABLE_SCHEMAS = SchemaRegistry()
+
+
+def resolveSchema(schema: Schema) -> Schema:
+    """Returns the schema a reference refers to, or the schema itself."""
+    if isinstance(schema, SchemaReference):
+        return AVAILABLE_SCHEMAS.get(schema.name)
+    return schema
+
+
+def unrollReference(reference: SchemaReference) -> Schema:
+    """
+    Returns the referenced schema, in which references to itself may be followed one time less.
+
+    Schemas are interned, so unrolling a reference of the same depth again returns the same
+    schema, and calculations that are cached per schema evaluate every depth only once.
+    """
+    target = AVAILABLE_SCHEMAS.get(reference.name)
+    fields: List[Field] = []
+    for field in target.fields:
+        if isinstance(field, ComplexField):
+            field = ComplexField(
+                field.name,
+                field.subschema,
+                [
+                    SchemaReference(
+                        schema.name, schema.summary, reference.depth - 1, schema.tipRef
+                    )
+                    if isinstance(schema, SchemaReference) and schema.name == reference.name
+                    else schema
+                    for schema in field.schemas
+                ],
+            )
+        fields.append(field)
+    return Schema(
+        target.name,
+        target.summary,
+        fields,
+        mandatory=target.mandatory,
+        omitFields=target.omitFields,
+        detailsOpen=target.detailsOpen,
+        tipReference=target.tipRef,
+    )
+
+
+def boundedSchemas(field: ComplexField) -> List[Schema]:
+    """
+    Returns the schemas of the field for size calculations. References are unrolled, and left out
+    once they may not be followed anymore, so that the size of a recursive schema is bounded.
+    """
+    schemas = []
+    for schema in field.schemas:
+        if isinstance(schema, SchemaReference):
+            if schema.depth <= 0:
+                continue
+            schema = unrollReference(schema)
+        schemas.append(schema)
+    return schemas
 
 
 def payload_type_field(type_value: int, name: str, article="a") -> SimpleField:
@@ -11,6 +69,7 @@ def payload_type_field(type_value: int, name: str, article="a") -> SimpleField:
         "Payload Type",
         UInt8(),
         f"Set to <strong>value {type_value}</strong> to denote {article} <i>{name}</i>.",
+        value=type_value,
     )
 
 
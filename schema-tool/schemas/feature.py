@@ -12,6 +12,7 @@ from typedefs.datatype import (
 )
 from typedefs.deposit_weight import DepositWeight
 from typedefs.field import ComplexField, Field, Schema, SimpleField
+from typedefs.limit import Limit
 from schemas.address import (
     AccountAddress,
     AnchorAddress,
@@ -22,11 +23,11 @@ from schemas.address import (
 )
 from typedefs.subschema import AnyOf, OneOf
 
-MIN_METADATA_LENGTH = 1
-MAX_METADATA_LENGTH = 8192
-MAX_TAG_LENGTH = 255
-MIN_BLOCK_ISSUER_KEYS = 1
-MAX_BLOCK_ISSUER_KEYS = 128
+MIN_METADATA_LENGTH = Limit("MIN_METADATA_LENGTH", 1)
+MAX_METADATA_LENGTH = Limit("MAX_METADATA_LENGTH", 8192)
+MAX_TAG_LENGTH = Limit("MAX_TAG_LENGTH", 255)
+MIN_BLOCK_ISSUER_KEYS = Limit("MIN_BLOCK_ISSUER_KEYS", 1)
+MAX_BLOCK_ISSUER_KEYS = Limit("MAX_BLOCK_ISSUER_KEYS", 128)
 
 
 def feature_type_field(
@@ -40,6 +41,7 @@ def feature_type_field(
         UInt8(),
         f"Set to <strong>value {type_value}</strong> to denote {article} <i>{name}</i>.",
         deposit_weight=deposit_weight,
+        value=type_value,
     )
 
 
@@ -87,7 +89,7 @@ def SenderFeature(
     )
 
 
-AVAILABLE_SCHEMAS.append(SenderFeature())
+AVAILABLE_SCHEMAS.register(SenderFeature())
 
 
 # Issuer Feature
@@ -126,7 +128,7 @@ def IssuerFeature(
     )
 
 
-AVAILABLE_SCHEMAS.append(IssuerFeature())
+AVAILABLE_SCHEMAS.register(IssuerFeature())
 
 # Metadata Feature
 
@@ -179,7 +181,7 @@ def MetadataFeature(
     )
 
 
-AVAILABLE_SCHEMAS.append(MetadataFeature())
+AVAILABLE_SCHEMAS.register(MetadataFeature())
 
 # State Metadata Feature
 
@@ -205,7 +207,7 @@ def StateMetadataFeature(
     )
 
 
-AVAILABLE_SCHEMAS.append(StateMetadataFeature())
+AVAILABLE_SCHEMAS.register(StateMetadataFeature())
 
 # Tag Feature
 
@@ -233,7 +235,7 @@ def TagFeature(
     )
 
 
-AVAILABLE_SCHEMAS.append(TagFeature())
+AVAILABLE_SCHEMAS.register(TagFeature())
 
 # Native Token Feature
 
@@ -268,7 +270,7 @@ def NativeTokenFeature(
     )
 
 
-AVAILABLE_SCHEMAS.append(NativeTokenFeature())
+AVAILABLE_SCHEMAS.register(NativeTokenFeature())
 
 # Block Issuer Feature
 
@@ -310,7 +312,7 @@ def BlockIssuerFeature(
     )
 
 
-AVAILABLE_SCHEMAS.append(BlockIssuerFeature())
+AVAILABLE_SCHEMAS.register(BlockIssuerFeature())
 
 # Staking Feature
 
@@ -357,4 +359,4 @@ def StakingFeature(
     )
 
 
-AVAILABLE_SCHEMAS.append(StakingFeature())
+AVAILABLE_SCHEMAS.register(StakingFeature())
@@ -10,6 +10,7 @@ def input_type_field(type_value: int, name: str, article="a") -> SimpleField:
         "Input Type",
         UInt8(),
         f"Set to <strong>value {type_value}</strong> to denote {article} <i>{name}</i>.",
+        value=type_value,
     )
 
 def context_input_type_field(type_value: int, name: str, article="a") -> SimpleField:
@@ -17,6 +18,7 @@ def context_input_type_field(type_value: int, name: str, article="a") -> SimpleF
         "Context Input Type",
         UInt8(),
         f"Set to <strong>value {type_value}</strong> to denote {article} <i>{name}</i>.",
+        value=type_value,
     )
 
 
@@ -46,7 +48,7 @@ def UTXOInput(
     )
 
 
-AVAILABLE_SCHEMAS.append(UTXOInput())
+AVAILABLE_SCHEMAS.register(UTXOInput())
 
 # Commitment Input
 
@@ -71,7 +73,7 @@ def CommitmentInput(
     )
 
 
-AVAILABLE_SCHEMAS.append(CommitmentInput())
+AVAILABLE_SCHEMAS.register(CommitmentInput())
 
 # Block Issuance Credit Input
 
@@ -98,7 +100,7 @@ def BlockIssuanceCreditInput(
     )
 
 
-AVAILABLE_SCHEMAS.append(BlockIssuanceCreditInput())
+AVAILABLE_SCHEMAS.register(BlockIssuanceCreditInput())
 
 # Reward Input
 
@@ -125,4 +127,4 @@ def RewardInput(
     )
 
 
-AVAILABLE_SCHEMAS.append(RewardInput())
+AVAILABLE_SCHEMAS.register(RewardInput())
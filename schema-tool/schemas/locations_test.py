@@ -0,0 +1,13 @@
+from schemas import SCHEMA_LOCATIONS, loadAllSchemas
+from schemas.common import AVAILABLE_SCHEMAS
+
+
+def RunSchemaLocationTests():
+    print("Testing schema locations")
+    loadAllSchemas()
+
+    registered = set(schema.name for schema in AVAILABLE_SCHEMAS)
+    listed = set(SCHEMA_LOCATIONS)
+    assert (
+        registered == listed
+    ), f"missing in SCHEMA_LOCATIONS: {registered - listed}, unknown: {listed - registered}"
@@ -4,7 +4,7 @@ from typedefs.datatype import (
     LengthPrefixedArray,
     UInt8,
 )
-from typedefs.field import ComplexField, Field, Schema, SimpleField
+from typedefs.field import ComplexField, Field, Schema, SchemaReference, SimpleField
 from typedefs.subschema import OneOf
 
 
@@ -13,6 +13,7 @@ def merkle_tree_component_type(type_value: int, name: str, article="a") -> Simpl
         "Merkle Tree Component Type",
         UInt8(),
         f"Set to <strong>value {type_value}</strong> to denote {article} <i>{name}</i>.",
+        value=type_value,
     )
 
 
@@ -34,7 +35,7 @@ def LeafHash(
     )
 
 
-AVAILABLE_SCHEMAS.append(LeafHash())
+AVAILABLE_SCHEMAS.register(LeafHash())
 
 
 value_hash_name = "Value Hash"
@@ -55,28 +56,32 @@ def ValueHash(
     )
 
 
-AVAILABLE_SCHEMAS.append(ValueHash())
+AVAILABLE_SCHEMAS.register(ValueHash())
 
 
 node_name = "Node"
 node_description = (
     "A merkle tree node that contains two child components."
 )
-# Used to avoid having to recursively define the type.
-node_dummy_schema = Schema(
-    node_name, node_description, [], tipReference=45, omitFields=True
+# The number of nodes on the path from the root to a leaf in the tree of the outputs of a
+# transaction, which has at most 128 outputs.
+MAX_TREE_DEPTH = 7
+# A node contains nodes, which is expressed with a reference. The root node is the first node on
+# the path, so nested nodes may follow one time less.
+node_reference = SchemaReference(
+    node_name, node_description, MAX_TREE_DEPTH - 1, tipReference=45
 )
 node_fields: List[Field] = [
     merkle_tree_component_type(0, node_name),
     ComplexField(
         "Left",
         OneOf(),
-        [node_dummy_schema, LeafHash(omitFields=True), ValueHash(omitFields=True)],
+        [node_reference, LeafHash(omitFields=True), ValueHash(omitFields=True)],
     ),
     ComplexField(
         "Right",
         OneOf(),
-        [node_dummy_schema, LeafHash(omitFields=True), ValueHash(omitFields=True)],
+        [node_reference, LeafHash(omitFields=True), ValueHash(omitFields=True)],
     ),
 ]
 
@@ -95,5 +100,5 @@ def Node(
     return node
 
 
-AVAILABLE_SCHEMAS.append(Node())
+AVAILABLE_SCHEMAS.register(Node())
 
@@ -22,4 +22,5 @@ def output_type_field(
         UInt8(),
         f"Set to <strong>value {output_type.value}</strong> to denote {article} <i>{name}</i>.",
         deposit_weight=deposit_weight,
+        value=output_type.value,
     )
@@ -78,4 +78,4 @@ def AccountOutput(
     )
 
 
-AVAILABLE_SCHEMAS.append(AccountOutput())
+AVAILABLE_SCHEMAS.register(AccountOutput())
@@ -79,4 +79,4 @@ def AnchorOutput(
     )
 
 
-AVAILABLE_SCHEMAS.append(AnchorOutput())
+AVAILABLE_SCHEMAS.register(AnchorOutput())
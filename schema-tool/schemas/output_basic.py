@@ -57,4 +57,4 @@ def BasicOutput(
     )
 
 
-AVAILABLE_SCHEMAS.append(BasicOutput())
+AVAILABLE_SCHEMAS.register(BasicOutput())
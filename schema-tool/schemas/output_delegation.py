@@ -1,4 +1,3 @@
-import copy
 from typing import List
 from schemas.address import AccountAddress
 from schemas.output import OutputType, output_type_field
@@ -14,8 +13,12 @@ from schemas.unlock_condition import (
 
 name = "Delegation Output"
 summary = "Describes a Delegation Output, which delegates its contained IOTA coins to a validator."
-amount = copy.deepcopy(AmountField)
-amount.deposit_weight = DepositWeight.Delegation
+amount = SimpleField(
+    AmountField.name,
+    AmountField.type,
+    AmountField.description,
+    deposit_weight=DepositWeight.Delegation,
+)
 
 delegated_amount = SimpleField(
     "Delegated Amount",
@@ -70,4 +73,4 @@ def DelegationOutput(
     return Schema(name, summary, fields, tipReference=40, omitFields=omitFields)
 
 
-AVAILABLE_SCHEMAS.append(DelegationOutput())
+AVAILABLE_SCHEMAS.register(DelegationOutput())
@@ -23,6 +23,7 @@ def simple_token_scheme_type_field(
         "Token Scheme Type",
         UInt8(),
         f"Set to <strong>value {type_value}</strong> to denote {article} <i>{name}</i>.",
+        value=type_value,
     )
 
 
@@ -55,7 +56,7 @@ def SimpleTokenScheme(
     )
 
 
-AVAILABLE_SCHEMAS.append(SimpleTokenScheme())
+AVAILABLE_SCHEMAS.register(SimpleTokenScheme())
 
 foundry_name = "Foundry Output"
 foundry_summary = "Describes a foundry output that is controlled by an account."
@@ -117,4 +118,4 @@ def FoundryOutput(
     )
 
 
-AVAILABLE_SCHEMAS.append(FoundryOutput())
+AVAILABLE_SCHEMAS.register(FoundryOutput())
@@ -44,4 +44,4 @@ def OutputIDProof(
     )
 
 
-AVAILABLE_SCHEMAS.append(OutputIDProof())
+AVAILABLE_SCHEMAS.register(OutputIDProof())
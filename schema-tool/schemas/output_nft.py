@@ -80,4 +80,4 @@ def NftOutput(
     )
 
 
-AVAILABLE_SCHEMAS.append(NftOutput())
+AVAILABLE_SCHEMAS.register(NftOutput())
@@ -9,7 +9,7 @@ from typedefs.subschema import OneOf
 protocol_parameters_name = "Protocol Parameters"
 
 param_type = SimpleField(
-    "Type", UInt8(), "Set to <b>value 0</b> to denote IOTA 2.0 protocol parameters."
+    "Type", UInt8(), "Set to <b>value 0</b> to denote IOTA 2.0 protocol parameters.", value=0
 )
 
 version = SimpleField(
@@ -483,4 +483,4 @@ protocol_parameters_fields: List[Field] = [
 
 ProtocolParameters = Schema(protocol_parameters_name, "The IOTA 2.0 Protocol Parameters.", protocol_parameters_fields)
 
-AVAILABLE_SCHEMAS.append(ProtocolParameters)
\ No newline at end of file
+AVAILABLE_SCHEMAS.register(ProtocolParameters)
\ No newline at end of file
@@ -9,6 +9,7 @@ def signature_type_field(type_value: int, name: str, article="a") -> SimpleField
         "Signature Type",
         UInt8(),
         f"Set to <strong>value {type_value}</strong> to denote {article} <i>{name}</i>.",
+        value=type_value,
     )
 
 
@@ -42,4 +43,4 @@ def Ed25519Signature(
     )
 
 
-AVAILABLE_SCHEMAS.append(Ed25519Signature())
+AVAILABLE_SCHEMAS.register(Ed25519Signature())
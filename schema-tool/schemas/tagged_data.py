@@ -36,4 +36,4 @@ def TaggedData(
     )
 
 
-AVAILABLE_SCHEMAS.append(TaggedData())
+AVAILABLE_SCHEMAS.register(TaggedData())
@@ -20,12 +20,13 @@ from schemas.input import UTXOInput, BlockIssuanceCreditInput, CommitmentInput,
 from typedefs.subschema import AnyOf, Embedded, OptAnyOf, OptOneOf
 from typedefs.datatype import LengthPrefixedArray, UInt16, UInt32, UInt64, UInt8
 from typedefs.field import ComplexField, Field, Schema, SimpleField
+from typedefs.limit import Limit
 
-MIN_INPUTS_COUNT = 1
-MAX_INPUTS_COUNT = 128
-MIN_OUTPUTS_COUNT = 1
-MAX_OUTPUTS_COUNT = 128
-MAX_ALLOTMENTS_COUNT = 128
+MIN_INPUTS_COUNT = Limit("MIN_INPUTS_COUNT", 1)
+MAX_INPUTS_COUNT = Limit("MAX_INPUTS_COUNT", 128)
+MIN_OUTPUTS_COUNT = Limit("MIN_OUTPUTS_COUNT", 1)
+MAX_OUTPUTS_COUNT = Limit("MAX_OUTPUTS_COUNT", 128)
+MAX_ALLOTMENTS_COUNT = Limit("MAX_ALLOTMENTS_COUNT", 128)
 
 transaction_name = "Transaction"
 transaction_fields: List[Field] = [
@@ -99,7 +100,7 @@ def Transaction(
     )
 
 
-AVAILABLE_SCHEMAS.append(Transaction())
+AVAILABLE_SCHEMAS.register(Transaction())
 
 
 signed_transaction_name = "Signed Transaction"
@@ -134,4 +135,4 @@ def SignedTransaction(
     )
 
 
-AVAILABLE_SCHEMAS.append(SignedTransaction())
+AVAILABLE_SCHEMAS.register(SignedTransaction())
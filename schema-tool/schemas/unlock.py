@@ -23,6 +23,7 @@ def unlock_type_field(unlock_type: UnlockType, name: str, article="a") -> Simple
         "Unlock Type",
         UInt8(),
         f"Set to <strong>value {unlock_type.value}</strong> to denote {article} <i>{name}</i>.",
+        value=unlock_type.value,
     )
 
 
@@ -47,7 +48,7 @@ def SignatureUnlock(
     )
 
 
-AVAILABLE_SCHEMAS.append(SignatureUnlock())
+AVAILABLE_SCHEMAS.register(SignatureUnlock())
 
 # Reference Unlock
 
@@ -70,7 +71,7 @@ def ReferenceUnlock(
     )
 
 
-AVAILABLE_SCHEMAS.append(ReferenceUnlock())
+AVAILABLE_SCHEMAS.register(ReferenceUnlock())
 
 # Account Unlock
 
@@ -97,7 +98,7 @@ def AccountUnlock(
     )
 
 
-AVAILABLE_SCHEMAS.append(AccountUnlock())
+AVAILABLE_SCHEMAS.register(AccountUnlock())
 
 # Anchor Unlock
 
@@ -124,7 +125,7 @@ def AnchorUnlock(
     )
 
 
-AVAILABLE_SCHEMAS.append(AnchorUnlock())
+AVAILABLE_SCHEMAS.register(AnchorUnlock())
 
 # NFT Unlock
 
@@ -151,7 +152,7 @@ def NFTUnlock(
     )
 
 
-AVAILABLE_SCHEMAS.append(NFTUnlock())
+AVAILABLE_SCHEMAS.register(NFTUnlock())
 
 # Empty Unlock
 
@@ -173,7 +174,7 @@ def EmptyUnlock(
     )
 
 
-AVAILABLE_SCHEMAS.append(EmptyUnlock())
+AVAILABLE_SCHEMAS.register(EmptyUnlock())
 
 # Multi Unlock
 
@@ -208,4 +209,4 @@ def MultiUnlock(
     )
 
 
-AVAILABLE_SCHEMAS.append(MultiUnlock())
+AVAILABLE_SCHEMAS.register(MultiUnlock())
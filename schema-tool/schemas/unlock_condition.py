@@ -19,6 +19,7 @@ def unlock_condition_type_field(type_value: int, name: str, article="a") -> Simp
         "Unlock Condition Type",
         UInt8(),
         f"Set to <strong>value {type_value}</strong> to denote {article} <i>{name}</i>.",
+        value=type_value,
     )
 
 
@@ -76,7 +77,7 @@ def AddressUnlockCondition(
     )
 
 
-AVAILABLE_SCHEMAS.append(AddressUnlockCondition())
+AVAILABLE_SCHEMAS.register(AddressUnlockCondition())
 
 
 # Storage Deposit Return Unlock Condition
@@ -110,7 +111,7 @@ def StorageDepositReturnUnlockCondition(
     )
 
 
-AVAILABLE_SCHEMAS.append(StorageDepositReturnUnlockCondition())
+AVAILABLE_SCHEMAS.register(StorageDepositReturnUnlockCondition())
 
 
 # Timelock Unlock Condition
@@ -141,7 +142,7 @@ def TimelockUnlock(
     )
 
 
-AVAILABLE_SCHEMAS.append(TimelockUnlock())
+AVAILABLE_SCHEMAS.register(TimelockUnlock())
 
 # Expiration Unlock Condition
 
@@ -174,7 +175,7 @@ def ExpirationUnlockCondition(
     )
 
 
-AVAILABLE_SCHEMAS.append(ExpirationUnlockCondition())
+AVAILABLE_SCHEMAS.register(ExpirationUnlockCondition())
 
 # State Controller Address Unlock Condition
 
@@ -199,7 +200,7 @@ def StateControllerUnlockCondition(
     )
 
 
-AVAILABLE_SCHEMAS.append(StateControllerUnlockCondition())
+AVAILABLE_SCHEMAS.register(StateControllerUnlockCondition())
 
 # Governor Address Unlock Condition
 
@@ -224,7 +225,7 @@ def GovernorUnlockCondition(
     )
 
 
-AVAILABLE_SCHEMAS.append(GovernorUnlockCondition())
+AVAILABLE_SCHEMAS.register(GovernorUnlockCondition())
 
 # Immutable Account Address Unlock Condition
 
@@ -255,4 +256,4 @@ def ImmutableAccountAddressUnlockCondition(
     )
 
 
-AVAILABLE_SCHEMAS.append(ImmutableAccountAddressUnlockCondition())
+AVAILABLE_SCHEMAS.register(ImmutableAccountAddressUnlockCondition())
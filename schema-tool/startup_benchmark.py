@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+CLI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli.py")
+
+# The commands whose cold-start time is measured. Commands that would write to the tips repo
+# are not included.
+COMMANDS: List[List[str]] = [
+    ["schema", "generate", "Ed25519 Address", "--dry-run"],
+    ["schema", "generate", "Basic Output", "--dry-run"],
+    ["schema", "generate", "Block", "--dry-run"],
+    ["deposit", "Basic Output", "--dry-run"],
+    ["deposit", "Account Output", "--dry-run"],
+    ["schema", "stats"],
+]
+
+
+def measure(args: List[str], repeat: int) -> List[float]:
+    """Runs the command in a fresh interpreter `repeat` times and returns the wall-clock times in ms."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(args, check=True, stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measures the cold-start time of the schema tool CLI commands."
+    )
+    parser.add_argument(
+        "--repeat",
+        "-r",
+        type=int,
+        default=10,
+        help="How often each command is run.",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=str,
+        default=None,
+        help="Appends the results as a JSON line to the given file, to track them over time.",
+    )
+    args = parser.parse_args()
+
+    # The interpreter startup alone, to put the command timings into perspective.
+    results: Dict[str, float] = {
+        "python": statistics.median(measure([sys.executable, "-c", "pass"], args.repeat))
+    }
+    print(f"{'python':<45} {results['python']:8.1f} ms")
+
+    for command in COMMANDS:
+        timings = measure([sys.executable, CLI_PATH] + command, args.repeat)
+        name = " ".join(command)
+        results[name] = statistics.median(timings)
+        print(
+            f"{name:<45} {results[name]:8.1f} ms (min {min(timings):.1f}, max {max(timings):.1f})"
+        )
+
+    if args.output is not None:
+        with open(args.output, "a") as f:
+            f.write(json.dumps({"time": time.time(), "median_ms": results}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
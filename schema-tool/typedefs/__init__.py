@@ -3,3 +3,4 @@ from .datatype import *
 from .field import *
 from .deposit_weight import *
 from .generation_type import *
+from .registry import *
@@ -1,8 +1,12 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields, is_dataclass
 from abc import ABC, abstractmethod
+from typing import Any, Dict
 
 
 class DataType(ABC):
+    # Data types are immutable and have no per-instance dictionary, see PrimitiveType.
+    __slots__ = ()
+
     @abstractmethod
     def min_size(self) -> int:
         """Returns the minimum size the data type takes up in bytes."""
@@ -14,7 +18,28 @@ class DataType(ABC):
         pass
 
 
-class UInt8(DataType):
+class PrimitiveType(DataType):
+    """
+    A data type without parameters. There is only one instance of every primitive type, so the
+    fields of all schemas share it.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls) -> "PrimitiveType":
+        instance = PRIMITIVE_TYPES.get(cls)
+        if instance is None:
+            instance = super().__new__(cls)
+            PRIMITIVE_TYPES[cls] = instance
+        return instance
+
+
+PRIMITIVE_TYPES: Dict[type, PrimitiveType] = {}
+
+
+class UInt8(PrimitiveType):
+    __slots__ = ()
+
     def __str__(self) -> str:
         return "uint8"
 
@@ -25,7 +50,9 @@ class UInt8(DataType):
         return 1
 
 
-class UInt16(DataType):
+class UInt16(PrimitiveType):
+    __slots__ = ()
+
     def __str__(self) -> str:
         return "uint16"
 
@@ -36,7 +63,9 @@ class UInt16(DataType):
         return 2
 
 
-class UInt32(DataType):
+class UInt32(PrimitiveType):
+    __slots__ = ()
+
     def __str__(self) -> str:
         return "uint32"
 
@@ -47,7 +76,9 @@ class UInt32(DataType):
         return 4
 
 
-class UInt64(DataType):
+class UInt64(PrimitiveType):
+    __slots__ = ()
+
     def __str__(self) -> str:
         return "uint64"
 
@@ -58,7 +89,9 @@ class UInt64(DataType):
         return 8
 
 
-class UInt256(DataType):
+class UInt256(PrimitiveType):
+    __slots__ = ()
+
     def __str__(self) -> str:
         return "uint256"
 
@@ -68,7 +101,8 @@ class UInt256(DataType):
     def max_size(self) -> int:
         return 32
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class ByteArray(DataType):
     byteSize: int
 
@@ -82,29 +116,17 @@ class ByteArray(DataType):
         return self.byteSize
 
 
-@dataclass(init=False)
+@dataclass(frozen=True, slots=True)
 class LengthPrefixedArray(DataType):
     typePrefix: UInt8 | UInt16 | UInt32
     """The type of the length prefix"""
-    typeElement: DataType
+    typeElement: DataType = UInt8()
     """The type of the array elements"""
-    minLength: int
+    minLength: int = 0
     "The minimum size in bytes for the storage deposit calculation"
-    maxLength: int
+    maxLength: int = 0
     "The maximum size in bytes for the storage deposit calculation"
 
-    def __init__(
-        self,
-        typePrefix: UInt8 | UInt16 | UInt32,
-        typeElement: DataType = UInt8(),
-        minLength: int = 0,
-        maxLength: int = 0,
-    ) -> None:
-        self.typePrefix = typePrefix
-        self.typeElement = typeElement
-        self.minLength = minLength
-        self.maxLength = maxLength
-
     def __str__(self) -> str:
         match self.typeElement:
             case UInt8():
@@ -120,3 +142,10 @@ class LengthPrefixedArray(DataType):
 
     def max_size(self) -> int:
         return self.typePrefix.max_size() + self.maxLength
+
+
+def dataTypeValues(dataType: DataType) -> Dict[str, Any]:
+    """Returns the parameters of the data type by name, which primitive types have none of."""
+    if not is_dataclass(dataType):
+        return {}
+    return {field.name: getattr(dataType, field.name) for field in fields(dataType)}
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 
 class DepositWeight(Enum):
@@ -42,5 +42,16 @@ class RentStructure:
             DepositWeight.Delegation: 100 if delegation is None else delegation,
         }
 
+    @staticmethod
+    def byteSize() -> "RentStructure":
+        """Returns the rent structure in which every byte weighs 1, so deposits are byte sizes."""
+        byteSize = RentStructure()
+        byteSize.rent_structure = {weight: 1 for weight in DepositWeight}
+        return byteSize
+
     def weight(self, deposit_weight: DepositWeight) -> int:
-        return self.rent_structure[deposit_weight]
\ No newline at end of file
+        return self.rent_structure[deposit_weight]
+
+    def key(self) -> Tuple[int, ...]:
+        """Returns the weights ordered by deposit weight, e.g. for use as a cache key."""
+        return tuple(self.rent_structure[weight] for weight in DepositWeight)
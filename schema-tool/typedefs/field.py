@@ -1,37 +1,43 @@
 from dataclasses import dataclass
-from typing import List, Optional
-from typedefs.datatype import DataType
+import hashlib
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from typedefs.datatype import DataType, dataTypeValues
 from typedefs.deposit_weight import DepositWeight
+from typedefs.limit import Limit
 from typedefs.subschema import Subschema
 
-ALL_SCHEMAS = []
-
 
 class Field:
-    pass
+    # Fields and schemas are immutable and slotted, so the many instances of the loaded model
+    # have no per-instance dictionary.
+    __slots__ = ()
 
 
-@dataclass(init=False)
+@dataclass(frozen=True, slots=True)
 class TipReference:
     tipNumber: int
     """The TIP number in which this schema is defined."""
-    customFragment: Optional[str]
+    customFragment: Optional[str] = None
     """A custom link (fragment = '#') within the TIP to which the reference should point."""
 
-    def __init__(
-        self,
-        tipNumber: int,
-        customFragment: Optional[str] = None,
-    ) -> None:
-        self.tipNumber = tipNumber
-        self.customFragment = customFragment
 
+class InternedSchema(type):
+    """
+    Metaclass that hash-conses schemas: constructing a schema that is structurally identical to
+    an existing one returns the existing instance, so the factory functions share one instance
+    per distinct schema no matter how often they are embedded.
+    """
+
+    def __call__(cls, *args, **kwargs):
+        return ALL_SCHEMAS.intern(super().__call__(*args, **kwargs))
 
-@dataclass(init=False)
-class Schema:
+
+@dataclass(init=False, frozen=True, slots=True)
+class Schema(metaclass=InternedSchema):
     name: str
     summary: str
-    fields: List[Field]
+    fields: Tuple[Field, ...]
     mandatory: bool
     """Whether this schema is mandatory to be present when it is embedded."""
     omitFields: bool
@@ -45,26 +51,24 @@ class Schema:
         self,
         name: str,
         summary: str,
-        fields: List[Field],
+        fields: Iterable[Field],
         mandatory: bool = False,
         omitFields: bool = False,
         detailsOpen: bool = False,
         tipReference: Optional[int | TipReference] = None,
     ):
-        self.name = name
-        self.summary = summary
-        self.fields = fields
-        self.mandatory = mandatory
-        self.omitFields = omitFields
-        self.detailsOpen = detailsOpen
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "summary", summary)
+        object.__setattr__(self, "fields", tuple(fields))
+        object.__setattr__(self, "mandatory", mandatory)
+        object.__setattr__(self, "omitFields", omitFields)
+        object.__setattr__(self, "detailsOpen", detailsOpen)
 
         match tipReference:
             case int():
-                self.tipRef = TipReference(tipReference)
+                object.__setattr__(self, "tipRef", TipReference(tipReference))
             case _:
-                self.tipRef = tipReference
-
-        ALL_SCHEMAS.append(self)
+                object.__setattr__(self, "tipRef", tipReference)
 
     def definedIn(self) -> str:
         definedIn = ""
@@ -82,38 +86,233 @@ class Schema:
         return definedIn
 
 
-@dataclass(init=False)
-class SimpleField(Field):
-    name: str
-    type: DataType
-    deposit_weight: DepositWeight
-    description: str
+@dataclass(init=False, frozen=True, slots=True)
+class SchemaReference(Schema):
+    """
+    Refers to the registered schema of the same name, so that a schema can contain itself.
+
+    It is rendered like a schema whose fields are omitted. Size calculations replace it by the
+    referenced schema, in which the reference may be followed depth - 1 more times, see
+    schemas.common.boundedSchemas.
+    """
+
+    depth: int
+    """How many more times the reference may be followed. At depth 0 it can no longer be chosen."""
 
     def __init__(
         self,
         name: str,
-        type: DataType,
-        description: str,
-        deposit_weight: DepositWeight = DepositWeight.Data,
+        summary: str,
+        depth: int,
+        tipReference: Optional[int | TipReference] = None,
     ):
-        self.name = name
-        self.type = type
-        self.description = description
-        self.deposit_weight = deposit_weight
+        # Slotted dataclasses are recreated by the decorator, which breaks the zero-argument super().
+        Schema.__init__(self, name, summary, [], omitFields=True, tipReference=tipReference)
+        object.__setattr__(self, "depth", depth)
+
 
+@dataclass(frozen=True, slots=True)
+class SimpleField(Field):
+    name: str
+    type: DataType
+    description: str
+    deposit_weight: DepositWeight = DepositWeight.Data
+    value: Optional[int] = None
+    """The value the field is always set to, e.g. the value of a type field."""
 
-@dataclass(init=False)
+
+@dataclass(frozen=True, slots=True)
 class ComplexField(Field):
     name: str
     subschema: Subschema
-    schemas: List[Schema]
+    schemas: Tuple[Schema, ...]
 
-    def __init__(
-        self,
-        name: str,
-        subschema: Subschema,
-        schemas: List[Schema],
-    ):
-        self.name = name
-        self.subschema = subschema
-        self.schemas = schemas
+    def __post_init__(self):
+        # Schemas are hashable and shared between all their embeddings, so the fields cannot be
+        # changed after construction.
+        object.__setattr__(self, "schemas", tuple(self.schemas))
+
+
+def limitKey(value: Any) -> Any:
+    # A limit is equal to its value, but schemas that use it must not be interned with schemas that
+    # only use the same number, since size expressions depend on the limit.
+    return (Limit, value.name, int(value)) if isinstance(value, Limit) else value
+
+
+def dataTypeKey(dataType: DataType) -> Tuple:
+    return (type(dataType),) + tuple(
+        dataTypeKey(value) if isinstance(value, DataType) else limitKey(value)
+        for value in dataTypeValues(dataType).values()
+    )
+
+
+def fieldKey(field: Field, childKey: Callable[[Schema], Any] = id) -> Tuple:
+    match field:
+        case SimpleField():
+            return (
+                SimpleField,
+                field.name,
+                dataTypeKey(field.type),
+                field.description,
+                field.deposit_weight,
+                field.value,
+            )
+        case ComplexField():
+            return (
+                ComplexField,
+                field.name,
+                (type(field.subschema),)
+                + tuple(limitKey(value) for value in vars(field.subschema).values()),
+                # Embedded schemas are constructed first and are therefore already interned,
+                # so they are identified by their id by default.
+                tuple(childKey(schema) for schema in field.schemas),
+            )
+        case _:
+            raise TypeError(f"unsupported field {type(field).__name__}")
+
+
+def schemaKey(schema: Schema, childKey: Callable[[Schema], Any] = id) -> Tuple:
+    """Returns a hashable key that is equal for structurally identical schemas."""
+    tipRef = schema.tipRef
+    key = (
+        schema.name,
+        schema.summary,
+        tuple(fieldKey(field, childKey) for field in schema.fields),
+        schema.mandatory,
+        schema.omitFields,
+        schema.detailsOpen,
+        None if tipRef is None else (tipRef.tipNumber, tipRef.customFragment),
+    )
+    if isinstance(schema, SchemaReference):
+        # A reference is not the same as a schema without fields, and references of another
+        # depth unroll differently.
+        key += ((SchemaReference, schema.depth),)
+    return key
+
+
+SCHEMA_CACHES: List[Dict[Any, Tuple]] = []
+"""The caches keyed by schema identity, whose entries hold the schema first, see SchemaTable.prune."""
+
+
+def trackSchemaCache(cache: Dict[Any, Tuple]) -> Dict[Any, Tuple]:
+    """
+    Registers the cache so that its entries of schemas that are no longer used are dropped.
+
+    Schemas are interned, so structurally identical schemas are the same instance. Caches are keyed
+    by id(schema) because that is much cheaper than hash(schema), which hashes all fields and
+    embedded schemas. Every entry holds the schema first, so that its id cannot be reused while
+    it is cached.
+    """
+    SCHEMA_CACHES.append(cache)
+    return cache
+
+
+SCHEMA_FINGERPRINTS: Dict[int, Tuple[Schema, str]] = trackSchemaCache({})
+
+
+def schemaFingerprint(schema: Schema) -> str:
+    """
+    Returns a hash of the schema definition including all embedded schemas, which is stable
+    across processes and changes whenever the definition of the schema or an embedded one changes.
+    """
+    entry = SCHEMA_FINGERPRINTS.get(id(schema))
+    if entry is not None:
+        return entry[1]
+
+    key = schemaKey(schema, schemaFingerprint)
+    fingerprint = hashlib.sha256(repr(key).encode()).hexdigest()
+    SCHEMA_FINGERPRINTS[id(schema)] = (schema, fingerprint)
+
+    return fingerprint
+
+
+@dataclass
+class SchemaFootprint:
+    constructed: int
+    """The number of schemas that were constructed."""
+    unique: int
+    """The number of distinct schema instances that are kept."""
+    size: int
+    """The approximate number of bytes retained by the distinct schemas."""
+
+    def __str__(self) -> str:
+        return f"{self.constructed} schemas constructed, {self.unique} unique instances, {self.size / 1024:.1f} KiB retained"
+
+
+class SchemaTable:
+    """Keeps one instance of every structurally distinct schema."""
+
+    schemas: Dict[Tuple, Schema]
+    constructed: int
+
+    def __init__(self) -> None:
+        self.schemas = {}
+        self.constructed = 0
+
+    def intern(self, schema: Schema) -> Schema:
+        self.constructed += 1
+        return self.schemas.setdefault(schemaKey(schema), schema)
+
+    def prune(self, roots: Iterable[Schema]) -> int:
+        """
+        Drops the schemas that cannot be reached from the roots, together with their entries in the
+        tracked caches, e.g. the schemas of a reloaded module. Returns the number of dropped schemas.
+        """
+        reachable: set[int] = set()
+        stack = list(roots)
+        while stack:
+            schema = stack.pop()
+            if id(schema) in reachable:
+                continue
+            reachable.add(id(schema))
+            for field in schema.fields:
+                if isinstance(field, ComplexField):
+                    stack.extend(field.schemas)
+
+        count = len(self.schemas)
+        self.schemas = {key: schema for key, schema in self.schemas.items() if id(schema) in reachable}
+        for cache in SCHEMA_CACHES:
+            for key in [key for key, entry in cache.items() if id(entry[0]) not in reachable]:
+                del cache[key]
+        return count - len(self.schemas)
+
+    def __iter__(self):
+        return iter(self.schemas.values())
+
+    def __len__(self) -> int:
+        return len(self.schemas)
+
+    def footprint(self) -> SchemaFootprint:
+        # Walks the object graph of all distinct schemas, counting every object only once.
+        seen: set[int] = set()
+        stack: List[Any] = list(self.schemas.values())
+        size = 0
+        while stack:
+            obj = stack.pop()
+            if id(obj) in seen:
+                continue
+            seen.add(id(obj))
+            size += sys.getsizeof(obj)
+            match obj:
+                case dict():
+                    stack.extend(obj.keys())
+                    stack.extend(obj.values())
+                case list() | tuple():
+                    stack.extend(obj)
+                case _ if isinstance(obj, type):
+                    pass
+                case _ if hasattr(obj, "__dict__"):
+                    stack.append(vars(obj))
+                case _:
+                    stack.extend(
+                        getattr(obj, name)
+                        for cls in type(obj).__mro__
+                        for name in cls.__dict__.get("__slots__", ())
+                        if hasattr(obj, name)
+                    )
+
+        return SchemaFootprint(self.constructed, len(self.schemas), size)
+
+
+ALL_SCHEMAS = SchemaTable()
+"""All distinct schemas that were constructed."""
@@ -0,0 +1,26 @@
+from typing import Dict
+
+
+class Limit(int):
+    """
+    A protocol limit, like the maximum number of inputs of a transaction.
+
+    It behaves like its integer value, so schemas can use it wherever a length is expected, but it
+    keeps its name. This lets generation/size_expression.py compile schemas into size expressions
+    over the limits instead of over their current values.
+    """
+
+    name: str
+
+    def __new__(cls, name: str, value: int) -> "Limit":
+        limit = super().__new__(cls, value)
+        limit.name = name
+        LIMITS[name] = limit
+        return limit
+
+    def __reduce__(self):
+        return (Limit, (self.name, int(self)))
+
+
+# All limits by name. Limits register themselves when the module that defines them is imported.
+LIMITS: Dict[str, Limit] = {}
@@ -0,0 +1,56 @@
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Set
+from typedefs.field import Schema
+
+
+class SchemaRegistry:
+    """The top-level schemas that can be generated, indexed by their name."""
+
+    schemas: Dict[str, Schema]
+    replaced: Optional[Set[str]]
+    """The names registered while schemas may be replaced, see replacing."""
+
+    def __init__(self) -> None:
+        self.schemas = {}
+        self.replaced = None
+
+    def register(self, schema: Schema):
+        existing = self.schemas.get(schema.name)
+        if self.replaced is not None:
+            self.replaced.add(schema.name)
+        elif existing is not None and existing is not schema:
+            raise ValueError(f"a different schema named `{schema.name}` is already registered")
+        # A replaced schema keeps its position.
+        self.schemas[schema.name] = schema
+
+    @contextmanager
+    def replacing(self):
+        """
+        Lets the schemas that are registered in the block replace the registered schemas of the same
+        name, e.g. when their module is reloaded. Yields the set of names registered in the block.
+        If the block raises, the registry is restored to the schemas before the block.
+        """
+        previous = dict(self.schemas)
+        self.replaced = set()
+        try:
+            yield self.replaced
+        except BaseException:
+            self.schemas = previous
+            raise
+        finally:
+            self.replaced = None
+
+    def unregister(self, name: str):
+        self.schemas.pop(name, None)
+
+    def get(self, name: str) -> Optional[Schema]:
+        return self.schemas.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.schemas
+
+    def __iter__(self) -> Iterator[Schema]:
+        return iter(self.schemas.values())
+
+    def __len__(self) -> int:
+        return len(self.schemas)
@@ -28,7 +28,7 @@ class OptOneOf(Subschema):
         return "optOneOf"
 
 
-@dataclass
+@dataclass(frozen=True)
 class AnyOf(Subschema):
     minLength: int
     maxLength: int
@@ -37,7 +37,7 @@ class AnyOf(Subschema):
         return "anyOf"
 
 
-@dataclass
+@dataclass(frozen=True)
 class OptAnyOf(Subschema):
     maxLength: int
     minLength: int = 0